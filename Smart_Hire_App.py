@@ -10,23 +10,38 @@ SmartHire - Streamlit RAG app
 # Import Modul untuk operasi sistem dan handling data.
 import os
 import json
-import re
-from typing import List, Dict, Any, Optional
+import time
+import contextlib
+from typing import List, Dict, Any, Optional, Callable, Iterator
 
 # Import Streamlit untuk membuat UI Aplikasi.
 import streamlit as st
 # Import utility untuk load variabel enviroment dari file .env (API Keys).
 from dotenv import load_dotenv
 
-# Import LangChain dan OpenAI untuk LLM, Embeddings, dan Vector Store.
+# Import LangChain dan OpenAI untuk LLM dan Embeddings.
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_qdrant import Qdrant
 from langchain.tools import tool
 from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import ToolMessage
-
-# Import Qdrant client untuk retrieval.
-from qdrant_client import QdrantClient
+from langchain_core.messages import ToolMessage, AIMessageChunk
+
+# Import pemilihan backend vector store / embedding (remote Qdrant + OpenAI, atau lokal tanpa jaringan).
+from backends import shared_qdrant_client, make_async_qdrant_client, required_settings, HashingEmbedder, LOCAL_EMBEDDING_MODEL, LOCAL_EMBED_DIM
+# Import retrieval layer (satu round trip Qdrant per pencarian, dijalankan async).
+from retrieval import ahybrid_search_candidates, abatch_hybrid_search_candidates, collection_search_settings, resolve_category, centroid_collection_name, parse_tool_message_json, score_kind
+# Import event loop latar belakang untuk menjalankan agen dan tool secara async dari Streamlit.
+from background_loop import BackgroundLoop
+# Import indeks leksikal BM25 (ditulis oleh script ingest).
+from lexical_index import LexicalIndex, LEXICAL_INDEX_PATH
+
+# Import cache embedding lokal (dipakai bersama dengan script ingest).
+from embedding_cache import EmbeddingCache, QueryEmbeddingCache
+# Import cache jawaban semantik agen.
+from answer_cache import SemanticAnswerCache
+# Import side store metadata resume (ditulis oleh script ingest).
+from resume_store import ResumeStore, RESUME_STORE_PATH
+# Import tracing latensi per tahap (span per permintaan, ditulis ke file JSONL).
+from tracing import RequestTrace, TracedAsyncClient, TraceWriter, summarize_traces, TRACE_PATH
 
 # Load env variabel yang berisi API Keys dan URL.
 load_dotenv()
@@ -108,138 +123,241 @@ def main_app():
             2.  **Add to Shortlist:** Review the retrieved candidates. Use the 'Add to shortlist' button for any promising profiles.
             3.  **Manage Shortlist:** Navigate to the **Shortlist Manager** page to see all your saved candidates, add notes, and generate personalized outreach emails.
             4.  **Create Interview Packs:** Go to the **Interview Generator** page. Select a candidate from your shortlist to generate interview questions and a scoring rubric.
+            5.  **Match Many Roles at Once:** Use the **Bulk Matching** page to upload a CSV of job descriptions and download a role × candidate score matrix.
             """
         )
 
     # Load API Keys dan URL dari file secrets (secrets.toml).
-    QDRANT_URL = st.secrets.QDRANT_URL
-    QDRANT_API_KEY = st.secrets.QDRANT_API_KEY
-    OPENAI_API_KEY = st.secrets.OPENAI_API_KEY
-    COLLECTION_NAME = st.secrets.QDRANT_COLLECTION
-
-    # Stop aplikasi jika ada credential yang kurang atau hilang.
-    if not all([QDRANT_URL, QDRANT_API_KEY, OPENAI_API_KEY]):
-        st.error("Missing required secrets. Set QDRANT_URL, QDRANT_API_KEY, and OPENAI_API_KEY in Streamlit secrets.")
+    QDRANT_URL = st.secrets.get("QDRANT_URL")
+    QDRANT_API_KEY = st.secrets.get("QDRANT_API_KEY")
+    OPENAI_API_KEY = st.secrets.get("OPENAI_API_KEY")
+    COLLECTION_NAME = st.secrets.get("QDRANT_COLLECTION", "resumes_v1")
+    # Backend: "qdrant" (remote), "local" (Qdrant embedded di QDRANT_PATH), atau "numpy" (memmap di NUMPY_STORE_PATH).
+    VECTOR_BACKEND = st.secrets.get("VECTOR_BACKEND") or os.getenv("VECTOR_BACKEND", "qdrant")
+    EMBEDDING_BACKEND = st.secrets.get("EMBEDDING_BACKEND") or os.getenv("EMBEDDING_BACKEND", "openai")
+    LOCAL_STORE_PATH = st.secrets.get("QDRANT_PATH") or st.secrets.get("NUMPY_STORE_PATH") or os.getenv("QDRANT_PATH") or os.getenv("NUMPY_STORE_PATH")
+    # Model embedding harus sama dengan yang dipakai saat ingest.
+    EMBEDDING_MODEL = LOCAL_EMBEDDING_MODEL if EMBEDDING_BACKEND == "local" else "text-embedding-3-small"
+    EMBEDDING_MODEL_DIM = LOCAL_EMBED_DIM if EMBEDDING_BACKEND == "local" else 1536  # Dimensi default model embedding
+    RETRIEVAL_GROUP_SIZE = 2    # Jumlah chunk terbaik per kandidat yang dipakai sebagai bukti (snippets)
+    # Retrieval dua tahap (centroid per resume, lalu chunk di resume terpilih); aktif jika collection centroid ada.
+    TWO_STAGE_RETRIEVAL = str(st.secrets.get("TWO_STAGE_RETRIEVAL", "1")).lower() in ("1", "true")
+    QUERY_CACHE_SIZE = 1024     # Jumlah embedding query yang disimpan di LRU memori proses
+    QUERY_CACHE_TTL = 3600      # Umur (detik) entri LRU sebelum dibaca ulang dari cache disk
+    # Cache jawaban semantik: query dengan cosine similarity >= threshold memakai jawaban yang sudah ada.
+    ANSWER_CACHE_THRESHOLD = float(st.secrets.get("ANSWER_CACHE_THRESHOLD", 0.97))
+    ANSWER_CACHE_TTL = float(st.secrets.get("ANSWER_CACHE_TTL", 1800))
+    ANSWER_CACHE_SIZE = int(st.secrets.get("ANSWER_CACHE_SIZE", 256))
+    # Tracing per permintaan: span per tahap ditulis sebagai JSONL ke TRACE_PATH (set TRACING = "0" untuk mematikan).
+    TRACING_ENABLED = str(st.secrets.get("TRACING", "1")).lower() in ("1", "true")
+    TRACE_FILE = st.secrets.get("TRACE_PATH") or TRACE_PATH
+
+    # Stop aplikasi jika ada credential yang kurang atau hilang. Credential Qdrant hanya wajib untuk backend remote;
+    # OPENAI_API_KEY selalu dibutuhkan oleh LLM agen.
+    secrets = {"QDRANT_URL": QDRANT_URL, "QDRANT_API_KEY": QDRANT_API_KEY, "OPENAI_API_KEY": OPENAI_API_KEY}
+    if missing := [name for name in dict.fromkeys(required_settings(VECTOR_BACKEND, EMBEDDING_BACKEND) + ["OPENAI_API_KEY"]) if not secrets[name]]:
+        st.error(f"Missing required secrets. Set {', '.join(missing)} in Streamlit secrets (VECTOR_BACKEND={VECTOR_BACKEND}).")
         st.stop()
 
-    # Inisialisasi Qdrant client untuk action database vektor.
-    qclient = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-
     # Menggunakan caching resource Streamlit (@st.cache_resource) untuk menghindari inisialisasi ulang-
     # -objek yang berat (LLM, Embeddings, Qdrant Client) pada setiap rerun.
     @st.cache_resource
-    def get_llm_and_qdrant():
+    def get_qdrant_client():
+        # Satu Qdrant client (connection pool HTTP) dipakai bersama oleh semua rerun, session, dan halaman.
+        return shared_qdrant_client(VECTOR_BACKEND, url=QDRANT_URL, api_key=QDRANT_API_KEY, path=LOCAL_STORE_PATH, timeout=30)
+
+    # Event loop persisten di thread latar belakang; agen async dan client async selalu berjalan di loop ini.
+    @st.cache_resource
+    def get_background_loop():
+        return BackgroundLoop()
+
+    @st.cache_resource
+    def get_async_qdrant_client():
+        # Client async untuk tool retrieval: beberapa tool call dalam satu giliran LLM berjalan bersamaan.
+        # Backend lokal memakai client sinkron yang sama (dibungkus method async).
+        return make_async_qdrant_client(VECTOR_BACKEND, url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=30, sync_client=get_qdrant_client())
+
+    @st.cache_resource
+    def get_llm_and_embeddings():
         # Inisialisasi LLM (GPT-4o-mini)
-        llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY)
+        # stream_usage=True: jumlah token tetap dilaporkan (usage_metadata) saat jawaban di-stream.
+        llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY, stream_usage=True)
+        # Baca layout vektor collection: query harus di-embed dengan dimensi yang sama seperti saat ingest,
+        # dan collection yang memakai quantization di-rescore dengan vektor asli.
+        query_dims, search_params = collection_search_settings(get_qdrant_client(), COLLECTION_NAME, EMBEDDING_MODEL_DIM)
         # Inisialisasi model embedding untuk mengubah teks menjadi representasi vektor.
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=OPENAI_API_KEY)
-        # Inisialisasi instance Qdrant Client untuk wrapper LangChain.
-        qdrant_client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-        # Siapkan wrapper LangChain Qdrant untuk pencarian kemiripan (similarity search).
-        qdrant = Qdrant(
-            client=qdrant_client,
-            collection_name=COLLECTION_NAME,
-            embeddings=embeddings,
-            # Tentukan kunci payload mana yang berisi konten teks resume.
-            content_payload_key="text",
-            metadata_payload_key=None,
+        # Backend lokal memakai embedding hashing deterministik (sama seperti saat ingest), tanpa jaringan.
+        if EMBEDDING_BACKEND == "local":
+            embeddings = HashingEmbedder(dim=EMBEDDING_MODEL_DIM)
+        else:
+            embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY, dimensions=query_dims)
+        return llm, embeddings, query_dims, search_params
+
+    # Cache embedding query dua tingkat: LRU + TTL di memori proses, di depan cache SQLite di disk
+    # yang dibagi antar rerun, session, dan proses Streamlit.
+    @st.cache_resource
+    def get_query_embedder():
+        _, embeddings, query_dims, _ = get_llm_and_embeddings()
+        return QueryEmbeddingCache(
+            embeddings.embed_documents, EMBEDDING_MODEL, dimensions=query_dims,
+            disk=EmbeddingCache(), max_items=QUERY_CACHE_SIZE, ttl_seconds=QUERY_CACHE_TTL,
+            aembed_fn=embeddings.aembed_documents,
         )
-        return llm, qdrant
     
-    # Ambil instance LLM dan Qdrant yang sudah diinisialisasi.
-    llm, qdrant = get_llm_and_qdrant()
-
-    # Fungsi pembantu untuk membagi blok teks menjadi kalimat individual.
-    def _split_sentences(text: str) -> List[str]:
-        # Memisahkan teks berdasarkan tanda baca akhir kalimat.
-        sentences = re.split(r'(?<=[\.\?\!\n])\s+', text.replace("\r", " ").strip())
-        return [s.strip() for s in sentences if s.strip()] or [text.strip()]
-
-    # Fungsi untuk mengekstrak kalimat (snippet) yang paling relevan dari dokumen berdasarkan query.
-    def extract_snippets(text: str, query: str, n: int = 3) -> List[str]:
-        # Tokenisasi query untuk mengidentifikasi kata kunci penting.
-        query_tokens = set(re.findall(r'\w+', query.lower()))
-        sentences = _split_sentences(text)
-        # Beri skor setiap kalimat berdasarkan jumlah kata kunci query yang ada.
-        scored = [(len(set(re.findall(r'\w+', s.lower())) & query_tokens), len(s), s) for s in sentences]
-        # Urutkan berdasarkan skor relevansi (menurun) dan kemudian panjang (menurun untuk tie-breaking).
-        scored.sort(key=lambda x: (x[0], -x[1]), reverse=True)
-        # Kembalikan N kalimat teratas yang mengandung setidaknya satu kata kunci query.
-        top = [s for score, ln, s in scored if score > 0][:n]
-        return top or sentences[:n]
-
-    # Mengurai konten JSON dari ToolMessage, dan handling error.
-    def parse_tool_message_json(tm: str) -> Optional[List[Dict[str, Any]]]:
+    # Nama collection centroid untuk retrieval dua tahap; None jika dimatikan atau belum dibuat oleh ingest.
+    @st.cache_resource
+    def get_centroid_collection():
+        name = centroid_collection_name(COLLECTION_NAME)
+        return name if TWO_STAGE_RETRIEVAL and get_qdrant_client().collection_exists(name) else None
+
+    # Cache jawaban agen (di memori proses, dibagi antar session).
+    @st.cache_resource
+    def get_answer_cache():
+        return SemanticAnswerCache(threshold=ANSWER_CACHE_THRESHOLD, ttl_seconds=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_SIZE)
+
+    # Waktu modifikasi file lokal hasil ingest (None jika belum ada). Dipakai sebagai argumen cache resource,
+    # sehingga file yang dibuat atau ditulis ulang oleh ingest dimuat ulang tanpa restart aplikasi.
+    def file_mtime(path: str) -> Optional[float]:
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    # Side store metadata lengkap per resume; None jika file belum dibuat oleh ingest.
+    @st.cache_resource(max_entries=1)
+    def get_resume_store(mtime: Optional[float]):
+        return ResumeStore(RESUME_STORE_PATH) if mtime is not None else None
+    
+    # Penulis trace (thread latar belakang) dan trace terbaru di memori, dibagi antar session.
+    @st.cache_resource
+    def get_trace_writer():
+        return TraceWriter(TRACE_FILE) if TRACING_ENABLED else None
+
+    # Indeks leksikal BM25 untuk hybrid retrieval; None jika file belum dibuat oleh ingest (dense saja).
+    # Dimuat ulang saat file disimpan ulang oleh ingest (full atau delta).
+    @st.cache_resource(max_entries=1)
+    def get_lexical_index(mtime: Optional[float]):
+        return LexicalIndex.load(LEXICAL_INDEX_PATH) if mtime is not None else None
+
+    # Ambil instance LLM, Embeddings, dan Qdrant client yang sudah diinisialisasi.
+    qclient = get_qdrant_client()
+    # Trace permintaan chat yang sedang diproses (diisi di stream_agent); None di luar permintaan chat.
+    active_trace: Dict[str, Optional[RequestTrace]] = {"trace": None}
+    # Setiap query ke vector store dicatat sebagai span "qdrant.<method>" pada trace aktif.
+    aqclient = TracedAsyncClient(get_async_qdrant_client(), lambda: active_trace["trace"])
+    background_loop = get_background_loop()
+    llm, embeddings, query_dims, search_params = get_llm_and_embeddings()
+    query_embedder = get_query_embedder()
+    answer_cache = get_answer_cache()
+    resume_store = get_resume_store(file_mtime(RESUME_STORE_PATH))
+    if resume_store is None:
+        st.warning(f"Resume store `{RESUME_STORE_PATH}` not found: resume details are unavailable. Run the ingest script (or set RESUME_STORE_PATH) to create it.")
+    lexical_index = get_lexical_index(file_mtime(LEXICAL_INDEX_PATH))
+    if lexical_index is None:
+        st.warning(f"Lexical index `{LEXICAL_INDEX_PATH}` not found or outdated: retrieval runs dense-only (no BM25 keyword matching). Run the ingest script (or set LEXICAL_INDEX_PATH) to build it.")
+    centroid_collection = get_centroid_collection()
+    trace_writer = get_trace_writer()
+    # Label kategori yang ada di dataset (untuk filter kategori di tool retrieval dan instruksi agen).
+    known_categories = resume_store.categories() if resume_store is not None else sorted(c for c in (lexical_index.category_labels if lexical_index else []) if c)
+    # Hit/miss cache embedding query untuk permintaan chat yang sedang diproses (direset di invoke_agent).
+    embed_cache_usage = {"memory": 0, "disk": 0, "miss": 0}
+
+    # Span pada trace aktif; tanpa trace aktif (mis. pemanggilan di luar chat), hanya menjalankan blok kode.
+    def trace_span(name: str, **attrs):
+        trace = active_trace["trace"]
+        return trace.span(name, **attrs) if trace is not None else contextlib.nullcontext({})
+
+    # Retrieval kandidat (async): embedding query dan query Qdrant di-await, sehingga beberapa tool call
+    # paralel dari satu giliran LLM berjalan bersamaan di event loop yang sama.
+    async def aget_relevant_resumes(query: str, k: int = 5, category: Optional[str] = None, candidate_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # Cocokkan nama kategori dengan label di dataset; kategori yang tidak dikenal dikembalikan sebagai error ke agen.
+        resolved = resolve_category(category, known_categories)
+        if category and resolved is None:
+            return [{"error": f"Unknown category '{category}'. Valid categories: {', '.join(known_categories)}"}]
+        # Embed query lewat cache dua tingkat; API embedding hanya dipanggil jika query belum pernah di-embed.
+        async def aembed_queries(texts: List[str]) -> List[List[float]]:
+            with trace_span("embed_query") as attrs:
+                vectors, tiers = await query_embedder.alookup_many(texts)
+                attrs["cache"] = tiers[0]
+            for tier in tiers: embed_cache_usage[tier] += 1
+            return vectors
         try:
-            # Muat string JSON ke dalam objek Python.
-            parsed = json.loads(tm)
-            # Normalisasi output agar selalu berupa list.
-            return [parsed] if isinstance(parsed, dict) else parsed if isinstance(parsed, list) else None
-        except Exception:
-            return None
-
-    # Fungsi utama untuk query Qdrant dan mengambil data resume lengkap yang diformat.
-    def get_relevant_resumes(query: str, k: int = 5) -> List[Dict[str, Any]]:
-        # Melakukan pencarian kemiripan vektor menggunakan wrapper LangChain.
-        results_langchain = qdrant.similarity_search_with_score(query, k=k)
-        # Ekstrak ID Qdrant internal dari hasil pencarian.
-        qdrant_ids = [str(doc.metadata.get("_id")) for doc, _ in results_langchain if doc.metadata.get("_id")]
-        
-        if not qdrant_ids: return []
-        
+            # Dense (dua tahap: centroid resume lalu chunk, atau grouped per ID resume) + BM25 digabung
+            # dengan RRF; query kata kunci persis dijawab dari indeks leksikal saja tanpa embedding.
+            return await ahybrid_search_candidates(
+                aqclient, COLLECTION_NAME, aembed_queries, query, lexical=lexical_index,
+                k=k, group_size=RETRIEVAL_GROUP_SIZE, search_params=search_params,
+                category=resolved, candidate_ids=candidate_ids, centroid_collection=centroid_collection,
+                snippet_index=resume_store,
+            )
+        except Exception as e:
+            return [{"error": f"Failed to search Qdrant: {e}"}]
+
+    # Retrieval banyak query sekaligus (async): semua query di-embed dalam satu request embedding dan dicari
+    # dengan rencana yang sama seperti aget_relevant_resumes. Hasilnya satu daftar kandidat per query, urutan sama.
+    async def aget_relevant_resumes_batch(queries: List[str], k: int = 5, category: Optional[str] = None, candidate_ids: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        resolved = resolve_category(category, known_categories)
+        if category and resolved is None:
+            return [[{"error": f"Unknown category '{category}'. Valid categories: {', '.join(known_categories)}"}] for _ in queries]
+        async def aembed_queries(texts: List[str]) -> List[List[float]]:
+            with trace_span("embed_queries", n=len(texts)) as attrs:
+                vectors, tiers = await query_embedder.alookup_many(texts)
+                attrs["misses"] = tiers.count("miss")
+            for tier in tiers: embed_cache_usage[tier] += 1
+            return vectors
         try:
-            # Gunakan Qdrant Client untuk mengambil payload dokumen lengkap berdasarkan ID.
-            full_points = qclient.retrieve(collection_name=COLLECTION_NAME, ids=qdrant_ids, with_payload=True)
+            return await abatch_hybrid_search_candidates(
+                aqclient, COLLECTION_NAME, aembed_queries, queries, lexical=lexical_index,
+                k=k, group_size=RETRIEVAL_GROUP_SIZE, search_params=search_params,
+                category=resolved, candidate_ids=candidate_ids, centroid_collection=centroid_collection,
+                snippet_index=resume_store,
+            )
         except Exception as e:
-            return [{"error": f"Failed to retrieve full data from Qdrant: {e}"}]
-
-        # Buat kamus (dictionary) untuk pencarian cepat payload berdasarkan ID Qdrant.
-        payload_lookup = {str(p.id): (p.payload or {}) for p in full_points}
-        formatted_results = []
-        # Gabungkan data dari pencarian kemiripan dan payload lengkap.
-        for doc, score in results_langchain:
-            qdrant_id = str(doc.metadata.get("_id"))
-            native_payload = payload_lookup.get(qdrant_id, {})
-            # Tentukan ID unik dan kategori kandidat.
-            candidate_id = native_payload.get("ID") or native_payload.get("id") or qdrant_id
-            category = native_payload.get("Category") or native_payload.get("category")
-            # Ambil konten teks utama dari resume.
-            text = doc.page_content or native_payload.get("text") or native_payload.get("Resume_str") or ""
-            
-            # Susun output akhir, termasuk skor relevansi dan snippet yang diekstrak.
-            formatted_results.append({
-                "qdrant_id": qdrant_id, "ID": candidate_id, "Category": category,
-                "content": text, "snippets": extract_snippets(text, query, n=3),
-                "score": float(score)
-            })
-        return formatted_results
-
-    # Definisikan tools LangChain kustom yang dapat digunakan oleh agen untuk retrieval.
+            return [[{"error": f"Failed to search Qdrant: {e}"}] for _ in queries]
+
+    # Definisikan tools LangChain kustom yang dapat digunakan oleh agen untuk retrieval (async).
     @tool
-    def retrieve_resumes_tool(query: str, k: int = 5):
-        """Tool to retrieve relevant resumes. Returns JSON of candidate data."""
-        results = get_relevant_resumes(query, k=k)
-        # Alat mengembalikan hasil sebagai string JSON agar dapat diproses oleh LLM.
-        return json.dumps(results, ensure_ascii=False, default=str)
+    async def retrieve_resumes_tool(query: str, k: int = 5, category: Optional[str] = None, candidate_ids: Optional[List[str]] = None):
+        """Tool to retrieve relevant resumes. Returns JSON of candidate data, best match first.
+        'score' is the score of the source that found the candidate: cosine similarity of the best chunk (0-1) when
+        'retrieval' contains 'dense', or a BM25 keyword score (unbounded) when 'retrieval' is 'lexical'; scores of the two
+        kinds are not comparable. Hybrid results are ordered by 'rrf_score' (reciprocal rank fusion of both sources).
+        Optional filters: 'category' restricts the search to one job category, 'candidate_ids' to specific candidate IDs."""
+        with trace_span("tool.retrieve_resumes", k=k, filtered=bool(category or candidate_ids)) as attrs:
+            results = await aget_relevant_resumes(query, k=k, category=category, candidate_ids=candidate_ids)
+            # Alat mengembalikan hasil sebagai string JSON agar dapat diproses oleh LLM.
+            payload = json.dumps(results, ensure_ascii=False, default=str)
+            attrs.update(results=len(results), payload_bytes=len(payload.encode("utf-8")))
+        return payload
+
+    # Tool retrieval batch: banyak query dalam satu panggilan (satu request embedding untuk semua query).
+    @tool
+    async def retrieve_resumes_batch_tool(queries: List[str], k: int = 5, category: Optional[str] = None, candidate_ids: Optional[List[str]] = None):
+        """Tool to retrieve relevant resumes for several queries at once (e.g. several roles). Returns JSON of candidate data;
+        each row has a 'query' field naming the query it belongs to. Same optional filters as retrieve_resumes_tool."""
+        with trace_span("tool.retrieve_resumes_batch", k=k, queries=len(queries)) as attrs:
+            per_query = await aget_relevant_resumes_batch(queries, k=k, category=category, candidate_ids=candidate_ids)
+            # Diratakan menjadi satu list (format sama seperti retrieve_resumes_tool) agar UI dan parsing tidak berubah.
+            results = [{**r, "query": q} for q, rows in zip(queries, per_query) for r in rows]
+            payload = json.dumps(results, ensure_ascii=False, default=str)
+            attrs.update(results=len(results), payload_bytes=len(payload.encode("utf-8")))
+        return payload
 
     # Definisikan system prompt, yang akan mengatur instruksi untuk agen.
     AGENT_PROMPT = (
         "You are SmartHire, an assistant for shortlisting candidates. "
-        "Use 'retrieve_resumes_tool(query,k)' to fetch resumes. 'ID' is the unique identifier. "
+        "Use 'retrieve_resumes_tool(query,k,category,candidate_ids)' to fetch resumes. 'ID' is the unique identifier. "
+        "When the user asks for a job category, pass it as 'category'"
+        + (f" (one of: {', '.join(known_categories)})" if known_categories else "")
+        + ". When the user asks about specific candidate IDs, pass them as 'candidate_ids'. "
+        "For multi-part requests (e.g. several roles), prefer one 'retrieve_resumes_batch_tool(queries,k,category,candidate_ids)' call with one query per part; "
+        "otherwise call retrieve_resumes_tool once per part in the same turn so the searches run in parallel. "
         "When asked to shortlist candidates, return a numbered shortlist with concise reasons for each candidate (skills match, experience, keywords), "
         "Keep responses professional and HR-friendly."
         "Strictly Answer in the same language as the user input."
     )
     # Inisialisasi agen ReAct, memberikan LLM dan alat retrieval.
-    agent = create_react_agent(model=llm, tools=[retrieve_resumes_tool])
+    agent = create_react_agent(model=llm, tools=[retrieve_resumes_tool, retrieve_resumes_batch_tool])
 
-    # Fungsi untuk menjalankan agen dengan query pengguna dan memproses seluruh rantai respons.
-    def invoke_agent(user_query: str) -> Dict[str, Any]:
-        # Susun input dengan pesan sistem dan pengguna.
-        input_messages = [{"role": "system", "content": AGENT_PROMPT}, {"role": "user", "content": user_query}]
-        # Invoke agent, yang mungkin menggunakan tool calls internal.
-        result = agent.invoke({"messages": input_messages})
-        messages = result.get("messages", [])
+    # Merangkum pesan-pesan hasil agen menjadi respons akhir (jawaban, data tools, dan metric penggunaan).
+    def summarize_messages(messages: List[Any]) -> Dict[str, Any]:
         # Ekstrak jawaban akhir dari agen.
         assistant_message = messages[-1].content if messages else "(no assistant content)"
         
@@ -253,17 +371,131 @@ def main_app():
         # Hitung perkiraan penggunaan token untuk estimasi biaya.
         total_input_tokens, total_output_tokens = 0, 0
         for m in messages:
-            # Ambil metadata penggunaan token.
-            usage = (getattr(m, "response_metadata", {}).get("token_usage") or {})
-            total_input_tokens += usage.get("prompt_tokens", 0)
-            total_output_tokens += usage.get("completion_tokens", 0)
+            # Ambil metadata penggunaan token (usage_metadata saat streaming, token_usage untuk respons biasa).
+            if usage := getattr(m, "usage_metadata", None):
+                total_input_tokens += usage.get("input_tokens", 0)
+                total_output_tokens += usage.get("output_tokens", 0)
+            else:
+                usage = (getattr(m, "response_metadata", {}).get("token_usage") or {})
+                total_input_tokens += usage.get("prompt_tokens", 0)
+                total_output_tokens += usage.get("completion_tokens", 0)
             
         # Perkirakan biaya panggilan LLM (asumsi 1 USD = 17000 rupiah).
         price_idr = 17000 * (total_input_tokens * 0.15 + total_output_tokens * 0.6) / 1_000_000
-        
-        # Kembalikan respons agen akhir, tools data, dan metric penggunaan.
         return {"answer": assistant_message, "parsed_tool_results": parsed_tool_results, "total_input_tokens": total_input_tokens, "total_output_tokens": total_output_tokens, "price_idr": price_idr}
 
+    # Menjalankan agen dalam mode streaming: token jawaban di-yield satu per satu (untuk st.write_stream),
+    # hasil tool retrieval dikirim ke `on_tool_results` segera setelah ToolMessage diterima,
+    # dan respons lengkap (format sama seperti invoke_agent) ditulis ke `resp_out` di akhir.
+    def stream_agent(user_query: str, resp_out: Dict[str, Any], on_tool_results: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Iterator[str]:
+        # Susun input dengan pesan sistem dan pengguna.
+        input_messages = [{"role": "system", "content": AGENT_PROMPT}, {"role": "user", "content": user_query}]
+        for tier in embed_cache_usage: embed_cache_usage[tier] = 0
+        trace = active_trace["trace"] = RequestTrace("chat", query_chars=len(user_query))
+
+        # Cache jawaban semantik: query yang hampir sama dengan query sebelumnya tidak menjalankan agen lagi.
+        # Embedding query dihitung di loop latar belakang bersamaan dengan giliran LLM pertama, sehingga cache
+        # miss tidak menunggu satu round trip embedding sebelum agen mulai. Hasilnya diperiksa saat event agen
+        # pertama tiba (sebelum ada token yang ditampilkan); cache hit menghentikan stream agen.
+        lookup_start = time.perf_counter()
+        query_lookup = background_loop.submit(query_embedder.alookup(user_query))
+
+        def check_answer_cache():
+            query_vector, tier = query_lookup.result()
+            cached = answer_cache.get(query_vector)
+            trace.add_span("answer_cache.lookup", lookup_start, time.perf_counter(), embed_cache=tier, hit=cached is not None)
+            embed_cache_usage[tier] += 1
+            return query_vector, cached
+
+        # Stream agen (async, di event loop latar belakang): mode "messages" berisi token LLM,
+        # mode "updates" berisi pesan lengkap per node (agent/tools).
+        messages = []
+        query_vector, cached = None, None
+        # Satu giliran LLM dimulai di awal stream atau setelah tool selesai, dan berakhir saat node "agent" mengirim pesannya.
+        turn_start, first_token = time.perf_counter(), None
+        agent_stream = agent.astream({"messages": input_messages}, stream_mode=["messages", "updates"])
+        events = background_loop.iterate(agent_stream)
+        for mode, data in events:
+            if query_vector is None:
+                query_vector, cached = check_answer_cache()
+                if cached:
+                    events.close()
+                    break
+            if mode == "messages":
+                chunk, meta = data
+                if isinstance(chunk, AIMessageChunk) and meta.get("langgraph_node") == "agent" and first_token is None:
+                    first_token = time.perf_counter()
+                if isinstance(chunk, AIMessageChunk) and isinstance(chunk.content, str) and chunk.content and meta.get("langgraph_node") == "agent":
+                    yield chunk.content
+            else:
+                now = time.perf_counter()
+                for node, update in data.items():
+                    new_messages = update.get("messages", []) if isinstance(update, dict) else []
+                    messages.extend(new_messages)
+                    if node == "agent":
+                        for m in new_messages:
+                            usage = getattr(m, "usage_metadata", None) or {}
+                            trace.add_span(
+                                "llm.turn", turn_start, now, ttft_ms=round((first_token - turn_start) * 1000, 2) if first_token else None,
+                                input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0),
+                                tool_calls=len(getattr(m, "tool_calls", None) or []),
+                            )
+                    # Tampilkan kandidat segera setelah tool retrieval selesai, sebelum jawaban akhir.
+                    tool_results = [r for m in new_messages if isinstance(m, ToolMessage) for r in (parse_tool_message_json(m.content) or [])]
+                    if on_tool_results and tool_results:
+                        on_tool_results(tool_results)
+                turn_start, first_token = time.perf_counter(), None
+        if query_vector is None:
+            query_vector, cached = check_answer_cache()
+        if cached:
+            cached_resp, similarity = cached
+            # Cache hit tidak memakai jawaban LLM, sehingga token dan biaya dihitung nol.
+            resp_out.update({**cached_resp, "total_input_tokens": 0, "total_output_tokens": 0, "price_idr": 0.0,
+                             "embed_cache": dict(embed_cache_usage), "answer_cache_similarity": similarity})
+            if on_tool_results and cached_resp["parsed_tool_results"]:
+                on_tool_results(cached_resp["parsed_tool_results"])
+            yield cached_resp["answer"]
+            finish_trace(trace, resp_out, cache_hit=True)
+            return
+
+        resp = {**summarize_messages(messages), "embed_cache": dict(embed_cache_usage)}
+        # Simpan ke cache jawaban, kecuali jika retrieval gagal.
+        if not any("error" in r for r in resp["parsed_tool_results"]):
+            answer_cache.put(query_vector, {"answer": resp["answer"], "parsed_tool_results": resp["parsed_tool_results"]})
+        resp_out.update(resp)
+        tool_messages = [m for m in messages if isinstance(m, ToolMessage)]
+        finish_trace(
+            trace, resp_out, cache_hit=False,
+            llm_turns=sum(1 for span in trace.spans if span["name"] == "llm.turn"),
+            tool_calls=len(tool_messages), tool_payload_bytes=sum(len(str(m.content).encode("utf-8")) for m in tool_messages),
+        )
+
+    # Menutup trace permintaan dan mengirimnya ke penulis trace (non-blocking).
+    def finish_trace(trace: RequestTrace, resp: Dict[str, Any], **attrs):
+        active_trace["trace"] = None
+        if trace_writer is not None:
+            trace_writer.write(trace.finish(
+                input_tokens=resp.get("total_input_tokens", 0), output_tokens=resp.get("total_output_tokens", 0),
+                embed_cache=resp.get("embed_cache"), **attrs,
+            ))
+
+    # Fungsi untuk menjalankan agen dengan query pengguna dan memproses seluruh rantai respons (tanpa streaming).
+    def invoke_agent(user_query: str) -> Dict[str, Any]:
+        resp: Dict[str, Any] = {}
+        for _ in stream_agent(user_query, resp):
+            pass
+        # Kembalikan respons agen akhir, tools data, dan metric penggunaan.
+        return resp
+
+    # Panel latensi: p50/p95 per tahap dari trace terbaru (semua session di proses ini).
+    if trace_writer is not None:
+        with st.sidebar.expander("Latency (p50 / p95)"):
+            if summary := summarize_traces(list(trace_writer.recent)):
+                st.caption(f"Last {len(trace_writer.recent)} requests, traces in `{trace_writer.path}`")
+                st.dataframe(summary, hide_index=True, use_container_width=True)
+            else:
+                st.caption("No traced requests yet.")
+
     # Main title dan deskripsi aplikasi.
     st.title("SmartHire | AI Resume Assistant 📝⭐")
     st.caption("Search for Candidates, Summarize Resumes, and Shortlist using RAG + LLM")
@@ -287,11 +519,20 @@ def main_app():
         
         # Tampilkan indikator "Processing" saat agen loading.
         with st.chat_message("assistant"):
+            # Preview kandidat muncul segera setelah retrieval selesai; kartu lengkap ditampilkan setelah jawaban akhir.
+            preview = st.container()
+            def show_candidate_preview(results: List[Dict[str, Any]]):
+                with preview:
+                    st.caption(f"Retrieved {len(results)} candidate items, writing answer...")
+                    for c in results:
+                        if "error" in c:
+                            st.warning(c["error"])
+                        else:
+                            st.markdown(f"- Candidate ID `{c.get('ID')}` — {c.get('Category') or '—'} — Score: {float(c.get('score') or 0):.4f} ({score_kind(c)})")
             with st.spinner("Processing..."):
-                # Panggil agen dengan query pengguna.
-                resp = invoke_agent(user_input)
-                # Tampilkan respons teks akhir dari agen.
-                st.markdown(resp["answer"])
+                # Panggil agen dengan query pengguna dan stream jawaban token per token.
+                resp: Dict[str, Any] = {}
+                st.write_stream(stream_agent(user_input, resp, on_tool_results=show_candidate_preview))
                 # Simpan respons akhir dan data raw dari agen.
                 st.session_state.messages.append({"role": "assistant", "content": resp["answer"]})
                 st.session_state.last_response = resp
@@ -305,16 +546,25 @@ def main_app():
                 # Ulangi setiap kandidat yang diambil untuk menampilkan detail dan opsi shortlist.
                 for i, c in enumerate(results, start=1):
                     # Pastikan data kandidat terstruktur dengan benar untuk ditampilkan.
-                    candidate = {"qdrant_id": c.get("qdrant_id", ""),"ID": c.get("ID") or c.get("id"),"Category": c.get("Category"),"content": c.get("content") or "","snippets": c.get("snippets") or [],"score": float(c.get("score") or 0)}
+                    candidate = {"qdrant_id": c.get("qdrant_id", ""),"ID": c.get("ID") or c.get("id"),"Category": c.get("Category"),"snippets": c.get("snippets") or [],"score": float(c.get("score") or 0)}
                     
-                    # Tampilkan informasi ringkasan kandidat.
-                    st.markdown(f"--- \n ### {i}. Candidate ID: `{candidate['ID']}` — Score: {candidate['score']:.4f}")
+                    # Tampilkan informasi ringkasan kandidat (jenis skor mengikuti sumber retrieval-nya).
+                    st.markdown(f"--- \n ### {i}. Candidate ID: `{candidate['ID']}` — Score: {candidate['score']:.4f} ({score_kind(c)})")
                     st.markdown(f"**Category:** {candidate.get('Category') or '—'}")
                     
                     # Tampilkan snippet teks yang paling relevan dari resume sebagai bukti.
                     if candidate["snippets"]:
                         st.markdown("**Evidence (snippets):**")
                         for s in candidate["snippets"]: st.code(s[:800], language=None)
+
+                    # Metadata lengkap resume dibaca dari side store hanya saat user membukanya.
+                    if resume_store is not None and st.toggle("Show resume details", key=f"details_{candidate['ID']}_{i}"):
+                        details = resume_store.get(str(candidate["ID"]))
+                        if details:
+                            st.json({k: v for k, v in details.items() if k != "resume_text"}, expanded=False)
+                            st.text_area("Resume text", value=details.get("resume_text", ""), height=250, key=f"resume_text_{candidate['ID']}_{i}")
+                        else:
+                            st.caption("No stored details for this candidate.")
                         
                     # Buat dua kolom untuk notes dan shortlist.
                     col1, col2 = st.columns([2, 1])
@@ -339,6 +589,17 @@ def main_app():
         # Tampilkan estimasi penggunaan token dan biaya yang dihitung untuk interaksi terakhir.
         with st.expander("Usage & Price Estimate"):
             st.code(f'Input tokens (est): {resp["total_input_tokens"]}\nOutput tokens (est): {resp["total_output_tokens"]}\nEstimated price (IDR): {resp["price_idr"]:,.2f}')
+            # Status cache jawaban semantik untuk permintaan terakhir.
+            if (similarity := resp.get("answer_cache_similarity")) is not None:
+                st.code(f"Answer cache: hit (similarity {similarity:.3f}), agent stopped before answering")
+            else:
+                st.code(f"Answer cache: miss (hits {answer_cache.hits}, misses {answer_cache.misses} since start)")
+            # Hit/miss cache embedding query: untuk permintaan terakhir dan total sejak proses dimulai.
+            last, total = resp.get("embed_cache") or {}, query_embedder.counters
+            st.code(
+                f'Query embedding cache (last request): memory hits {last.get("memory", 0)}, disk hits {last.get("disk", 0)}, misses {last.get("miss", 0)}\n'
+                f'Query embedding cache (process total): memory hits {total["memory"]}, disk hits {total["disk"]}, misses {total["miss"]}'
+            )
 
 
 # --- Main Execution Block ---
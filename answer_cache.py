@@ -0,0 +1,80 @@
+# Cache Jawaban Semantik untuk Agen SmartHire
+
+"""
+Cache jawaban agen dengan key embedding query:
+- Query baru dianggap sama jika cosine similarity-nya >= threshold terhadap query yang sudah dijawab.
+- Entri kedaluwarsa setelah TTL, dan entri yang paling lama tidak dipakai dibuang jika cache penuh.
+"""
+
+import time
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Cache jawaban di memori proses. Nilai yang disimpan adalah dict respons `invoke_agent`
+    (jawaban + parsed_tool_results), sehingga cache hit tetap bisa menampilkan kartu kandidat.
+    """
+
+    def __init__(self, threshold: float = 0.97, ttl_seconds: float = 1800, max_entries: int = 256):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((0, 0), dtype=np.float32)  # Matriks vektor unit (satu baris per entri)
+        self._entries: List[Dict[str, Any]] = []            # {"created", "last_used", "value"} sejajar dengan _vectors
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def _drop(self, keep: np.ndarray):
+        self._vectors = self._vectors[keep]
+        self._entries = [e for e, k in zip(self._entries, keep) if k]
+
+    def get(self, vector: Sequence[float]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Mencari jawaban untuk query yang mirip.
+        Hasilnya: (respons tersimpan, similarity) atau None jika tidak ada yang melewati threshold.
+        """
+        q = self._unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            if self._entries:
+                # Buang entri yang sudah melewati TTL sebelum mencari.
+                alive = np.array([now - e["created"] < self.ttl_seconds for e in self._entries])
+                if not alive.all():
+                    self._drop(alive)
+            if self._entries and self._vectors.shape[1] == q.shape[0]:
+                sims = self._vectors @ q
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    entry = self._entries[best]
+                    entry["last_used"] = now
+                    self.hits += 1
+                    return entry["value"], float(sims[best])
+            self.misses += 1
+            return None
+
+    def put(self, vector: Sequence[float], value: Dict[str, Any]):
+        """Menyimpan respons untuk query; entri yang paling lama tidak dipakai dibuang jika cache penuh."""
+        q = self._unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            if not self._entries or self._vectors.shape[1] != q.shape[0]:
+                self._vectors = np.zeros((0, q.shape[0]), dtype=np.float32)
+                self._entries = []
+            self._vectors = np.vstack([self._vectors, q[None, :]])
+            self._entries.append({"created": now, "last_used": now, "value": value})
+            if len(self._entries) > self.max_entries:
+                lru = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_used"])
+                keep = np.ones(len(self._entries), dtype=bool)
+                keep[lru] = False
+                self._drop(keep)
@@ -0,0 +1,472 @@
+# Backend Vector Store dan Embedding yang Bisa Dipilih
+
+"""
+Backend pengganti untuk pengembangan lokal, benchmark, dan demo tanpa jaringan.
+Dipilih lewat env / Streamlit secrets:
+- VECTOR_BACKEND:
+    "qdrant" (default) -> Qdrant remote (QDRANT_URL + QDRANT_API_KEY)
+    "local"            -> Qdrant embedded (QDRANT_PATH: folder lokal, atau ":memory:")
+    "numpy"            -> matriks float32 memory-mapped dengan top-k cosine brute force (NUMPY_STORE_PATH)
+- EMBEDDING_BACKEND:
+    "openai" (default) -> OpenAI Embeddings API
+    "local"            -> embedding hashing deterministik (tanpa jaringan, LOCAL_EMBED_DIM dimensi)
+Backend "numpy" meniru subset API QdrantClient yang dipakai ingest dan retrieval,
+sehingga `ingest_resume_csv_qdrant.main` dan `get_relevant_resumes` berjalan tanpa perubahan.
+"""
+
+import os
+import json
+import zlib
+import shutil
+import threading
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.models import (
+    ScoredPoint, PointGroup, GroupsResult, QueryResponse, Record, CountResult,
+    Filter, FieldCondition, MatchValue, MatchAny, PointIdsList,
+)
+
+from lexical_index import tokenize
+
+VECTOR_BACKENDS = ("qdrant", "local", "numpy")
+EMBEDDING_BACKENDS = ("openai", "local")
+# Lokasi default penyimpanan backend lokal.
+QDRANT_PATH_DEFAULT = "qdrant_local"
+NUMPY_STORE_PATH_DEFAULT = "vector_store"
+# Embedding lokal: nama model (termasuk dimensi) dipakai sebagai key cache embedding, terpisah dari vektor OpenAI.
+LOCAL_EMBED_DIM = int(os.getenv("LOCAL_EMBED_DIM", "256"))
+LOCAL_EMBEDDING_MODEL = f"local-hash-{LOCAL_EMBED_DIM}"
+
+
+# ----------------------------------------------------------------------
+# Embedding lokal
+# ----------------------------------------------------------------------
+
+class HashingEmbedder:
+    """
+    Embedding deterministik tanpa jaringan: feature hashing (dengan tanda) dari unigram dan bigram token,
+    lalu dinormalisasi L2. Teks yang berbagi kata kunci mendapat cosine similarity tinggi, cukup untuk
+    pengujian fungsional, benchmark, dan demo offline (bukan pengganti kualitas model OpenAI).
+    Menyediakan `embed_documents` / `aembed_documents` seperti OpenAIEmbeddings.
+    """
+
+    def __init__(self, dim: int = LOCAL_EMBED_DIM):
+        self.dim = dim
+
+    def embed_one(self, text: str) -> List[float]:
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vec = np.zeros(self.dim, dtype=np.float32)
+        if features:
+            hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vec, (hashes % self.dim).astype(np.int64), signs)
+        norm = np.linalg.norm(vec)
+        return (vec / norm if norm > 0 else vec).tolist()
+
+    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_one(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_one(text)
+
+    async def aembed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+
+# ----------------------------------------------------------------------
+# Vector store NumPy (memory-mapped, brute force)
+# ----------------------------------------------------------------------
+
+def _matches(payload: Dict[str, Any], query_filter: Optional[Filter]) -> bool:
+    """Mengevaluasi filter `must` dengan kondisi MatchValue / MatchAny (subset yang dipakai retrieval)."""
+    if query_filter is None:
+        return True
+    for cond in query_filter.must or []:
+        if not isinstance(cond, FieldCondition):
+            raise NotImplementedError(f"NumpyVectorStore: unsupported filter condition {type(cond).__name__}")
+        value = payload.get(cond.key)
+        if isinstance(cond.match, MatchValue):
+            if value != cond.match.value:
+                return False
+        elif isinstance(cond.match, MatchAny):
+            if value not in cond.match.any:
+                return False
+        else:
+            raise NotImplementedError(f"NumpyVectorStore: unsupported match {type(cond.match).__name__}")
+    return True
+
+
+def _select_payload(payload: Dict[str, Any], with_payload) -> Optional[Dict[str, Any]]:
+    if with_payload is False or with_payload is None:
+        return None
+    if with_payload is True:
+        return dict(payload)
+    return {k: payload[k] for k in with_payload if k in payload}
+
+
+class _NumpyCollection:
+    """
+    Satu collection: vektor ternormalisasi di file memmap `vectors.f32` (kapasitas tumbuh 2x),
+    serta log append-only `points.jsonl` (upsert/delete) untuk ID dan payload yang diputar ulang saat dibuka.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if dim is None:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            dim = meta["dim"]
+            self.payload_schema = meta.get("payload_schema", {})
+        else:
+            # Collection baru: hapus sisa file lama di folder yang sama.
+            os.makedirs(path, exist_ok=True)
+            for fname in ("vectors.f32", "points.jsonl", "meta.json"):
+                if os.path.exists(os.path.join(path, fname)):
+                    os.remove(os.path.join(path, fname))
+            self.payload_schema = {}
+        self.dim = dim
+        self.ids: List[str] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.row_of: Dict[str, int] = {}
+        self.rows_by_id: Dict[Any, set] = {}  # Index payload "ID" -> baris aktif (pengganti index keyword Qdrant)
+        self._alive: Optional[np.ndarray] = None  # Cache baris aktif tanpa filter (direset saat upsert/delete)
+        self._vectors = None
+        self._open_vectors(max(1024, self._replay_log()))
+        self._save_meta()
+
+    def _replay_log(self) -> int:
+        log_path = os.path.join(self.path, "points.jsonl")
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                for line in f:
+                    rec = json.loads(line)
+                    if rec["op"] == "upsert":
+                        self._set(rec["id"], rec["payload"])
+                    else:
+                        self._unset(rec["id"])
+        self._log = open(log_path, "a", encoding="utf-8")
+        return len(self.ids)
+
+    def _open_vectors(self, capacity: int):
+        vec_path = os.path.join(self.path, "vectors.f32")
+        existing = os.path.getsize(vec_path) // (4 * self.dim) if os.path.exists(vec_path) else 0
+        capacity = max(capacity, existing)
+        if existing < capacity:
+            with open(vec_path, "ab") as f:
+                f.truncate(capacity * 4 * self.dim)
+        self._vectors = np.memmap(vec_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _save_meta(self):
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({"dim": self.dim, "distance": "Cosine", "payload_schema": self.payload_schema}, f)
+
+    def _set(self, pid: str, payload: Dict[str, Any]) -> int:
+        self._alive = None
+        row = self.row_of.get(pid)
+        if row is None:
+            row = len(self.ids)
+            self.row_of[pid] = row
+            self.ids.append(pid)
+            self.payloads.append(payload)
+        else:
+            self._unindex(row)
+            self.payloads[row] = payload
+        self.rows_by_id.setdefault(payload.get("ID"), set()).add(row)
+        return row
+
+    def _unset(self, pid: str):
+        self._alive = None
+        row = self.row_of.pop(pid, None)
+        if row is not None:
+            self._unindex(row)
+            self.payloads[row] = None  # Baris kosong (tombstone) dilewati saat pencarian
+
+    def _unindex(self, row: int):
+        rows = self.rows_by_id.get(self.payloads[row].get("ID"))
+        if rows is not None:
+            rows.discard(row)
+
+    def upsert(self, points):
+        for p in points:
+            pid = str(p.id)
+            vec = np.asarray(p.vector, dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            row = self._set(pid, p.payload or {})
+            if row >= self._vectors.shape[0]:
+                self._vectors.flush()
+                self._open_vectors(self._vectors.shape[0] * 2)
+            self._vectors[row] = vec / norm if norm > 0 else vec
+            self._log.write(json.dumps({"op": "upsert", "id": pid, "payload": p.payload or {}}, ensure_ascii=False, default=str) + "\n")
+        self._log.flush()
+
+    def delete(self, ids: Sequence[str]):
+        for pid in ids:
+            self._unset(str(pid))
+            self._log.write(json.dumps({"op": "delete", "id": str(pid)}) + "\n")
+        self._log.flush()
+
+    def alive_rows(self, query_filter: Optional[Filter] = None) -> np.ndarray:
+        if query_filter is None:
+            if self._alive is None:
+                self._alive = np.asarray([i for i, p in enumerate(self.payloads) if p is not None], dtype=np.int64)
+            return self._alive
+        # Filter dengan kondisi "ID" hanya memeriksa baris milik ID tersebut (lewat index), bukan semua baris.
+        candidates = range(len(self.payloads))
+        for cond in query_filter.must or []:
+            if isinstance(cond, FieldCondition) and cond.key == "ID":
+                values = [cond.match.value] if isinstance(cond.match, MatchValue) else cond.match.any
+                candidates = sorted(set().union(*(self.rows_by_id.get(v, ()) for v in values)))
+                break
+        return np.asarray([i for i in candidates if self.payloads[i] is not None and _matches(self.payloads[i], query_filter)], dtype=np.int64)
+
+    def scores(self, query: Sequence[float], rows: np.ndarray) -> np.ndarray:
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        q = q / norm if norm > 0 else q
+        return self._vectors[rows] @ q
+
+    def close(self):
+        self._vectors.flush()
+        self._log.close()
+
+
+class NumpyVectorStore:
+    """
+    Pengganti QdrantClient berbasis NumPy untuk dataset kecil (ribuan sampai ratusan ribu chunk):
+    top-k cosine dihitung brute force atas matriks memmap. Hanya subset API yang dipakai repo ini
+    yang diimplementasikan: collection_exists, create_collection, delete_collection, get_collection, create_payload_index,
+    upsert, delete, retrieve, scroll, count, query_points, query_points_groups, query_batch_points.
+    """
+
+    def __init__(self, path: str = NUMPY_STORE_PATH_DEFAULT):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._collections: Dict[str, _NumpyCollection] = {}
+        self._lock = threading.RLock()
+
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _get(self, name: str) -> _NumpyCollection:
+        with self._lock:
+            if name not in self._collections:
+                if not self.collection_exists(name):
+                    raise ValueError(f"Collection {name} not found")
+                self._collections[name] = _NumpyCollection(self._dir(name))
+            return self._collections[name]
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self._dir(collection_name), "meta.json"))
+
+    def create_collection(self, collection_name: str, vectors_config, **kwargs) -> bool:
+        with self._lock:
+            self._collections[collection_name] = _NumpyCollection(self._dir(collection_name), dim=vectors_config.size)
+        return True
+
+    def delete_collection(self, collection_name: str, **kwargs) -> bool:
+        with self._lock:
+            if coll := self._collections.pop(collection_name, None):
+                coll.close()
+            if not os.path.isdir(self._dir(collection_name)):
+                return False
+            shutil.rmtree(self._dir(collection_name))
+        return True
+
+    def get_collection(self, collection_name: str):
+        coll = self._get(collection_name)
+        return SimpleNamespace(
+            config=SimpleNamespace(params=SimpleNamespace(vectors=SimpleNamespace(size=coll.dim)), quantization_config=None),
+            payload_schema=dict(coll.payload_schema),
+            points_count=len(coll.row_of),
+        )
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema=None, **kwargs):
+        # Tidak ada index sungguhan (filter dievaluasi brute force); schema dicatat agar ingest tidak membuat ulang.
+        with self._lock:
+            coll = self._get(collection_name)
+            coll.payload_schema[field_name] = str(field_schema)
+            coll._save_meta()
+
+    def upsert(self, collection_name: str, points, wait: bool = True, **kwargs):
+        with self._lock:
+            self._get(collection_name).upsert(points)
+
+    def delete(self, collection_name: str, points_selector, wait: bool = True, **kwargs):
+        if not isinstance(points_selector, PointIdsList):
+            raise NotImplementedError("NumpyVectorStore.delete only supports PointIdsList")
+        with self._lock:
+            self._get(collection_name).delete(points_selector.points)
+
+    def count(self, collection_name: str, exact: bool = True, **kwargs) -> CountResult:
+        return CountResult(count=len(self._get(collection_name).row_of))
+
+    def retrieve(self, collection_name: str, ids: Sequence[Any], with_payload=True, with_vectors=False, **kwargs) -> List[Record]:
+        with self._lock:
+            coll = self._get(collection_name)
+            rows = [coll.row_of[str(i)] for i in ids if str(i) in coll.row_of]
+            return [
+                Record(id=coll.ids[r], payload=_select_payload(coll.payloads[r], with_payload),
+                       vector=coll._vectors[r].tolist() if with_vectors else None)
+                for r in rows
+            ]
+
+    def scroll(self, collection_name: str, limit: int = 10, offset=None, with_payload=True, with_vectors=False,
+               scroll_filter: Optional[Filter] = None, **kwargs) -> Tuple[List[Record], Optional[int]]:
+        with self._lock:
+            coll = self._get(collection_name)
+            rows = coll.alive_rows(scroll_filter)
+            start = int(offset or 0)
+            page = rows[start : start + limit]
+            records = [
+                Record(id=coll.ids[r], payload=_select_payload(coll.payloads[r], with_payload),
+                       vector=coll._vectors[r].tolist() if with_vectors else None)
+                for r in page
+            ]
+        next_offset = start + limit if start + limit < len(rows) else None
+        return records, next_offset
+
+    def _scored(self, coll: _NumpyCollection, row: int, score: float, with_payload) -> ScoredPoint:
+        return ScoredPoint(id=coll.ids[row], version=0, score=float(score), payload=_select_payload(coll.payloads[row], with_payload))
+
+    def query_points(self, collection_name: str, query, limit: int = 10, with_payload=True,
+                     query_filter: Optional[Filter] = None, **kwargs) -> QueryResponse:
+        with self._lock:
+            coll = self._get(collection_name)
+            rows = coll.alive_rows(query_filter)
+            if len(rows) == 0:
+                return QueryResponse(points=[])
+            scores = coll.scores(query, rows)
+            top = np.argsort(-scores, kind="stable")[:limit]
+            return QueryResponse(points=[self._scored(coll, rows[i], scores[i], with_payload) for i in top])
+
+    def query_batch_points(self, collection_name: str, requests: Sequence[Any], **kwargs) -> List[QueryResponse]:
+        # Request dengan filter yang sama dihitung sekaligus: satu perkalian matriks (baris x query).
+        with self._lock:
+            coll = self._get(collection_name)
+            results: List[Optional[QueryResponse]] = [None] * len(requests)
+            by_filter: Dict[str, List[int]] = {}
+            for i, req in enumerate(requests):
+                key = req.filter.model_dump_json() if req.filter is not None else ""
+                by_filter.setdefault(key, []).append(i)
+            for idxs in by_filter.values():
+                rows = coll.alive_rows(requests[idxs[0]].filter)
+                if len(rows) == 0:
+                    for i in idxs:
+                        results[i] = QueryResponse(points=[])
+                    continue
+                q = np.asarray([requests[i].query for i in idxs], dtype=np.float32)
+                norms = np.linalg.norm(q, axis=1, keepdims=True)
+                scores = coll._vectors[rows] @ (q / np.where(norms > 0, norms, 1)).T
+                for col, i in enumerate(idxs):
+                    req = requests[i]
+                    top = np.argsort(-scores[:, col], kind="stable")[: req.limit or 10]
+                    results[i] = QueryResponse(points=[self._scored(coll, rows[j], scores[j, col], req.with_payload) for j in top])
+            return results
+
+    def query_points_groups(self, collection_name: str, query, group_by: str, limit: int = 10, group_size: int = 3,
+                            with_payload=True, query_filter: Optional[Filter] = None, **kwargs) -> GroupsResult:
+        with self._lock:
+            coll = self._get(collection_name)
+            rows = coll.alive_rows(query_filter)
+            groups: Dict[Any, List[ScoredPoint]] = {}
+            if len(rows):
+                scores = coll.scores(query, rows)
+                for i in np.argsort(-scores, kind="stable"):
+                    key = coll.payloads[rows[i]].get(group_by)
+                    if key is None:
+                        continue
+                    if key not in groups:
+                        if len(groups) >= limit:
+                            continue
+                        groups[key] = []
+                    if len(groups[key]) < group_size:
+                        groups[key].append(self._scored(coll, rows[i], scores[i], with_payload))
+                    if len(groups) >= limit and all(len(h) >= group_size for h in groups.values()):
+                        break
+            return GroupsResult(groups=[PointGroup(id=k, hits=h) for k, h in groups.items()])
+
+    def close(self):
+        with self._lock:
+            for coll in self._collections.values():
+                coll.close()
+            self._collections.clear()
+
+
+# ----------------------------------------------------------------------
+# Pemilihan backend
+# ----------------------------------------------------------------------
+
+class AsyncClientAdapter:
+    """
+    Membungkus client sinkron (Qdrant embedded / NumpyVectorStore) dengan method async.
+    Backend lokal berjalan di dalam proses, sehingga tidak ada I/O jaringan yang bisa di-overlap;
+    adapter ini hanya menyediakan antarmuka yang sama seperti AsyncQdrantClient.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+def make_qdrant_client(backend: str = "qdrant", url: Optional[str] = None, api_key: Optional[str] = None,
+                       path: Optional[str] = None, timeout: Optional[int] = None):
+    """Membuat client vector store sinkron sesuai backend."""
+    if backend == "qdrant":
+        kwargs = {"timeout": timeout} if timeout else {}
+        return QdrantClient(url=url, api_key=api_key, **kwargs)
+    if backend == "local":
+        path = path or QDRANT_PATH_DEFAULT
+        return QdrantClient(location=":memory:") if path == ":memory:" else QdrantClient(path=path)
+    if backend == "numpy":
+        return NumpyVectorStore(path or NUMPY_STORE_PATH_DEFAULT)
+    raise ValueError(f"Unknown VECTOR_BACKEND: {backend} (use one of {', '.join(VECTOR_BACKENDS)})")
+
+
+@lru_cache(maxsize=None)
+def shared_qdrant_client(backend: str = "qdrant", url: Optional[str] = None, api_key: Optional[str] = None,
+                         path: Optional[str] = None, timeout: Optional[int] = None):
+    """
+    Satu client per konfigurasi untuk seluruh proses (dipakai bersama oleh semua halaman Streamlit).
+    Qdrant embedded mengunci foldernya, sehingga halaman lain tidak boleh membuka client kedua.
+    Client ini tidak boleh di-close oleh pemakainya.
+    """
+    return make_qdrant_client(backend, url=url, api_key=api_key, path=path, timeout=timeout)
+
+
+def make_async_qdrant_client(backend: str = "qdrant", url: Optional[str] = None, api_key: Optional[str] = None,
+                             timeout: Optional[int] = None, sync_client=None):
+    """
+    Membuat client async. Backend lokal tidak bisa dibuka dua kali di satu proses (Qdrant embedded
+    mengunci foldernya), sehingga client sinkron yang sama dibungkus dengan AsyncClientAdapter.
+    """
+    if backend == "qdrant":
+        kwargs = {"timeout": timeout} if timeout else {}
+        return AsyncQdrantClient(url=url, api_key=api_key, **kwargs)
+    if sync_client is None:
+        raise ValueError("sync_client is required for local vector backends")
+    return AsyncClientAdapter(sync_client)
+
+
+def required_settings(vector_backend: str, embedding_backend: str) -> List[str]:
+    """Nama setting (env/secrets) yang wajib diisi untuk kombinasi backend yang dipilih."""
+    required = []
+    if vector_backend == "qdrant":
+        required += ["QDRANT_URL", "QDRANT_API_KEY"]
+    if embedding_backend == "openai":
+        required += ["OPENAI_API_KEY"]
+    return required
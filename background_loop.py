@@ -0,0 +1,56 @@
+# Event Loop Latar Belakang untuk Jalur Async Aplikasi
+
+"""
+Streamlit menjalankan script secara sinkron, sedangkan agen dan tool retrieval berjalan async
+(AsyncQdrantClient, embedding async) agar beberapa tool call dalam satu giliran LLM berjalan bersamaan.
+Modul ini menyediakan satu event loop persisten di thread daemon:
+- Client async (HTTP connection pool) selalu dipakai di loop yang sama, sehingga aman disimpan di cache resource.
+- Coroutine dan async generator bisa dipakai dari kode sinkron (mis. sebagai input `st.write_stream`).
+"""
+
+import asyncio
+import threading
+import concurrent.futures
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """Event loop asyncio yang berjalan terus di thread daemon terpisah."""
+
+    def __init__(self, name: str = "smarthire-async"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Menjadwalkan coroutine di loop latar belakang tanpa menunggu; hasilnya diambil lewat `.result()`."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Menjalankan coroutine di loop latar belakang dan menunggu hasilnya (blocking)."""
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Mengubah async generator menjadi generator sinkron: setiap item diambil di loop latar belakang,
+        lalu di-yield di thread pemanggil (thread script Streamlit).
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Jika konsumen berhenti di tengah jalan (mis. rerun Streamlit), tutup generator di loop-nya.
+            aclose = getattr(agen, "aclose", None)
+            if aclose is not None:
+                try:
+                    self.run(aclose())
+                except Exception:
+                    pass
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,90 @@
+# Micro-benchmark: Persiapan Baris Ingest (iterrows vs vectorized)
+
+"""
+Membandingkan persiapan baris ingest versi lama (df.iterrows, cek per sel) dengan
+`prepare_frame` (kolom-per-kolom) pada CSV sintetis.
+
+Jalankan:
+    python benchmarks/bench_prepare_rows.py [jumlah_baris]   (default 100000)
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ingest_resume_csv_qdrant as ingest  # noqa: E402
+from synthetic import write_synthetic_csv  # noqa: E402
+
+
+def legacy_prepare(df: pd.DataFrame, preferred: str, cleaned: dict):
+    """Implementasi lama (per baris dengan iterrows), disimpan sebagai pembanding."""
+    out = []
+    for idx, row in df.iterrows():
+        if preferred == "Resume_html":
+            text_raw = cleaned.get(idx, "")
+        else:
+            val = row.get(preferred, "")
+            text_raw = str(val) if pd.notna(val) else ""
+            if not text_raw:
+                text_raw = cleaned.get(idx, "")
+        if not text_raw:
+            parts = []
+            for c in df.columns:
+                if c == "Resume_html": continue
+                v = row.get(c)
+                if pd.isna(v) or v is None: continue
+                s = str(v).strip()
+                if s: parts.append(f"{c}: {s}")
+            text_raw = "\n".join(parts)
+        if not text_raw:
+            continue
+        row_payload_base = {}
+        for c in df.columns:
+            if c == preferred: continue
+            val = row.get(c)
+            if pd.isna(val): continue
+            if isinstance(val, str) and len(val) > 1000:
+                row_payload_base[c] = val[:1000] + " ...[truncated]"
+            else:
+                row_payload_base[c] = val
+        resume_id = row.get("ID") if "ID" in df.columns and pd.notna(row.get("ID")) else None
+        out.append((int(idx), resume_id, text_raw, row_payload_base))
+    return out
+
+
+def run(n_rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "Resume.csv")
+        write_synthetic_csv(csv_path, n_rows)
+        df = pd.read_csv(csv_path)
+
+    # HTML cadangan untuk baris yang Resume_str-nya kosong (pembersihan HTML tidak ikut diukur).
+    need = df.loc[df["Resume_str"].isna() & df["Resume_html"].notna(), "Resume_html"]
+    cleaned = {idx: ingest.strip_html(html) for idx, html in need.items()}
+
+    t0 = time.perf_counter()
+    legacy = legacy_prepare(df, "Resume_str", cleaned)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vectorized = list(ingest.prepare_frame(df, "Resume_str", cleaned))
+    t_vec = time.perf_counter() - t0
+
+    # Hasil kedua implementasi harus identik.
+    assert len(legacy) == len(vectorized), (len(legacy), len(vectorized))
+    for a, b in zip(legacy, vectorized):
+        assert a[0] == b[0] and a[2] == b[2] and str(a[1]) == str(b[1]) and a[3] == b[3], (a[0], b[0])
+
+    print(f"rows: {n_rows:,}")
+    print(f"iterrows (legacy): {t_legacy:8.2f}s  ({n_rows / t_legacy:,.0f} rows/s)")
+    print(f"prepare_frame:     {t_vec:8.2f}s  ({n_rows / t_vec:,.0f} rows/s)")
+    print(f"speedup: {t_legacy / t_vec:.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,357 @@
+# Evaluasi Retrieval: Kualitas vs Latensi
+
+"""
+Mengukur kualitas retrieval (recall@k, MRR, nDCG@k) berdampingan dengan latensi pencarian (p50/p95)
+dan ukuran indeks, untuk grid parameter: CHUNK_SIZE/CHUNK_OVERLAP, k, HNSW ef, quantization, dan
+mode retrieval (dense, hybrid BM25, dua tahap). Setiap optimasi kecepatan terlihat bersama biaya relevansinya.
+
+Ground truth:
+- Weak label dari kolom Category: untuk QUERIES_PER_CATEGORY resume acak per kategori, judul resume
+  (kata-kata pertama teksnya) menjadi query, dan resume lain dengan kategori yang sama dianggap relevan.
+  Resume sumber dikeluarkan dari hasil.
+- Opsional, file query berlabel (JSONL), satu query per baris:
+    {"query": "payroll specialist with ADP", "relevant_ids": ["16852973", "11065180"]}
+    {"query": "pastry chef", "category": "CHEF"}
+
+Recall@k dihitung sebagai (relevan di top-k) / min(jumlah relevan, k), sehingga kategori besar tetap
+bisa mencapai 1.0. Latensi mengukur pencarian saja (embedding query dihitung sekali di awal).
+Ukuran indeks: ukuran file untuk VECTOR_BACKEND=numpy, perkiraan (vektor + quantized + HNSW) untuk Qdrant.
+
+Jalankan (dari root repo; collection dibuat di memori / folder sementara):
+    python benchmarks/eval_retrieval.py Resume.csv
+    python benchmarks/eval_retrieval.py --synthetic 1k --modes dense,hybrid,two_stage
+    python benchmarks/eval_retrieval.py Resume.csv --queries labeled_queries.jsonl --chunks 1000:200,500:100 --k 5,10
+Qdrant embedded (VECTOR_BACKEND=local, default) dan NumPy store (VECTOR_BACKEND=numpy, jauh lebih cepat)
+selalu melakukan exact search, sehingga HNSW ef dan quantization tidak mengubah hasil; untuk mengukurnya,
+jalankan dengan VECTOR_BACKEND=qdrant dan QDRANT_URL ke server Qdrant lokal (collection sementara diberi
+prefix `eval_` dan dihapus setelahnya).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Evaluasi default memakai Qdrant embedded di folder sementara (tanpa server).
+os.environ.setdefault("VECTOR_BACKEND", "local")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from qdrant_client.models import (  # noqa: E402
+    VectorParams, Distance, PointStruct, HnswConfigDiff, OptimizersConfigDiff, SearchParams, CollectionStatus,
+)
+
+import ingest_resume_csv_qdrant as ingest  # noqa: E402
+from backends import make_qdrant_client  # noqa: E402
+from lexical_index import LexicalIndex  # noqa: E402
+from retrieval import hybrid_search_candidates, centroid_collection_name, DEFAULT_GROUP_SIZE  # noqa: E402
+from synthetic import SIZES, dataset_path  # noqa: E402
+
+# ----------------------------------------------------------------------
+# Config (grid default; bisa diganti lewat argumen CLI)
+# ----------------------------------------------------------------------
+CHUNK_GRID = "1000:200,500:100,2000:200"   # CHUNK_SIZE:CHUNK_OVERLAP; nilai pertama = konfigurasi referensi
+K_GRID = "5,10"
+EF_GRID = "0,32,128"                        # 0 = ef default collection
+QUANTIZATION_GRID = "none,scalar,binary"
+MODE_GRID = "dense,hybrid"                  # dense, hybrid (dense + BM25), two_stage (centroid -> chunk), hybrid_two_stage
+MODES = ("dense", "hybrid", "two_stage", "hybrid_two_stage")
+QUERIES_PER_CATEGORY = 5
+QUERY_WORDS = 12              # Jumlah kata pertama resume yang dipakai sebagai query weak label
+UPSERT_BATCH_SIZE = 256
+INDEX_WAIT_SECONDS = 300      # Batas tunggu optimizer Qdrant selesai membangun indeks HNSW
+# Collection evaluasi kecil; tanpa threshold rendah, Qdrant server tidak membangun HNSW dan ef tidak berpengaruh.
+INDEXING_THRESHOLD_KB = 1
+COLLECTION_PREFIX = "eval_"
+SEED = 0
+# ----------------------------------------------------------------------
+
+
+def parse_list(value: str, cast=str) -> list:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def parse_chunks(value: str) -> List[Tuple[int, int]]:
+    return [(int(size), int(overlap)) for size, overlap in (item.split(":") for item in parse_list(value))]
+
+
+# ----------------------------------------------------------------------
+# Data dan ground truth
+# ----------------------------------------------------------------------
+
+def load_resumes(csv_path: str, max_resumes: Optional[int] = None) -> List[Tuple[str, Optional[str], str]]:
+    """Membaca resume dengan persiapan teks yang sama seperti ingest. Hasilnya: daftar (key, Category, teks)."""
+    preferred, _ = ingest.select_text_column(csv_path)
+    df = pd.read_csv(csv_path)
+    if max_resumes and len(df) > max_resumes:
+        df = df.sample(n=max_resumes, random_state=SEED).sort_index()
+    cleaner = ingest.HtmlCleaner()
+    try:
+        df, cleaned = next(ingest.iter_clean_frames([df], preferred, cleaner))
+    finally:
+        cleaner.close()
+    return [
+        (ingest.resume_key(resume_id, idx), payload.get("Category"), text)
+        for idx, resume_id, text, payload in ingest.prepare_frame(df, preferred, cleaned)
+    ]
+
+
+def weak_label_queries(resumes: List[Tuple[str, Optional[str], str]], per_category: int = QUERIES_PER_CATEGORY) -> List[Dict[str, Any]]:
+    """Query dari judul resume acak per kategori; relevan = resume lain dengan kategori yang sama."""
+    by_category: Dict[str, List[Tuple[str, str]]] = {}
+    for key, category, text in resumes:
+        if category is not None:
+            by_category.setdefault(str(category), []).append((key, text))
+    rng = random.Random(SEED)
+    queries = []
+    for category, members in sorted(by_category.items()):
+        relevant = {key for key, _ in members}
+        for key, text in rng.sample(members, min(per_category, len(members))):
+            query = " ".join(text.split()[:QUERY_WORDS])
+            if query and len(relevant) > 1:
+                queries.append({"query": query, "relevant": relevant - {key}, "exclude": key})
+    return queries
+
+
+def labeled_queries(path: str, resumes: List[Tuple[str, Optional[str], str]]) -> List[Dict[str, Any]]:
+    """Query dari file JSONL berlabel (`relevant_ids` dan/atau `category`)."""
+    by_category: Dict[str, Set[str]] = {}
+    for key, category, _ in resumes:
+        by_category.setdefault(str(category), set()).add(key)
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            relevant = {str(i) for i in item.get("relevant_ids", [])} | by_category.get(str(item.get("category")), set())
+            if relevant:
+                queries.append({"query": item["query"], "relevant": relevant, "exclude": None})
+    return queries
+
+
+# ----------------------------------------------------------------------
+# Metrik
+# ----------------------------------------------------------------------
+
+def relevance_metrics(ranked: List[str], relevant: Set[str], k: int) -> Dict[str, float]:
+    """recall@k (dibatasi min(|relevan|, k)), reciprocal rank, dan nDCG@k dengan gain biner."""
+    hits = [1.0 if rid in relevant else 0.0 for rid in ranked[:k]]
+    ideal = min(len(relevant), k)
+    dcg = sum(h / np.log2(i + 2) for i, h in enumerate(hits))
+    idcg = sum(1.0 / np.log2(i + 2) for i in range(ideal))
+    return {
+        "recall": sum(hits) / ideal if ideal else 0.0,
+        "rr": next((1.0 / (i + 1) for i, h in enumerate(hits) if h), 0.0),
+        "ndcg": dcg / idcg if idcg else 0.0,
+    }
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def estimate_index_bytes(points: int, dim: int, quantization: str) -> int:
+    """Perkiraan ukuran indeks Qdrant (rumus sama seperti estimate_vector_memory di ingest): vektor, quantized, graf HNSW."""
+    quantized = {"scalar": points * dim, "binary": points * dim // 8}.get(quantization, 0)
+    return points * dim * 4 + quantized + points * ingest.HNSW_M * 2 * 4
+
+
+# ----------------------------------------------------------------------
+# Indeks per konfigurasi
+# ----------------------------------------------------------------------
+
+def chunk_points(resumes: List[Tuple[str, Optional[str], str]], chunk_size: int, overlap: int) -> SimpleNamespace:
+    """Chunk + embedding (lewat cache embedding ingest) untuk satu setting chunking, dipakai ulang untuk semua quantization."""
+    ids, texts, payloads = [], [], []
+    for key, category, text in resumes:
+        for ci, ch in enumerate(ingest.chunk_text(text, chunk_size, overlap)):
+            payload = {"ID": key, "chunk_index": ci, "text": ch}
+            if category is not None:
+                payload["Category"] = category
+            ids.append(ingest.make_point_id(key, ci, ingest.content_hash(ch)))
+            texts.append(ch)
+            payloads.append(payload)
+    vectors = ingest.get_embeddings(texts)
+    lexical = LexicalIndex.build(
+        (pid, p["ID"], p.get("Category"), p["text"]) for pid, p in zip(ids, payloads)
+    )
+    return SimpleNamespace(ids=ids, vectors=vectors, payloads=payloads, lexical=lexical, dim=len(vectors[0]))
+
+
+def create_collection(client, name: str, dim: int, quantization: str):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+        hnsw_config=HnswConfigDiff(m=ingest.HNSW_M, ef_construct=ingest.HNSW_EF_CONSTRUCT),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD_KB),
+        quantization_config=ingest.quantization_config(quantization),
+    )
+
+
+def wait_until_indexed(client, name: str, timeout: float = INDEX_WAIT_SECONDS):
+    """Menunggu optimizer selesai (status hijau) agar latensi diukur pada indeks HNSW, bukan segmen mentah."""
+    deadline = time.monotonic() + timeout
+    while getattr(client.get_collection(name), "status", CollectionStatus.GREEN) != CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            print(f"  warning: {name} still optimizing after {timeout}s, measuring anyway")
+            return
+        time.sleep(0.5)
+
+
+def build_collection(client, name: str, chunks: SimpleNamespace, quantization: str, centroids: bool) -> Optional[str]:
+    """Menulis poin chunk (dan collection centroid jika dibutuhkan mode dua tahap). Hasilnya: nama collection centroid."""
+    create_collection(client, name, chunks.dim, quantization)
+    for b in range(0, len(chunks.ids), UPSERT_BATCH_SIZE):
+        client.upsert(collection_name=name, points=[
+            PointStruct(id=pid, vector=vec, payload=payload)
+            for pid, vec, payload in zip(chunks.ids[b : b + UPSERT_BATCH_SIZE], chunks.vectors[b : b + UPSERT_BATCH_SIZE], chunks.payloads[b : b + UPSERT_BATCH_SIZE])
+        ], wait=True)
+    wait_until_indexed(client, name)
+    if not centroids:
+        return None
+    centroid_name = centroid_collection_name(name)
+    create_collection(client, centroid_name, chunks.dim, quantization)
+    ingest.backfill_centroids(client, name, centroid_name)
+    wait_until_indexed(client, centroid_name)
+    return centroid_name
+
+
+def search_params_for(quantization: str, ef: int) -> Optional[SearchParams]:
+    base = ingest.search_params(quantization)
+    if not ef:
+        return base
+    return SearchParams(hnsw_ef=ef, quantization=base.quantization if base is not None else None)
+
+
+def evaluate(client, name: str, centroid_name: Optional[str], lexical: LexicalIndex, queries: List[Dict[str, Any]],
+             query_vectors: Dict[str, List[float]], mode: str, k: int, params: Optional[SearchParams]) -> Dict[str, Any]:
+    """Menjalankan semua query untuk satu konfigurasi. Hasilnya: rata-rata metrik relevansi dan latensi p50/p95."""
+    scores, latencies = [], []
+    for q in queries:
+        fetch = k + 1 if q["exclude"] else k  # resume sumber query weak label dikeluarkan dari hasil
+        t0 = time.perf_counter()
+        results = hybrid_search_candidates(
+            client, name, lambda texts: [query_vectors[t] for t in texts], q["query"],
+            lexical=lexical if mode in ("hybrid", "hybrid_two_stage") else None,
+            k=fetch, group_size=DEFAULT_GROUP_SIZE, search_params=params,
+            centroid_collection=centroid_name if mode in ("two_stage", "hybrid_two_stage") else None,
+        )
+        latencies.append((time.perf_counter() - t0) * 1000)
+        ranked = [str(r.get("ID")) for r in results if str(r.get("ID")) != q["exclude"]]
+        scores.append(relevance_metrics(ranked, q["relevant"], k))
+    return {
+        "recall@k": round(float(np.mean([s["recall"] for s in scores])), 4),
+        "mrr": round(float(np.mean([s["rr"] for s in scores])), 4),
+        "ndcg@k": round(float(np.mean([s["ndcg"] for s in scores])), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+    }
+
+
+def add_deltas(table: pd.DataFrame) -> pd.DataFrame:
+    """Selisih terhadap konfigurasi referensi (nilai pertama setiap grid) dengan mode dan k yang sama."""
+    ref_cols = ["chunk_size", "chunk_overlap", "quantization", "hnsw_ef"]
+    ref = table.iloc[0][ref_cols]
+    is_ref = (table[ref_cols] == ref).all(axis=1)
+    reference = table[is_ref].set_index(["mode", "k"])[["recall@k", "ndcg@k", "p95_ms", "index_mb"]]
+    joined = table.join(reference, on=["mode", "k"], rsuffix="_ref")
+    for col in ("recall@k", "ndcg@k", "p95_ms", "index_mb"):
+        table[f"d_{col}"] = (joined[col] - joined[f"{col}_ref"]).round(4)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval quality vs latency evaluation over a parameter grid.")
+    parser.add_argument("csv", nargs="?", default="Resume.csv", help="resume CSV with a Category column")
+    parser.add_argument("--synthetic", choices=list(SIZES), help="use a synthetic dataset from benchmarks/synthetic.py instead of CSV")
+    parser.add_argument("--queries", help="optional JSONL file of labeled queries")
+    parser.add_argument("--per-category", type=int, default=QUERIES_PER_CATEGORY, help="weak-label queries per category (0 = labeled queries only)")
+    parser.add_argument("--max-resumes", type=int, help="evaluate on a random subset of resumes")
+    parser.add_argument("--chunks", default=CHUNK_GRID, help="CHUNK_SIZE:CHUNK_OVERLAP pairs")
+    parser.add_argument("--k", default=K_GRID)
+    parser.add_argument("--ef", default=EF_GRID, help="HNSW ef values (0 = collection default)")
+    parser.add_argument("--quantization", default=QUANTIZATION_GRID)
+    parser.add_argument("--modes", default=MODE_GRID, help=f"any of: {', '.join(MODES)}")
+    parser.add_argument("--output", default="eval_results.csv", help="comparison table (.csv or .parquet)")
+    args = parser.parse_args()
+
+    chunk_grid, k_grid, ef_grid = parse_chunks(args.chunks), parse_list(args.k, int), parse_list(args.ef, int)
+    quant_grid, modes = parse_list(args.quantization), parse_list(args.modes)
+    if unknown := [m for m in modes if m not in MODES]:
+        raise SystemExit(f"unknown mode(s): {', '.join(unknown)} (use {', '.join(MODES)})")
+
+    ingest.init_clients()
+    csv_path = dataset_path(args.synthetic) if args.synthetic else args.csv
+    resumes = load_resumes(csv_path, args.max_resumes)
+    queries = (weak_label_queries(resumes, args.per_category) if args.per_category else []) + (labeled_queries(args.queries, resumes) if args.queries else [])
+    if not queries:
+        raise SystemExit("no evaluation queries (need a Category column or --queries)")
+    query_vectors = dict(zip([q["query"] for q in queries], ingest.get_embeddings([q["query"] for q in queries])))
+    print(f"{len(resumes):,} resumes, {len(queries)} queries; backend={ingest.VECTOR_BACKEND}, embedding={ingest.EMBEDDING_MODEL}")
+    if ingest.VECTOR_BACKEND != "qdrant" and (len(ef_grid) > 1 or len(quant_grid) > 1):
+        # Backend lokal tidak memakai HNSW maupun quantization; baris tambahan hanya akan menduplikasi hasil.
+        ef_grid, quant_grid = ef_grid[:1], quant_grid[:1]
+        print(f"note: {ingest.VECTOR_BACKEND} backend runs exact search; only hnsw_ef={ef_grid[0]}, quantization={quant_grid[0]} are evaluated "
+              "(use VECTOR_BACKEND=qdrant with a local server to sweep them).")
+
+    # Qdrant embedded di memori (mode persisten melakukan commit SQLite per poin); NumPy store di folder sementara.
+    workdir = tempfile.mkdtemp(prefix="smarthire_eval_")
+    client = make_qdrant_client(
+        ingest.VECTOR_BACKEND, url=ingest.QDRANT_URL, api_key=ingest.QDRANT_API_KEY,
+        path=":memory:" if ingest.VECTOR_BACKEND == "local" else workdir, timeout=120,
+    )
+    rows = []
+    try:
+        for chunk_size, overlap in chunk_grid:
+            chunks = chunk_points(resumes, chunk_size, overlap)
+            for quantization in quant_grid:
+                name = f"{COLLECTION_PREFIX}c{chunk_size}_o{overlap}_{quantization}"
+                t0 = time.perf_counter()
+                centroid_name = build_collection(client, name, chunks, quantization, centroids=any("two_stage" in m for m in modes))
+                if ingest.VECTOR_BACKEND == "numpy":
+                    index_bytes = sum(dir_size(os.path.join(workdir, c)) for c in (name, centroid_name) if c)
+                else:
+                    index_bytes = estimate_index_bytes(len(chunks.ids), chunks.dim, quantization)
+                print(f"chunk {chunk_size}/{overlap}, quantization {quantization}: {len(chunks.ids):,} points, "
+                      f"{index_bytes / 1024 ** 2:,.1f} MB, built in {time.perf_counter() - t0:.1f}s")
+                for ef in ef_grid:
+                    params = search_params_for(quantization, ef)
+                    for mode in modes:
+                        for k in k_grid:
+                            metrics = evaluate(client, name, centroid_name, chunks.lexical, queries, query_vectors, mode, k, params)
+                            rows.append({
+                                "chunk_size": chunk_size, "chunk_overlap": overlap, "quantization": quantization, "hnsw_ef": ef,
+                                "mode": mode, "k": k, "queries": len(queries), **metrics,
+                                "points": len(chunks.ids), "index_mb": round(index_bytes / 1024 ** 2, 2),
+                            })
+                for coll in (name, centroid_name):
+                    if coll:
+                        client.delete_collection(coll)
+    finally:
+        client.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    table = add_deltas(pd.DataFrame(rows))
+    if args.output.lower().endswith(".parquet"):
+        table.to_parquet(args.output, index=False)
+    else:
+        table.to_csv(args.output, index=False)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_rows", None):
+        print(table.to_string(index=False))
+    print(f"\nComparison table written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+# Benchmark Suite Offline untuk Hot Path SmartHire
+
+"""
+Mengukur hot path ingest, retrieval, dan UI pada dataset sintetis (1k / 10k / 100k resume),
+sepenuhnya offline: embedding ingest memakai client palsu (vektor tetap, latensi per request tetap),
+retrieval memakai NumpyVectorStore + HashingEmbedder, tanpa Qdrant, OpenAI, atau LLM. Retrieval diukur
+lewat jalur yang sama seperti aplikasi: `ahybrid_search_candidates` di event loop latar belakang, dengan
+client async dan cache embedding query (`QueryEmbeddingCache.alookup_many`).
+
+Benchmark: chunk_text, strip_html, prepare_rows (persiapan baris ingest), get_embeddings (batching,
+cache dingin dan hangat), get_relevant_resumes (hybrid, dense saja, dua tahap), extract_snippets,
+parse_tool_message_json, load_data (dashboard), dan index_build.
+
+Jalankan (dari root repo):
+    python benchmarks/run_benchmarks.py --size 1k                    # semua benchmark
+    python benchmarks/run_benchmarks.py --size 10k --save-baseline   # simpan ke benchmarks/baseline_10k.json
+    python benchmarks/run_benchmarks.py --size 10k --compare         # bandingkan dengan baseline (exit 1 jika regresi)
+    python benchmarks/run_benchmarks.py --only chunk_text,strip_html
+Beban referensi tetap (CPU murni) diukur tepat sebelum dan sesudah setiap benchmark; `--compare`
+membandingkan waktu minimum relatif terhadap referensi tersebut, sehingga perbedaan kecepatan mesin
+(atau beban lain di mesin saat run) tidak terbaca sebagai regresi. Baseline mencatat host-nya; jika host
+berbeda, toleransi dilebarkan ke CROSS_HOST_THRESHOLD. Benchmark yang melewati toleransi diukur ulang
+(CONFIRM_RUNS) dan hasil terbaik yang dipakai, sehingga hanya perlambatan yang konsisten dilaporkan.
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from itertools import cycle
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Benchmark ini tidak melakukan panggilan jaringan (client embedding diganti client palsu).
+# get_embeddings selalu diukur lewat jalur OpenAI (dengan client palsu), cache diatur per benchmark.
+os.environ["EMBEDDING_BACKEND"] = "openai"
+os.environ["EMBED_CACHE"] = "0"
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from qdrant_client.models import VectorParams, Distance, PointStruct  # noqa: E402
+
+import ingest_resume_csv_qdrant as ingest  # noqa: E402
+from backends import NumpyVectorStore, HashingEmbedder, make_async_qdrant_client  # noqa: E402
+from background_loop import BackgroundLoop  # noqa: E402
+from dashboard_data import load_resume_data  # noqa: E402
+from embedding_cache import EmbeddingCache, QueryEmbeddingCache  # noqa: E402
+from resume_store import ResumeStore  # noqa: E402
+from lexical_index import LexicalIndex  # noqa: E402
+from retrieval import ahybrid_search_candidates, extract_snippets, parse_tool_message_json, centroid_collection_name  # noqa: E402
+from synthetic import SIZES, dataset_path, synthetic_queries  # noqa: E402
+
+# ----------------------------------------------------------------------
+# Config
+# ----------------------------------------------------------------------
+SAMPLE_ROWS = 2000            # Benchmark per item (HTML, embedding, snippet) memakai sampel ini, bukan seluruh dataset
+N_QUERIES = 50                # Jumlah query sintetis untuk benchmark retrieval
+RETRIEVAL_K = 5               # k dan group size sama seperti default tool di aplikasi
+RETRIEVAL_GROUP_SIZE = 2
+TOOL_MESSAGES = 1000          # Jumlah ToolMessage JSON untuk benchmark parse_tool_message_json
+FAKE_EMBED_DIM = 256
+FAKE_EMBED_LATENCY_MS = 250.0 # Latensi simulasi per request embedding (kira-kira round trip API embedding sungguhan)
+INDEX_BATCH_SIZE = 512        # Jumlah chunk per upsert saat membangun indeks benchmark
+COLLECTION_NAME = "bench_resumes"
+REGRESSION_THRESHOLD = 0.30   # Perlambatan (relatif terhadap referensi) > 30% dari baseline dianggap regresi
+CROSS_HOST_THRESHOLD = 0.50   # Toleransi jika baseline diukur di host lain
+REFERENCE_REPEAT = 10         # Putaran beban referensi sebelum dan sesudah setiap benchmark
+MIN_SAMPLE_S = 0.05           # Durasi minimum satu sampel pengukuran (fungsi cepat diulang dalam satu sampel)
+CONFIRM_RUNS = 2              # Dengan --compare, benchmark yang melewati toleransi diukur ulang maksimal sekian kali
+# Benchmark yang didominasi latensi simulasi (tetap di semua mesin) dibandingkan tanpa normalisasi referensi.
+SIMULATED_LATENCY_BENCHMARKS = {"get_embeddings"}
+# ----------------------------------------------------------------------
+
+
+class FakeEmbeddingsClient:
+    """
+    Pengganti client OpenAI untuk `get_embeddings`: setiap request tidur FAKE_EMBED_LATENCY_MS dan
+    mengembalikan vektor tetap, sehingga yang terukur adalah jumlah request (batching) dan overhead Python.
+    """
+
+    def __init__(self, dim: int = FAKE_EMBED_DIM, latency_ms: float = FAKE_EMBED_LATENCY_MS):
+        self.embeddings = self
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self._vector = [1.0 / dim ** 0.5] * dim
+
+    def create(self, model: str, input: List[str], **kwargs):
+        self.requests += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self._vector) for _ in input])
+
+
+class BenchData:
+    """Dataset sintetis satu ukuran beserta turunannya; indeks retrieval dibangun sekali saat dibutuhkan."""
+
+    def __init__(self, size: str, workdir: str):
+        self.size = size
+        self.workdir = workdir
+        self.csv_path = dataset_path(size)
+        self.df = pd.read_csv(self.csv_path)
+        self.sample = self.df.head(SAMPLE_ROWS)
+        self.queries = synthetic_queries(N_QUERIES)
+        self.sample_chunks = [ch for text in self.sample["Resume_str"].fillna("").astype(str) for ch in ingest.chunk_text(text)]
+        self._index: Optional[SimpleNamespace] = None
+
+    def cleaned_html(self, df: pd.DataFrame) -> Dict[int, str]:
+        """Teks dari Resume_html untuk baris yang Resume_str-nya kosong (seperti iter_clean_frames)."""
+        need = df.loc[df["Resume_str"].isna() & df["Resume_html"].notna(), "Resume_html"]
+        return {idx: ingest.strip_html(html) for idx, html in need.items()}
+
+    def index(self) -> SimpleNamespace:
+        if self._index is None:
+            self._index = build_index(self.df, self.cleaned_html(self.df), self.workdir)
+        return self._index
+
+    def close(self):
+        if self._index is not None:
+            close_index(self._index)
+
+
+def build_index(df: pd.DataFrame, cleaned: Dict[int, str], workdir: str) -> SimpleNamespace:
+    """
+    Membangun collection NumpyVectorStore, indeks BM25, dan collection centroid dari dataset,
+    memakai tahapan ingest yang sama (iter_chunk_records dengan indeks leksikal inkremental, backfill_centroids),
+    beserta client async, cache embedding query, dan event loop seperti di aplikasi.
+    """
+    start = time.perf_counter()
+    embedder = HashingEmbedder()
+    client = NumpyVectorStore(os.path.join(workdir, "vector_store"))
+    store = ResumeStore(os.path.join(workdir, "resume_store.sqlite"))
+    centroid_collection = centroid_collection_name(COLLECTION_NAME)
+    for name in (COLLECTION_NAME, centroid_collection):
+        client.create_collection(name, vectors_config=VectorParams(size=embedder.dim, distance=Distance.COSINE))
+    points = 0
+    lexical = LexicalIndex()
+    records = ingest.iter_chunk_records([(df, cleaned)], "Resume_str", store=store, lexical=lexical)
+    for batch in ingest.iter_batches(records, INDEX_BATCH_SIZE):
+        vectors = embedder.embed_documents([text for _, text, _ in batch])
+        client.upsert(COLLECTION_NAME, [
+            PointStruct(id=point_id, vector=vec, payload={"text": text, **payload})
+            for (point_id, text, payload), vec in zip(batch, vectors)
+        ])
+        points += len(batch)
+    centroids = ingest.backfill_centroids(client, COLLECTION_NAME, centroid_collection)
+    store.close()
+    seconds = time.perf_counter() - start
+    query_embedder = QueryEmbeddingCache(
+        embedder.embed_documents, "bench-hashing", disk=EmbeddingCache(os.path.join(workdir, "query_embeddings.sqlite")),
+        aembed_fn=embedder.aembed_documents,
+    )
+    return SimpleNamespace(
+        client=client, aclient=make_async_qdrant_client("numpy", sync_client=client), loop=BackgroundLoop("bench-async"),
+        query_embedder=query_embedder, lexical=lexical, embedder=embedder, centroid_collection=centroid_collection,
+        points=points, centroids=centroids, seconds=seconds,
+    )
+
+
+def close_index(index: SimpleNamespace):
+    index.loop.close()
+    index.query_embedder.disk.close()
+    index.client.close()
+
+
+# ----------------------------------------------------------------------
+# Pengukuran
+# ----------------------------------------------------------------------
+
+def measure(fn: Callable[[], Any], items: int, repeat: int) -> Dict[str, Any]:
+    """
+    Menjalankan `fn` sekali sebagai warmup lalu `repeat` sampel. Fungsi yang lebih cepat dari MIN_SAMPLE_S
+    dipanggil beberapa kali per sampel (waktu per panggilan = waktu sampel / jumlah panggilan), agar
+    gangguan sesaat tidak mendominasi. Hasilnya: median/min detik per panggilan dan throughput.
+    """
+    t0 = time.perf_counter()
+    fn()
+    loops = max(1, int(MIN_SAMPLE_S / max(time.perf_counter() - t0, 1e-6)))
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - t0) / loops)
+    median = statistics.median(times)
+    return {"median_s": round(median, 6), "min_s": round(min(times), 6), "items": items, "items_per_s": round(items / median, 1) if median > 0 else None}
+
+
+def measure_queries(search: Callable[[str], Any], queries: List[str], repeat: int) -> Dict[str, Any]:
+    """Seperti `measure` untuk satu putaran semua query, ditambah latensi p50/p95 per query."""
+    latencies: List[float] = []
+
+    def run_all():
+        for q in queries:
+            t0 = time.perf_counter()
+            search(q)
+            latencies.append(time.perf_counter() - t0)
+
+    result = measure(run_all, len(queries), repeat)
+    measured = np.array(latencies[len(queries):]) * 1000  # tanpa putaran warmup
+    return {**result, "p50_ms": round(float(np.percentile(measured, 50)), 3), "p95_ms": round(float(np.percentile(measured, 95)), 3)}
+
+
+BENCHMARKS: Dict[str, Callable[[BenchData, int], Dict[str, Any]]] = {}
+
+
+def benchmark(fn):
+    """Mendaftarkan fungsi `bench_<nama>` sebagai benchmark `<nama>`."""
+    BENCHMARKS[fn.__name__[len("bench_"):]] = fn
+    return fn
+
+
+@benchmark
+def bench_chunk_text(data: BenchData, repeat: int) -> Dict[str, Any]:
+    texts = data.df["Resume_str"].fillna("").astype(str).tolist()
+    return measure(lambda: [ingest.chunk_text(t) for t in texts], len(texts), repeat)
+
+
+@benchmark
+def bench_strip_html(data: BenchData, repeat: int) -> Dict[str, Any]:
+    htmls = data.sample["Resume_html"].tolist()
+    return measure(lambda: [ingest.strip_html(h) for h in htmls], len(htmls), repeat)
+
+
+@benchmark
+def bench_prepare_rows(data: BenchData, repeat: int) -> Dict[str, Any]:
+    cleaned = data.cleaned_html(data.df)
+    return measure(lambda: list(ingest.prepare_frame(data.df, "Resume_str", cleaned)), len(data.df), repeat)
+
+
+@benchmark
+def bench_get_embeddings(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """Batching ke API embedding tanpa cache (EMBED_BATCH_SIZE chunk per request)."""
+    fake = FakeEmbeddingsClient()
+    ingest.openai_client, ingest.embedding_cache = fake, None
+    run = lambda: ingest.get_embeddings(data.sample_chunks, model=ingest.EMBEDDING_MODEL, batch_size=ingest.EMBED_BATCH_SIZE, dimensions=None)
+    result = measure(run, len(data.sample_chunks), repeat)
+    return {**result, "requests_per_call": fake.requests / (repeat + 1)}
+
+
+@benchmark
+def bench_get_embeddings_cached(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """Semua chunk sudah ada di cache SQLite (diisi saat warmup): biaya lookup cache tanpa request API."""
+    fake = FakeEmbeddingsClient()
+    cache = EmbeddingCache(os.path.join(data.workdir, "embeddings.sqlite"))
+    ingest.openai_client, ingest.embedding_cache = fake, cache
+    try:
+        run = lambda: ingest.get_embeddings(data.sample_chunks, model=ingest.EMBEDDING_MODEL, batch_size=ingest.EMBED_BATCH_SIZE, dimensions=None)
+        result = measure(run, len(data.sample_chunks), repeat)
+    finally:
+        ingest.embedding_cache = None
+        cache.close()
+    return {**result, "requests_total": fake.requests}
+
+
+@benchmark
+def bench_index_build(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """
+    Chunk + embedding lokal + upsert + BM25 + centroid, satu kali (tidak diulang). Pengukuran ulang
+    (konfirmasi regresi) membangun indeks baru di folder terpisah.
+    """
+    if data._index is None:
+        index = data.index()
+    else:
+        index = build_index(data.df, data.cleaned_html(data.df), tempfile.mkdtemp(dir=data.workdir))
+        close_index(index)
+    return {"median_s": round(index.seconds, 6), "min_s": round(index.seconds, 6), "items": index.points,
+            "items_per_s": round(index.points / index.seconds, 1), "centroids": index.centroids}
+
+
+def app_search(index: SimpleNamespace, lexical: Optional[LexicalIndex] = None, centroid_collection: Optional[str] = None) -> Callable[[str], Any]:
+    """Pencarian satu query seperti `aget_relevant_resumes` di aplikasi (dijalankan lewat BackgroundLoop)."""
+    async def aembed_queries(texts: List[str]) -> List[List[float]]:
+        vectors, _ = await index.query_embedder.alookup_many(texts)
+        return vectors
+
+    return lambda q: index.loop.run(ahybrid_search_candidates(
+        index.aclient, COLLECTION_NAME, aembed_queries, q, lexical=lexical,
+        k=RETRIEVAL_K, group_size=RETRIEVAL_GROUP_SIZE, centroid_collection=centroid_collection,
+    ))
+
+
+@benchmark
+def bench_get_relevant_resumes(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """
+    Jalur retrieval aplikasi: embedding query (cache memori setelah warmup) + pencarian dense grouped
+    + BM25 + RRF + snippet, lewat client async di event loop latar belakang.
+    """
+    index = data.index()
+    return measure_queries(app_search(index, lexical=index.lexical), data.queries, repeat)
+
+
+@benchmark
+def bench_get_relevant_resumes_dense(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """Tanpa indeks leksikal: setiap query melewati embedding dan pencarian dense."""
+    index = data.index()
+    return measure_queries(app_search(index), data.queries, repeat)
+
+
+@benchmark
+def bench_get_relevant_resumes_two_stage(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """Retrieval dua tahap (centroid resume lalu chunk) + BM25, seperti aplikasi jika collection centroid ada."""
+    index = data.index()
+    return measure_queries(app_search(index, lexical=index.lexical, centroid_collection=index.centroid_collection), data.queries, repeat)
+
+
+@benchmark
+def bench_extract_snippets(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """Ekstraksi snippet saat query (per chunk hasil pencarian)."""
+    pairs = list(zip(data.sample_chunks, cycle(data.queries)))
+    return measure(lambda: [extract_snippets(chunk, q) for chunk, q in pairs], len(pairs), repeat)
+
+
+@benchmark
+def bench_parse_tool_message_json(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """ToolMessage berisi RETRIEVAL_K kandidat (format keluaran tool retrieval) diurai kembali oleh UI."""
+    rows = data.sample.to_dict("records")
+    messages = []
+    for i in range(TOOL_MESSAGES):
+        picked = [rows[(i * RETRIEVAL_K + j) % len(rows)] for j in range(RETRIEVAL_K)]
+        results = [
+            {"ID": str(r["ID"]), "Category": r["Category"], "score": 0.5, "snippets": str(r["Resume_str"]).split(". ")[:3]}
+            for r in picked
+        ]
+        messages.append(json.dumps(results, ensure_ascii=False, default=str))
+    return measure(lambda: [parse_tool_message_json(m) for m in messages], len(messages), repeat)
+
+
+@benchmark
+def bench_load_data(data: BenchData, repeat: int) -> Dict[str, Any]:
+    """Load Resume.csv dan fitur dashboard (tanpa cache Streamlit)."""
+    return measure(lambda: load_resume_data(data.csv_path), len(data.df), repeat)
+
+
+# ----------------------------------------------------------------------
+# Baseline dan perbandingan
+# ----------------------------------------------------------------------
+
+def reference_workload() -> Callable[[], Any]:
+    """Beban CPU tetap (tokenisasi regex, dict/sort Python, JSON, matmul NumPy) sebagai ukuran kecepatan mesin."""
+    matrix = np.random.default_rng(0).random((256, 256), dtype=np.float32)
+    text = " ".join(f"Skill{i % 997} experience" for i in range(20000))
+
+    def run():
+        counts: Dict[str, int] = {}
+        for token in re.findall(r"\w+", text.lower()):
+            counts[token] = counts.get(token, 0) + 1
+        sorted(counts.items(), key=lambda kv: kv[1])
+        json.loads(json.dumps(counts))
+        for _ in range(20):
+            matrix @ matrix
+
+    return run
+
+
+def host_info() -> Dict[str, Any]:
+    return {"node": platform.node(), "processor": platform.processor() or platform.machine(), "cpu_count": os.cpu_count()}
+
+
+def baseline_path(size: str) -> str:
+    return os.path.join(BENCH_DIR, f"baseline_{size}.json")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def regression_threshold(baseline: Dict[str, Any], threshold: Optional[float]) -> float:
+    """Toleransi yang dipakai: `threshold` jika diberikan, selain itu sesuai host baseline."""
+    if threshold is not None:
+        return threshold
+    return REGRESSION_THRESHOLD if baseline.get("host") == host_info() else CROSS_HOST_THRESHOLD
+
+
+def normalized_ratio(name: str, res: Dict[str, Any], base: Dict[str, Any]) -> float:
+    """
+    Rasio waktu minimum (paling tidak terpengaruh gangguan) terhadap baseline, dibagi rasio beban referensi
+    di sekitar benchmark tersebut; benchmark latensi simulasi tidak dinormalisasi.
+    """
+    ratio = res["min_s"] / base["min_s"]
+    if name in SIMULATED_LATENCY_BENCHMARKS or not base.get("reference_s"):
+        return ratio
+    return ratio / (res["reference_s"] / base["reference_s"])
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Mencetak perbandingan dengan baseline. Hasilnya: nama benchmark yang melambat > threshold."""
+    print(f"\nCompared with baseline {baseline.get('commit')} ({baseline.get('timestamp')}, host {baseline.get('host')}):")
+    print(f"  tolerance {threshold:.0%}; ratio of min times, normalized by the reference workload")
+    regressions = []
+    for name, res in results.items():
+        base = baseline["results"].get(name)
+        if not base or not base.get("min_s"):
+            print(f"  {name:<34} (no baseline)")
+            continue
+        ratio = normalized_ratio(name, res, base)
+        flag = "REGRESSION" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "ok"
+        if flag == "REGRESSION":
+            regressions.append(name)
+        print(f"  {name:<34} {base['min_s'] * 1000:10.2f} ms -> {res['min_s'] * 1000:10.2f} ms  x{res['min_s'] / base['min_s']:5.2f}  normalized x{ratio:5.2f}  {flag}")
+    return regressions
+
+
+def run_benchmark(name: str, data: BenchData, repeat: int, reference: Callable[[], Any]) -> Dict[str, Any]:
+    """Menjalankan satu benchmark; beban referensi diukur sebelum dan sesudahnya (waktu minimum)."""
+    before = measure(reference, 1, REFERENCE_REPEAT)["min_s"]
+    res = BENCHMARKS[name](data, repeat)
+    after = measure(reference, 1, REFERENCE_REPEAT)["min_s"]
+    return {**res, "reference_s": round(min(before, after), 6)}
+
+
+def format_result(name: str, res: Dict[str, Any]) -> str:
+    line = f"{name:<34} {res['median_s'] * 1000:10.2f} ms  {res['items']:>8,} items  {res['items_per_s'] or 0:>12,.0f} items/s"
+    extras = {k: v for k, v in res.items() if k not in ("median_s", "min_s", "items", "items_per_s", "reference_s")}
+    return line + ("  " + " ".join(f"{k}={v}" for k, v in extras.items()) if extras else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for SmartHire hot paths.")
+    parser.add_argument("--size", choices=list(SIZES), default="1k", help="synthetic dataset size (number of resumes)")
+    parser.add_argument("--repeat", type=int, default=5, help="measured runs per benchmark (after one warmup)")
+    parser.add_argument("--only", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--save-baseline", nargs="?", const="", metavar="PATH", help="save results as baseline (default benchmarks/baseline_<size>.json)")
+    parser.add_argument("--compare", nargs="?", const="", metavar="PATH", help="compare with a saved baseline; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, help=f"relative slowdown counted as regression (default {REGRESSION_THRESHOLD} on the baseline host, {CROSS_HOST_THRESHOLD} elsewhere)")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(BENCHMARKS)
+    if unknown := [n for n in names if n not in BENCHMARKS]:
+        raise SystemExit(f"unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}")
+
+    baseline = None
+    if args.compare is not None:
+        path = args.compare or baseline_path(args.size)
+        if not os.path.exists(path):
+            raise SystemExit(f"baseline {path} not found; run with --save-baseline first")
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        threshold = regression_threshold(baseline, args.threshold)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    reference = reference_workload()
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"Preparing synthetic dataset {args.size} ({SIZES[args.size]:,} resumes)...")
+        data = BenchData(args.size, workdir)
+        for name in names:
+            results[name] = run_benchmark(name, data, args.repeat, reference)
+            print(format_result(name, results[name]), flush=True)
+        # Konfirmasi: benchmark yang melewati toleransi diukur ulang, hasil terbaik yang dibandingkan.
+        for _ in range(CONFIRM_RUNS if baseline is not None else 0):
+            base = baseline["results"]
+            flagged = [n for n in names if base.get(n, {}).get("min_s") and normalized_ratio(n, results[n], base[n]) > 1 + threshold]
+            if not flagged:
+                break
+            print(f"Re-running to confirm: {', '.join(flagged)}")
+            for name in flagged:
+                res = run_benchmark(name, data, args.repeat, reference)
+                if normalized_ratio(name, res, base[name]) < normalized_ratio(name, results[name], base[name]):
+                    results[name] = res
+        data.close()
+
+    record = {
+        "size": args.size, "rows": SIZES[args.size], "repeat": args.repeat, "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(), "machine": platform.machine(), "host": host_info(),
+        "results": results,
+    }
+    if args.save_baseline is not None:
+        path = args.save_baseline or baseline_path(args.size)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline saved to {path}")
+    if baseline is not None:
+        regressions = compare(results, baseline, threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
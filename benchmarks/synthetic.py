@@ -0,0 +1,92 @@
+# Generator Dataset Sintetis untuk Benchmark
+
+"""
+Resume.csv sintetis dengan skema yang sama seperti dataset asli (ID, Resume_str, Resume_html, Category),
+dalam ukuran 1k / 10k / 100k resume. Setiap kategori punya kosakata keahlian sendiri yang dicampur
+dengan kata umum, sehingga retrieval berperilaku seperti data asli (query keahlian cocok dengan kategorinya).
+Hasil generate di-cache di benchmarks/.data agar tidak dibuat ulang setiap run.
+"""
+
+import os
+import random
+from typing import List
+
+import pandas as pd
+
+# Ukuran dataset yang tersedia (nama -> jumlah resume).
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+EMPTY_TEXT_RATE = 0.02        # Porsi Resume_str kosong (teks diambil dari Resume_html saat ingest)
+
+COMMON_WORDS = (
+    "managed team project experience responsible developed support customer company report process "
+    "improved training years skills worked department client daily quality planning performance"
+).split()
+CATEGORY_WORDS = {
+    "CHEF": "kitchen menu culinary chef food sanitation catering pastry restaurant cooking".split(),
+    "ACCOUNTANT": "audit tax ledger accounting reconciliation cpa payroll budget gaap invoices".split(),
+    "INFORMATION-TECHNOLOGY": "python sql java cloud linux network servers database docker helpdesk".split(),
+    "HR": "recruiting onboarding benefits hris employee relations compensation interviews policy payroll".split(),
+    "SALES": "sales quota pipeline crm prospecting negotiation accounts revenue territory leads".split(),
+    "DESIGNER": "autocad photoshop illustrator layout branding typography sketch drafting figma visual".split(),
+    "ENGINEERING": "mechanical autocad solidworks manufacturing maintenance electrical testing design plc safety".split(),
+    "TEACHER": "classroom curriculum students lesson teaching grading literacy education tutoring parents".split(),
+}
+CATEGORIES = list(CATEGORY_WORDS)
+
+
+def _sentence(rng: random.Random, category: str) -> str:
+    # Sekitar sepertiga kata berasal dari kosakata kategori, sisanya kata umum.
+    vocab = CATEGORY_WORDS[category]
+    words = [rng.choice(vocab) if rng.random() < 0.35 else rng.choice(COMMON_WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def synthetic_resumes(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame resume sintetis (deterministik untuk seed yang sama), ~2% Resume_str kosong."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        category = rng.choice(CATEGORIES)
+        sentences = [_sentence(rng, category) for _ in range(rng.randint(8, 40))]
+        html = "<div class=\"section\">" + "".join(f"<p>{s}</p>" for s in sentences) + "</div>"
+        rows.append({
+            "ID": 10_000_000 + i,
+            "Resume_str": "" if rng.random() < EMPTY_TEXT_RATE else " ".join(sentences),
+            "Resume_html": html,
+            "Category": category,
+        })
+    return pd.DataFrame(rows)
+
+
+def write_synthetic_csv(path: str, n_rows: int, seed: int = 0):
+    synthetic_resumes(n_rows, seed).to_csv(path, index=False)
+
+
+def dataset_path(size: str, seed: int = 0) -> str:
+    """Path CSV sintetis untuk ukuran `size` (lihat SIZES); dibuat sekali lalu dipakai ulang."""
+    path = os.path.join(DATA_DIR, f"resumes_{size}_seed{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        write_synthetic_csv(path + ".tmp", SIZES[size], seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+QUERY_TEMPLATES = ["{}", "Shortlist candidates with {}", "Find a senior {} specialist", "Who has strong {} background?"]
+
+
+def synthetic_queries(n: int, seed: int = 1) -> List[str]:
+    """
+    Query rekruter sintetis: 2-4 kata keahlian dari satu kategori (kadang dengan kata umum), sebagian
+    dalam kalimat. Query kata kunci murni dijawab BM25 saja; query kalimat melewati jalur hybrid penuh.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        category = rng.choice(CATEGORIES)
+        words = rng.sample(CATEGORY_WORDS[category], rng.randint(2, 4))
+        if rng.random() < 0.5:
+            words.append(rng.choice(COMMON_WORDS))
+        queries.append(rng.choice(QUERY_TEMPLATES).format(" ".join(words)))
+    return queries
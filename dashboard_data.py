@@ -0,0 +1,28 @@
+# Persiapan Data untuk Resume Dashboard
+
+"""
+Memuat Resume.csv dan menghitung fitur yang dipakai halaman Data Dashboard (jumlah kata dan karakter).
+Dipisah dari halaman Streamlit agar bisa dipakai ulang tanpa UI (mis. oleh benchmark).
+"""
+
+import pandas as pd
+
+# Kolom yang wajib ada di CSV untuk dashboard.
+EXPECTED_COLUMNS = {"ID", "Resume_str", "Resume_html", "Category"}
+
+
+def load_resume_data(path: str) -> pd.DataFrame:
+    # Membaca data dari file CSV yang ditentukan ke dalam Pandas DataFrame.
+    df = pd.read_csv(path)
+    # Memastikan kolom ada
+    missing = EXPECTED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing columns in CSV: {missing}")
+
+    # Membersihkan kolom 'Category' dengan memastikan string dan menghapus spasi.
+    df["Category"] = df["Category"].astype(str).str.strip()
+    # Menghitung dua fitur baru: 'word_count' (jumlah kata) dan 'char_count' (jumlah karakter) dari teks resume ('Resume_str').
+    df["resume_text"] = df["Resume_str"].fillna("").astype(str)
+    df["word_count"] = df["resume_text"].str.split().apply(len)
+    df["char_count"] = df["resume_text"].str.len()
+    return df
@@ -0,0 +1,262 @@
+# Cache Embedding Persisten (Content-Addressed)
+
+"""
+Cache embedding di disk, dipakai bersama oleh ingest dan aplikasi SmartHire.
+- Key: (model, dimensions, sha256 teks), sehingga teks yang sama tidak perlu di-embed ulang.
+- Vektor disimpan sebagai blob float32 (packed) di SQLite.
+- Untuk query chat: cache dua tingkat (LRU + TTL di memori proses, lalu SQLite bersama antar worker).
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Lokasi file cache (bisa diganti lewat env EMBED_CACHE_PATH).
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(".cache", "embeddings.sqlite"))
+# Batas jumlah parameter per query SQLite (IN (...)).
+_SQL_CHUNK = 500
+
+
+def text_sha256(text: str) -> bytes:
+    """Digest sha256 (raw bytes) dari teks, dipakai sebagai bagian dari key cache."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Cache embedding berbasis SQLite dengan key (model, dimensions, sha256 teks).
+    Aman dipakai dari beberapa thread; beberapa proses juga bisa berbagi file yang sama (mode WAL).
+    """
+
+    def __init__(self, path: str = EMBED_CACHE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, dims INTEGER NOT NULL, text_hash BLOB NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, dims, text_hash)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, dimensions: Optional[int], texts: Sequence[str]) -> Dict[int, List[float]]:
+        """
+        Mengambil embedding yang sudah ada di cache.
+        Hasilnya: dict {index teks: vektor} hanya untuk teks yang ditemukan (cache hit).
+        """
+        dims = dimensions or 0
+        hashes = [text_sha256(t) for t in texts]
+        found: Dict[bytes, List[float]] = {}
+        unique = list(set(hashes))
+        with self._lock:
+            for i in range(0, len(unique), _SQL_CHUNK):
+                part = unique[i : i + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vec FROM embeddings WHERE model = ? AND dims = ? AND text_hash IN ({','.join('?' * len(part))})",
+                    [model, dims, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return {i: found[h] for i, h in enumerate(hashes) if h in found}
+
+    def put_many(self, model: str, dimensions: Optional[int], texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Menyimpan embedding baru ke cache sebagai blob float32."""
+        dims = dimensions or 0
+        rows = [
+            (model, dims, text_sha256(t), np.asarray(v, dtype=np.float32).tobytes())
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def embed_with_cache(
+    texts: List[str],
+    embed_fn: Callable[[List[str]], List[List[float]]],
+    model: str,
+    dimensions: Optional[int] = None,
+    cache: Optional[EmbeddingCache] = None,
+) -> List[List[float]]:
+    """
+    Menghasilkan embedding untuk daftar teks, hanya memanggil `embed_fn` untuk teks yang belum ada di cache.
+    Urutan hasil sama dengan urutan `texts`. Tanpa cache, langsung memanggil `embed_fn`.
+    """
+    if cache is None:
+        return embed_fn(texts)
+
+    result: Dict[int, List[float]] = cache.get_many(model, dimensions, texts)
+    # Kumpulkan teks yang belum ada di cache (teks duplikat cukup di-embed sekali).
+    missing: Dict[str, List[int]] = {}
+    for i, t in enumerate(texts):
+        if i not in result:
+            missing.setdefault(t, []).append(i)
+
+    if missing:
+        miss_texts = list(missing)
+        new_vectors = embed_fn(miss_texts)
+        cache.put_many(model, dimensions, miss_texts, new_vectors)
+        for t, vec in zip(miss_texts, new_vectors):
+            for i in missing[t]:
+                result[i] = list(vec)
+
+    return [result[i] for i in range(len(texts))]
+
+
+def normalize_query(query: str) -> str:
+    """Normalisasi teks query (huruf kecil, spasi dirapikan) agar variasi penulisan kecil memakai cache yang sama."""
+    return " ".join(query.lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Cache embedding query dua tingkat:
+    1. LRU di memori proses dengan TTL (tanpa I/O sama sekali).
+    2. EmbeddingCache di disk, dipakai bersama oleh semua worker Streamlit.
+    Hanya query yang tidak ada di kedua tingkat yang dikirim ke `embed_fn`.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        model: str,
+        dimensions: Optional[int] = None,
+        disk: Optional[EmbeddingCache] = None,
+        max_items: int = 1024,
+        ttl_seconds: float = 3600,
+        aembed_fn: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.aembed_fn = aembed_fn
+        self.model = model
+        self.dimensions = dimensions
+        self.disk = disk
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._lru: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"memory": 0, "disk": 0, "miss": 0}
+
+    def _memory_get(self, key: str, now: float) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._lru.move_to_end(key)
+                self.counters["memory"] += 1
+                return entry[1]
+        return None
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        return self.disk.get_many(self.model, self.dimensions, [key]).get(0) if self.disk is not None else None
+
+    def _remember(self, keys: List[str], vectors: List[List[float]], tier: str, now: float):
+        """Menyimpan query (key unik) ke LRU memori; hasil embedding baru juga ditulis ke disk dalam satu batch."""
+        if tier == "miss" and self.disk is not None and keys:
+            self.disk.put_many(self.model, self.dimensions, keys, vectors)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self.counters[tier] += 1
+                self._lru[key] = (now, vector)
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    def lookup(self, query: str) -> Tuple[List[float], str]:
+        """
+        Mengambil embedding query.
+        Hasilnya: (vektor, tingkat sumber: "memory", "disk", atau "miss")
+        """
+        key = normalize_query(query)
+        now = time.monotonic()
+        vector = self._memory_get(key, now)
+        if vector is not None:
+            return vector, "memory"
+
+        vector, tier = self._disk_get(key), "disk"
+        if vector is None:
+            vector, tier = list(self.embed_fn([key])[0]), "miss"
+        self._remember([key], [vector], tier, now)
+        return vector, tier
+
+    async def alookup(self, query: str) -> Tuple[List[float], str]:
+        """
+        Versi async dari `lookup`: cache miss memanggil `aembed_fn` (jika ada) sehingga beberapa query
+        bisa di-embed bersamaan di satu event loop. Lookup memori dan SQLite tetap sinkron (cepat, lokal).
+        """
+        if self.aembed_fn is None:
+            return self.lookup(query)
+        key = normalize_query(query)
+        now = time.monotonic()
+        vector = self._memory_get(key, now)
+        if vector is not None:
+            return vector, "memory"
+
+        vector, tier = self._disk_get(key), "disk"
+        if vector is None:
+            vector, tier = list((await self.aembed_fn([key]))[0]), "miss"
+        self._remember([key], [vector], tier, now)
+        return vector, tier
+
+    def _lookup_cached(self, queries: Sequence[str], now: float) -> Tuple[List[str], Dict[str, List[float]], Dict[str, str], List[str]]:
+        """
+        Tahap cache untuk batch: LRU memori, lalu satu query SQLite untuk semua sisanya.
+        Query yang sama (setelah normalisasi) hanya dicari dan dihitung sekali.
+        Hasilnya: (key per query, {key: vektor}, {key: tingkat sumber}, key unik yang harus di-embed)
+        """
+        keys = [normalize_query(q) for q in queries]
+        found: Dict[str, List[float]] = {}
+        tiers: Dict[str, str] = {}
+        for key in dict.fromkeys(keys):
+            vector = self._memory_get(key, now)
+            if vector is not None:
+                found[key], tiers[key] = vector, "memory"
+        pending = [k for k in dict.fromkeys(keys) if k not in found]
+        if pending and self.disk is not None:
+            hits = self.disk.get_many(self.model, self.dimensions, pending)
+            for j, key in enumerate(pending):
+                if j in hits:
+                    found[key], tiers[key] = hits[j], "disk"
+            self._remember([k for k in pending if k in found], [found[k] for k in pending if k in found], "disk", now)
+        missing = [k for k in pending if k not in found]
+        return keys, found, tiers, missing
+
+    def _finish_many(self, keys: List[str], found: Dict[str, List[float]], tiers: Dict[str, str], missing: List[str], embedded, now: float) -> Tuple[List[List[float]], List[str]]:
+        """Menyimpan hasil embedding cache miss (sekali per key unik), lalu menyusun hasil sesuai urutan query."""
+        new = [list(v) for v in embedded]
+        self._remember(missing, new, "miss", now)
+        for key, vector in zip(missing, new):
+            found[key], tiers[key] = vector, "miss"
+        return [found[k] for k in keys], [tiers[k] for k in keys]
+
+    def lookup_many(self, queries: Sequence[str]) -> Tuple[List[List[float]], List[str]]:
+        """
+        Mengambil embedding banyak query sekaligus: semua cache miss di-embed dalam satu panggilan `embed_fn`.
+        Hasilnya: (daftar vektor, daftar tingkat sumber) dengan urutan sama seperti `queries`.
+        """
+        now = time.monotonic()
+        keys, found, tiers, missing = self._lookup_cached(queries, now)
+        embedded = self.embed_fn(missing) if missing else []
+        return self._finish_many(keys, found, tiers, missing, embedded, now)
+
+    async def alookup_many(self, queries: Sequence[str]) -> Tuple[List[List[float]], List[str]]:
+        """Versi async dari `lookup_many` (memakai `aembed_fn` jika ada)."""
+        if self.aembed_fn is None:
+            return self.lookup_many(queries)
+        now = time.monotonic()
+        keys, found, tiers, missing = self._lookup_cached(queries, now)
+        embedded = (await self.aembed_fn(missing)) if missing else []
+        return self._finish_many(keys, found, tiers, missing, embedded, now)
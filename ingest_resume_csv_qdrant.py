@@ -2,15 +2,46 @@
 
 import os
 import sys
+import json
 import uuid
-from typing import List
+import time
+import hashlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 from bs4 import BeautifulSoup
 
+# Parser HTML: gunakan lxml (C, jauh lebih cepat) jika terinstal, fallback ke html.parser bawaan Python
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 # Import Library Qdrant
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
+from qdrant_client.models import (
+    VectorParams, Distance, PointStruct, PointIdsList, HnswConfigDiff,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig,
+    SearchParams, QuantizationSearchParams, PayloadSchemaType,
+)
+
+# Cache embedding lokal agar chunk yang sama tidak di-embed ulang
+from embedding_cache import EmbeddingCache, embed_with_cache
+# Side store lokal untuk metadata lengkap per resume dan indeks kalimat chunk (snippet)
+from resume_store import ResumeStore, RESUME_STORE_PATH
+from sentence_index import encode_sentences
+# Indeks leksikal (BM25) lokal untuk hybrid retrieval di aplikasi
+from lexical_index import LexicalIndex, LEXICAL_INDEX_PATH
+# Nama collection centroid per resume (dibaca aplikasi untuk retrieval dua tahap)
+from retrieval import centroid_collection_name
+# Backend vector store dan embedding (remote Qdrant / OpenAI, atau lokal tanpa jaringan)
+from backends import make_qdrant_client, required_settings, HashingEmbedder, LOCAL_EMBEDDING_MODEL, LOCAL_EMBED_DIM
 
 # Import Library OpenAI embedding
 try:
@@ -24,12 +55,54 @@ except Exception as e:
 # Variabel untuk file input, chunking, dan interaksi API.
 # ----------------------------------------------------------------------
 CSV_PATH = sys.argv[1] if len(sys.argv) > 1 else "Resume.csv"
-COLLECTION_NAME = "resumes_v1" # Nama collection di Qdrant untuk menyimpan vector
+COLLECTION_NAME = os.getenv("QDRANT_COLLECTION", "resumes_v1") # Nama collection di Qdrant untuk menyimpan vector
 CHUNK_SIZE = 1000             # Karakter maksimum per bagian teks (chunk) sebelum di-embed (menggunakan 1000)
 CHUNK_OVERLAP = 200           # Overlap antar bagian (chunk) berurutan untuk menjaga konteks (menggunakan 200)
-EMBEDDING_MODEL = "text-embedding-3-small" # Model embedding OpenAI yang digunakan untuk menghasilkan vektor
+# Backend: "qdrant" (remote), "local" (Qdrant embedded di QDRANT_PATH), atau "numpy" (memmap di NUMPY_STORE_PATH)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+# Backend embedding: "openai", atau "local" (hashing deterministik, tanpa jaringan)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+QDRANT_PATH = os.getenv("QDRANT_PATH")            # Folder Qdrant embedded (atau ":memory:")
+NUMPY_STORE_PATH = os.getenv("NUMPY_STORE_PATH")  # Folder vector store NumPy
+EMBEDDING_MODEL = LOCAL_EMBEDDING_MODEL if EMBEDDING_BACKEND == "local" else "text-embedding-3-small" # Model embedding yang digunakan untuk menghasilkan vektor
 EMBED_BATCH_SIZE = 100        # Jumlah chunk teks yang dikirim ke API OpenAI dalam satu request
 UPSERT_BATCH_SIZE = 64        # Jumlah poin (vektor) yang dikirim ke Qdrant dalam satu request upsert
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "500"))  # Jumlah baris CSV yang dibaca per potongan (streaming)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))    # Jumlah request embedding yang berjalan bersamaan
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))  # Jumlah batch upsert yang boleh menunggu ack bersamaan
+if VECTOR_BACKEND != "qdrant":
+    # Backend lokal berjalan di dalam proses (Qdrant embedded tidak thread-safe), upsert dijalankan satu per satu
+    UPSERT_CONCURRENCY = 1
+HTML_WORKERS = int(os.getenv("HTML_WORKERS", str(os.cpu_count() or 1)))  # Jumlah proses untuk membersihkan Resume_html (1 = tanpa pool)
+HTML_BATCH_ROWS = 32          # Jumlah baris HTML yang dikirim ke satu proses worker sekaligus
+HTML_POOL_MIN_ROWS = int(os.getenv("HTML_POOL_MIN_ROWS", "128"))  # Process pool baru dibuat jika satu potongan CSV punya minimal sebanyak ini baris HTML
+# File manifest checkpoint: mencatat batch yang sudah ter-commit agar run ulang bisa melanjutkan
+CHECKPOINT_PATH = os.getenv("INGEST_CHECKPOINT", f".ingest_checkpoint_{COLLECTION_NAME}.jsonl")
+INGEST_RESET = os.getenv("INGEST_RESET", "0") == "1"  # Set 1 untuk mengabaikan checkpoint dan ingest ulang dari awal
+# Namespace tetap untuk uuid5, sehingga ID poin selalu sama untuk chunk yang sama
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2a9e-3b7d-4e55-9a0c-5d2f8e1b7c43")
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE", "1") == "1"  # Set 0 untuk mematikan cache embedding di disk
+# Mode ingest: "full" (upsert semua baris) atau "delta" (hanya resume baru/berubah, hapus resume yang hilang)
+INGEST_MODE = os.getenv("INGEST_MODE", "full")
+SCROLL_BATCH_SIZE = 1000      # Jumlah poin per request scroll saat membaca hash resume di collection
+DELETE_BATCH_SIZE = 1000      # Jumlah ID poin per request delete
+# Versi layout payload poin; dinaikkan jika field payload berubah agar mode delta/checkpoint menulis ulang poin lama
+PAYLOAD_LAYOUT_VERSION = 4
+# ----------------------------------------------------------------------
+# Layout penyimpanan vektor (hanya berlaku saat collection dibuat)
+# ----------------------------------------------------------------------
+EMBED_DIMENSIONS = int(os.getenv("EMBED_DIMENSIONS", "0")) or None  # Dimensi embedding yang diminta ke OpenAI (mis. 512); kosong = default model
+QUANTIZATION = os.getenv("QUANTIZATION", "none")                    # "none", "scalar" (int8, 4x lebih kecil), atau "binary" (32x lebih kecil)
+QUANTIZATION_OVERSAMPLING = float(os.getenv("QUANTIZATION_OVERSAMPLING", "2.0"))  # Oversampling kandidat sebelum rescoring
+VECTORS_ON_DISK = os.getenv("VECTORS_ON_DISK", "0") == "1"          # Simpan vektor float32 asli di disk (mmap)
+PAYLOAD_ON_DISK = os.getenv("PAYLOAD_ON_DISK", "0") == "1"          # Simpan payload di disk
+HNSW_M = int(os.getenv("HNSW_M", "16"))                             # Jumlah edge per node graf HNSW
+HNSW_EF_CONSTRUCT = int(os.getenv("HNSW_EF_CONSTRUCT", "100"))      # Ukuran kandidat saat membangun graf HNSW
+# Field payload yang diberi index keyword, agar filter kategori/ID di aplikasi memakai filtered HNSW
+PAYLOAD_INDEX_FIELDS = ["Category", "ID"]
+# Collection kedua berisi satu vektor per resume (rata-rata embedding chunk-nya) untuk retrieval dua tahap
+CENTROIDS_ENABLED = os.getenv("CENTROIDS", "1") == "1"  # Set 0 untuk tidak menulis collection centroid
+CENTROID_COLLECTION = centroid_collection_name(COLLECTION_NAME)
 # ----------------------------------------------------------------------
 
 # ----------------------------------------------------------------------
@@ -39,27 +112,97 @@ UPSERT_BATCH_SIZE = 64        # Jumlah poin (vektor) yang dikirim ke Qdrant dala
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not (QDRANT_URL and QDRANT_API_KEY and OPENAI_API_KEY):
-    raise SystemExit("set QDRANT_URL, QDRANT_API_KEY, and OPENAI_API_KEY env vars before running.")
+# Client embedding dan cache embedding dibuat oleh init_clients() (dipanggil main()), bukan saat import,
+# agar proses worker HTML dan script lain yang mengimpor modul ini tidak membuat client / membuka cache.
+openai_client = None
+local_embedder = None
+embedding_cache = None
 
-# Membuat instance client OpenAI v1 untuk menghasilkan embedding
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+def init_clients():
+    """
+    Memeriksa setting wajib backend terpilih, lalu membuat client OpenAI (atau embedder lokal)
+    dan cache embedding yang dipakai `get_embeddings`.
+    """
+    global openai_client, local_embedder, embedding_cache
+    # Hanya setting yang dibutuhkan backend terpilih yang wajib diisi (backend lokal tidak butuh jaringan)
+    missing = [name for name in required_settings(VECTOR_BACKEND, EMBEDDING_BACKEND) if not os.getenv(name)]
+    if missing:
+        raise SystemExit(f"set {', '.join(missing)} env vars before running (VECTOR_BACKEND={VECTOR_BACKEND}, EMBEDDING_BACKEND={EMBEDDING_BACKEND}).")
+
+    # Membuat instance client OpenAI v1 untuk menghasilkan embedding, atau embedder lokal
+    openai_client = OpenAI(api_key=OPENAI_API_KEY) if EMBEDDING_BACKEND == "openai" else None
+    # (dimensi embedder lokal diatur lewat LOCAL_EMBED_DIM; EMBED_DIMENSIONS hanya untuk model OpenAI)
+    local_embedder = HashingEmbedder(dim=LOCAL_EMBED_DIM) if EMBEDDING_BACKEND == "local" else None
+    # Cache embedding (SQLite, key: model + dimensions + sha256 teks); hanya cache miss yang dikirim ke API
+    embedding_cache = EmbeddingCache() if EMBED_CACHE_ENABLED else None
 
 # ----------------------------------------------------------------------
 # Fungsi Utility Tambahan untuk Persiapan Teks
 # ----------------------------------------------------------------------
 
-def strip_html(html: str) -> str:
+def strip_html(html: str, parser: str = HTML_PARSER) -> str:
     """
     Membersihkan konten HTML dengan menghapus tag dan mengekstrak teks.
     Dilakukan dengan BeautifulSoup untuk mengurai teks.
     """
     if not isinstance(html, str) or not html.strip():
         return ""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, parser)
     # Menggunakan '\n' sebagai pemisah untuk menjaga pemisah paragraf
     return soup.get_text(separator="\n").strip()
 
+def _strip_html_batch(htmls: List[str]) -> List[str]:
+    """
+    Membersihkan satu batch HTML. Didefinisikan di level modul agar bisa dijalankan di proses worker.
+    """
+    return [strip_html(h) for h in htmls]
+
+class HtmlCleaner:
+    """
+    Tahap pembersihan HTML paralel menggunakan process pool (BeautifulSoup terikat CPU dan GIL).
+    Pool baru dibuat saat satu panggilan `clean` berisi minimal `pool_min_rows` baris (biasanya hanya sedikit
+    baris yang butuh pembersihan HTML, dan itu lebih cepat dikerjakan langsung di proses utama).
+    Baris dikirim ke worker per batch `batch_rows`, dan throughput (rows/s) dicatat untuk laporan.
+    """
+
+    def __init__(self, workers: int = HTML_WORKERS, batch_rows: int = HTML_BATCH_ROWS, pool_min_rows: int = HTML_POOL_MIN_ROWS):
+        self.workers = max(1, workers)
+        self.batch_rows = batch_rows
+        self.pool_min_rows = pool_min_rows
+        self.rows = 0
+        self.seconds = 0.0
+        self.pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            # Proses worker dibuat dengan spawn: pool bisa dimulai saat thread pool embedding/upsert
+            # sudah berjalan (fork dari proses multi-thread rawan deadlock).
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.pool
+
+    def clean(self, htmls: List[str]) -> List[str]:
+        """Membersihkan daftar HTML dan mengembalikan teks dengan urutan yang sama."""
+        t0 = time.perf_counter()
+        if self.workers == 1 or len(htmls) < max(self.pool_min_rows, self.batch_rows + 1):
+            cleaned = _strip_html_batch(htmls)
+        else:
+            batches = [htmls[i : i + self.batch_rows] for i in range(0, len(htmls), self.batch_rows)]
+            cleaned = [text for part in self._get_pool().map(_strip_html_batch, batches) for text in part]
+        self.rows += len(htmls)
+        self.seconds += time.perf_counter() - t0
+        return cleaned
+
+    def report(self):
+        """Mencetak throughput pembersihan HTML, untuk menentukan jumlah worker yang sesuai mesin."""
+        if self.rows:
+            rate = self.rows / max(self.seconds, 1e-9)
+            workers = self.workers if self.pool is not None else 1
+            print(f"HTML cleaning: {self.rows} rows in {self.seconds:.1f}s ({rate:,.0f} rows/s, workers={workers}, parser={HTML_PARSER})")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
 def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
     """
     Membagi teks panjang menjadi chunk yang lebih kecil dan tumpang tindih, untuk embedding.
@@ -82,183 +225,760 @@ def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVE
         start = max(end - overlap, start + 1)
     return chunks
 
-def get_embeddings(texts: List[str], model: str = EMBEDDING_MODEL, batch_size: int = EMBED_BATCH_SIZE):
+def content_hash(text: str) -> str:
+    """
+    Menghasilkan hash sha256 (hex) dari teks, dipakai sebagai sidik jari konten chunk.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def make_point_id(resume_id, chunk_index: int, text_hash: str) -> str:
+    """
+    Membuat ID poin deterministik dari (ID resume, chunk_index, hash konten).
+    Chunk yang sama selalu mendapat ID yang sama, sehingga upsert ulang menimpa poin lama
+    dan tidak membuat duplikat.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{resume_id}:{chunk_index}:{text_hash}"))
+
+def resume_key(resume_id, row_index: int) -> str:
+    """
+    Kunci resume yang dipakai untuk ID poin dan perbandingan delta: ID resume, atau index baris jika ID kosong.
+    ID numerik yang terbaca sebagai float (kolom ID berisi NaN) ditulis sebagai bilangan bulat ("123", bukan "123.0").
+    """
+    if resume_id is None:
+        return f"row{row_index}"
+    if isinstance(resume_id, float) and resume_id.is_integer():
+        return str(int(resume_id))
+    return str(resume_id)
+
+def resume_hash(text: str, payload: dict) -> str:
+    """
+    Hash konten per resume: teks, payload dasar, setting chunking, dan versi layout payload.
+    Jika salah satunya berubah, semua poin resume tersebut perlu ditulis ulang.
+    """
+    blob = json.dumps(
+        {"text": text, "payload": payload, "chunk": [CHUNK_SIZE, CHUNK_OVERLAP], "layout": PAYLOAD_LAYOUT_VERSION},
+        sort_keys=True, default=str,
+    )
+    return content_hash(blob)
+
+def batch_key(point_ids: List[str]) -> str:
+    """
+    Kunci unik untuk satu batch, diturunkan dari ID poin di dalamnya.
+    """
+    return hashlib.sha256("\n".join(point_ids).encode("utf-8")).hexdigest()[:32]
+
+class CheckpointManifest:
+    """
+    Manifest checkpoint lokal (JSONL) yang mencatat batch yang sudah ter-commit ke Qdrant.
+    Baris pertama adalah header berisi setting ingest; jika setting berubah (mis. model embedding),
+    manifest lama diabaikan karena vektornya tidak lagi valid.
+    """
+
+    def __init__(self, path: str, settings: dict, reset: bool = False):
+        self.path = path
+        self.settings = settings
+        self.done: Set[str] = set()
+        if not reset and os.path.exists(path):
+            self._load()
+        if not self.done:
+            # Mulai manifest baru dengan header setting saat ini
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"settings": settings}) + "\n")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get("settings") != self.settings:
+            print(f"Checkpoint {self.path} dibuat dengan setting berbeda, diabaikan.")
+            return
+        self.done = {rec["batch"] for rec in lines[1:] if "batch" in rec}
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def mark_done(self, key: str, n_points: int):
+        """
+        Mencatat batch yang sudah ter-commit. Ditulis langsung ke disk (flush + fsync)
+        agar tetap tercatat walaupun proses mati tepat setelahnya.
+        """
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"batch": key, "points": n_points}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.add(key)
+
+def centroid_point_id(resume_key: str) -> str:
+    """ID poin centroid deterministik per resume (ditimpa saat resume berubah)."""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"centroid:{resume_key}"))
+
+class CentroidAccumulator:
+    """
+    Menjumlahkan embedding chunk (dinormalisasi) per resume selama streaming ingest.
+    Chunk satu resume selalu berurutan di aliran record, sehingga resume dianggap lengkap begitu
+    chunk resume berikutnya muncul; hanya resume yang sedang berjalan yang disimpan di memori.
+    """
+
+    def __init__(self):
+        self.sums: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, int] = {}
+        self.categories: Dict[str, Optional[str]] = {}
+
+    def add(self, key: str, category: Optional[str], vector):
+        vec = np.asarray(vector, dtype=np.float64)
+        norm = np.linalg.norm(vec)
+        vec = vec / norm if norm > 0 else vec
+        if key in self.sums:
+            self.sums[key] += vec
+            self.counts[key] += 1
+        else:
+            self.sums[key] = vec
+            self.counts[key] = 1
+            self.categories[key] = category
+
+    def add_batch(self, batch: List[Tuple[str, str, dict]], vectors: Dict[str, list]):
+        """Menambahkan satu batch record (point_id, teks, payload) dengan vektor per ID poin."""
+        for point_id, _, payload in batch:
+            if point_id in vectors:
+                self.add(payload["ID"], payload.get("Category"), vectors[point_id])
+
+    def pop_finished(self, final: bool = False) -> List[PointStruct]:
+        """Mengeluarkan poin centroid untuk resume yang sudah lengkap (semua resume jika `final`)."""
+        keys = list(self.sums) if final else list(self.sums)[:-1]
+        points = []
+        for key in keys:
+            n_chunks = self.counts.pop(key)
+            mean = self.sums.pop(key) / n_chunks
+            category = self.categories.pop(key)
+            payload = {"ID": key, "n_chunks": n_chunks}
+            if category is not None:
+                payload["Category"] = category
+            points.append(PointStruct(id=centroid_point_id(key), vector=mean.astype(np.float32).tolist(), payload=payload))
+        return points
+
+def fetch_vectors(client: QdrantClient, name: str, point_ids: List[str]) -> Dict[str, list]:
+    """Membaca vektor poin yang sudah tersimpan (untuk batch yang dilewati karena checkpoint)."""
+    records = client.retrieve(collection_name=name, ids=point_ids, with_payload=False, with_vectors=True)
+    return {str(r.id): r.vector for r in records}
+
+def backfill_centroids(client: QdrantClient, name: str, centroid_name: str) -> int:
+    """
+    Membangun collection centroid dari seluruh poin chunk yang sudah ada (bulk scroll dengan vektor),
+    untuk collection yang di-ingest sebelum centroid ditulis.
+    Hasilnya: jumlah centroid yang ditulis.
+    """
+    acc = CentroidAccumulator()
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=name, limit=SCROLL_BATCH_SIZE, offset=offset,
+            with_payload=["ID", "Category"], with_vectors=True,
+        )
+        for p in points:
+            payload = p.payload or {}
+            if payload.get("ID") is not None:
+                acc.add(payload["ID"], payload.get("Category"), p.vector)
+        if offset is None:
+            break
+    centroids = acc.pop_finished(final=True)
+    for b in range(0, len(centroids), UPSERT_BATCH_SIZE):
+        client.upsert(collection_name=centroid_name, points=centroids[b : b + UPSERT_BATCH_SIZE], wait=True)
+    return len(centroids)
+
+def load_existing_resumes(client: QdrantClient, name: str) -> Dict[str, Tuple[Set[str], List[str]]]:
+    """
+    Membaca (ID poin, ID resume, hash resume) dari seluruh collection lewat bulk scroll tanpa vektor.
+    Hasilnya: {kunci resume: (set hash resume, daftar ID poin)}
+    """
+    existing: Dict[str, Tuple[Set[str], List[str]]] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=name, limit=SCROLL_BATCH_SIZE, offset=offset,
+            with_payload=["ID", "row_index", "resume_hash"], with_vectors=False,
+        )
+        for p in points:
+            payload = p.payload or {}
+            # row_index hanya ada di poin lama (layout v1) yang tidak memiliki ID
+            key = resume_key(payload.get("ID"), payload.get("row_index"))
+            hashes, ids = existing.setdefault(key, (set(), []))
+            hashes.add(payload.get("resume_hash"))
+            ids.append(str(p.id))
+        if offset is None:
+            break
+    return existing
+
+class DeltaTracker:
+    """
+    Membandingkan CSV baru dengan isi collection untuk mode delta.
+    - Resume yang hash-nya sama dilewati (tidak di-chunk, di-embed, atau di-upsert).
+    - Resume baru/berubah di-ingest; poin lama resume berubah yang tidak ditulis ulang dihapus.
+    - Resume yang tidak ada lagi di CSV dihapus seluruh poinnya.
+    Dengan `full=True` (mode full ke collection yang sudah ada) semua resume tetap di-ingest dan resume
+    yang hilang dari CSV dibiarkan; hanya poin lama resume yang berubah yang dihapus agar tidak yatim.
+    """
+
+    def __init__(self, existing: Dict[str, Tuple[Set[str], List[str]]], full: bool = False):
+        self.existing = existing
+        self.full = full
+        self.seen: Set[str] = set()
+        self.new_ids_of_changed: Dict[str, Set[str]] = {}
+        self.n_new = 0
+        self.n_unchanged = 0
+
+    def needs_ingest(self, key: str, new_hash: str) -> bool:
+        self.seen.add(key)
+        old = self.existing.get(key)
+        if old is None:
+            self.n_new += 1
+            return True
+        # Resume dianggap sama hanya jika semua poinnya memiliki hash yang sama dengan hash baru
+        if old[0] == {new_hash}:
+            self.n_unchanged += 1
+            return self.full
+        self.new_ids_of_changed.setdefault(key, set())
+        return True
+
+    def add_point(self, key: str, point_id: str):
+        if key in self.new_ids_of_changed:
+            self.new_ids_of_changed[key].add(point_id)
+
+    def stale_point_ids(self) -> List[str]:
+        """ID poin yang harus dihapus: semua poin resume yang hilang, dan poin lama resume yang berubah."""
+        stale = []
+        for key, (_, ids) in self.existing.items():
+            if key not in self.seen:
+                if not self.full:
+                    stale.extend(ids)
+            elif key in self.new_ids_of_changed:
+                keep = self.new_ids_of_changed[key]
+                stale.extend(i for i in ids if i not in keep)
+        return stale
+
+    def removed_keys(self) -> List[str]:
+        """Kunci resume yang ada di collection tetapi tidak ada lagi di CSV (kosong pada mode full)."""
+        if self.full:
+            return []
+        return [key for key in self.existing if key not in self.seen]
+
+    def summary(self) -> str:
+        removed = len(self.removed_keys())
+        return f"new: {self.n_new}, changed: {len(self.new_ids_of_changed)}, unchanged: {self.n_unchanged}, removed: {removed}"
+
+def get_embeddings(texts: List[str], model: str = EMBEDDING_MODEL, batch_size: int = EMBED_BATCH_SIZE, dimensions: Optional[int] = EMBED_DIMENSIONS):
     """
     Menghasilkan embedding vector untuk daftar string teks 
     dengan memanggil OpenAI Embeddings API dalam mode batch.
+    `dimensions` meminta vektor yang lebih pendek dari model text-embedding-3-*.
+    Teks yang sudah ada di cache embedding tidak dikirim ulang ke API.
     Hasilnya: daftar vector embedding (list[float])
     """
-    embeddings = []
-    # Memproses teks dalam batch untuk menjaga batas API dan efisien
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        try:
-            # Memanggil API OpenAI untuk embedding
-            resp = openai_client.embeddings.create(model=model, input=batch)
-        except Exception as e:
-            raise RuntimeError(f"OpenAI embeddings API error: {e}") from e
-        
-        # Mengekstrak data vector dari respons
-        for item in resp.data:
-            embeddings.append(item.embedding)
-    return embeddings
+    def _embed_api(batch_texts: List[str]):
+        if local_embedder is not None:
+            # Embedding lokal: dihitung di proses ini, tanpa request API
+            return local_embedder.embed_documents(batch_texts)
+        embeddings = []
+        # Memproses teks dalam batch untuk menjaga batas API dan efisien
+        for i in range(0, len(batch_texts), batch_size):
+            batch = batch_texts[i : i + batch_size]
+            try:
+                # Memanggil API OpenAI untuk embedding
+                kwargs = {"dimensions": dimensions} if dimensions else {}
+                resp = openai_client.embeddings.create(model=model, input=batch, **kwargs)
+            except Exception as e:
+                raise RuntimeError(f"OpenAI embeddings API error: {e}") from e
+
+            # Mengekstrak data vector dari respons
+            for item in resp.data:
+                embeddings.append(item.embedding)
+        return embeddings
+
+    return embed_with_cache(texts, _embed_api, model=model, dimensions=dimensions, cache=embedding_cache)
+
+def quantization_config(quantization: str = QUANTIZATION):
+    """
+    Konfigurasi quantization sesuai QUANTIZATION. Vektor hasil quantization selalu di RAM,
+    vektor float32 asli dipakai untuk rescoring (bisa disimpan di disk dengan VECTORS_ON_DISK=1).
+    """
+    if quantization == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    if quantization != "none":
+        raise SystemExit(f"QUANTIZATION tidak dikenal: {quantization} (gunakan 'none', 'scalar', atau 'binary').")
+    return None
+
+def search_params(quantization: str = QUANTIZATION) -> Optional[SearchParams]:
+    """Parameter pencarian: rescoring dengan vektor asli jika collection memakai quantization."""
+    if quantization == "none":
+        return None
+    return SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=QUANTIZATION_OVERSAMPLING))
+
+def estimate_vector_memory(n_points: int, dim: int) -> str:
+    """
+    Perkiraan kasar memori untuk layout yang dipilih: vektor float32, vektor quantized, dan graf HNSW
+    (sekitar 2*m link x 4 byte per poin di layer 0).
+    """
+    raw = n_points * dim * 4
+    quantized = {"scalar": n_points * dim, "binary": n_points * dim // 8}.get(QUANTIZATION, 0)
+    hnsw = n_points * HNSW_M * 2 * 4
+    ram = (0 if VECTORS_ON_DISK else raw) + quantized + hnsw
+    mb = lambda b: f"{b / 1024 ** 2:,.1f} MB"
+    return (
+        f"{n_points:,} points x dim {dim}: float32 {mb(raw)} ({'disk' if VECTORS_ON_DISK else 'RAM'}), "
+        f"quantized ({QUANTIZATION}) {mb(quantized)}, HNSW m={HNSW_M} {mb(hnsw)} -> RAM ~{mb(ram)}"
+    )
 
 def create_collection_if_missing(client: QdrantClient, name: str, dim: int):
     """
     Memeriksa apakah koleksi Qdrant ada dan membuatnya jika belum ada.
-    Ini mendefinisikan dimensi vektor (dim) dan metrik jarak (COSINE).
+    Ini mendefinisikan dimensi vektor (dim), metrik jarak (COSINE), quantization,
+    penyimpanan on-disk, dan parameter graf HNSW.
     """
     if not client.collection_exists(name):
         # Membuat collection dengan konfigurasi vector yang ditentukan
         client.create_collection(
             collection_name=name, 
-            vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+            vectors_config=VectorParams(size=dim, distance=Distance.COSINE, on_disk=VECTORS_ON_DISK),
+            hnsw_config=HnswConfigDiff(m=HNSW_M, ef_construct=HNSW_EF_CONSTRUCT),
+            quantization_config=quantization_config(),
+            on_disk_payload=PAYLOAD_ON_DISK,
         )
-        print(f"Created collection {name} with dim {dim}")
+        print(f"Created collection {name} with dim {dim}, quantization={QUANTIZATION}, "
+              f"vectors_on_disk={VECTORS_ON_DISK}, payload_on_disk={PAYLOAD_ON_DISK}, hnsw m={HNSW_M} ef_construct={HNSW_EF_CONSTRUCT}")
+        print("Memory estimate per 1M points:", estimate_vector_memory(1_000_000, dim))
+        # Index payload dibuat sebelum data masuk, sehingga graf HNSW dibangun dengan edge tambahan per nilai filter
+        ensure_payload_indexes(client, name)
     else:
-        print(f"Collection {name} already exists")
+        print(f"Collection {name} already exists (storage settings are only applied on creation)")
+
+def ensure_payload_indexes(client: QdrantClient, name: str):
+    """
+    Membuat index keyword untuk field di PAYLOAD_INDEX_FIELDS yang belum punya index.
+    Dipanggil juga untuk collection lama, sehingga filter Category/ID tidak perlu memindai semua poin.
+    """
+    schema = client.get_collection(name).payload_schema or {}
+    for field in PAYLOAD_INDEX_FIELDS:
+        if field not in schema:
+            client.create_payload_index(collection_name=name, field_name=field, field_schema=PayloadSchemaType.KEYWORD, wait=True)
+            print(f"Created keyword payload index on {field}")
 
 # ----------------------------------------------------------------------
-# Fungsi Utama untuk Ingest Vector
+# Tahapan Pipeline Streaming (CSV -> chunk -> batch)
+# Setiap tahap adalah generator, sehingga memori tetap konstan berapa pun ukuran CSV.
 # ----------------------------------------------------------------------
 
-def main():
-    # Memuat file CSV sumber ke dalam pandas DataFrame
-    df = pd.read_csv(CSV_PATH)
-    print(f"Loaded {len(df)} rows. Columns: {list(df.columns)}")
-
-    # 1. Menentukan kolom sumber untuk teks yang akan di-embed
-    preferred = None
-    if "Resume_str" in df.columns:
-        preferred = "Resume_str"
+def select_text_column(csv_path: str) -> Tuple[str, List[str]]:
+    """
+    Menentukan kolom sumber teks yang akan di-embed hanya dari header (dan sampel baris pertama
+    untuk fallback), tanpa memuat seluruh CSV ke memori.
+    Hasilnya: (nama kolom, daftar kolom CSV)
+    """
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    if "Resume_str" in columns:
         print("Akan menggunakan 'Resume_str' untuk embedding (prioritas).")
-    elif "Resume_html" in df.columns:
-        preferred = "Resume_html"
+        return "Resume_str", columns
+    if "Resume_html" in columns:
         print("Tidak ditemukan Resume_str , akan membersihkan Resume_html dan menggunakannya untuk embedding.")
-    else:
-        # Fallback: gunakan kolom string dengan panjang rata-rata terpanjang
-        candidate_cols = [c for c in df.columns if df[c].dtype == object]
-        if not candidate_cols:
-            raise SystemExit("Tidak ditemukan kolom teks untuk di-embed.")
-        avg_lens = {c: df[c].astype(str).map(len).mean() for c in candidate_cols}
-        preferred = max(avg_lens, key=avg_lens.get)
-        print(f"Tidak ada Resume_str/Resume_html. Menggunakan kolom '{preferred}' untuk embedding.")
-
-    # Memulai koneksi clien Qdrant
-    client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-
-    # Daftar untuk menyimpan chunk teks dan metadata terkait (payload)
-    docs = []
-    payloads = []
-
-    # 2. Memproses setiap baris (resume) untuk menghasilkan chunk teks dan payload
-    for idx, row in df.iterrows():
-        text_raw = ""
-        
-        # Ekstrak dan bersihkan kolom teks utama
+        return "Resume_html", columns
+
+    # Fallback: gunakan kolom string dengan panjang rata-rata terpanjang (dihitung dari sampel)
+    sample = pd.read_csv(csv_path, nrows=CSV_CHUNK_ROWS)
+    candidate_cols = [c for c in sample.columns if sample[c].dtype == object]
+    if not candidate_cols:
+        raise SystemExit("Tidak ditemukan kolom teks untuk di-embed.")
+    avg_lens = {c: sample[c].astype(str).map(len).mean() for c in candidate_cols}
+    preferred = max(avg_lens, key=avg_lens.get)
+    print(f"Tidak ada Resume_str/Resume_html. Menggunakan kolom '{preferred}' untuk embedding.")
+    return preferred, columns
+
+def iter_csv_frames(csv_path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Membaca CSV per potongan `chunk_rows` baris. Index baris tetap berlanjut antar potongan.
+    """
+    yield from pd.read_csv(csv_path, chunksize=chunk_rows)
+
+def iter_clean_frames(frames: Iterable[pd.DataFrame], preferred: str, cleaner: HtmlCleaner) -> Iterator[Tuple[pd.DataFrame, Dict[int, str]]]:
+    """
+    Membersihkan Resume_html untuk baris yang membutuhkannya (kolom utama Resume_html, atau
+    kolom utama kosong) secara paralel lewat `cleaner`.
+    Hasilnya: generator (DataFrame, {index baris: teks hasil pembersihan})
+    """
+    for df in frames:
+        if "Resume_html" not in df.columns:
+            yield df, {}
+            continue
         if preferred == "Resume_html":
-            text_raw = strip_html(row.get("Resume_html", ""))
+            need = df["Resume_html"]
         else:
-            val = row.get(preferred, "")
-            text_raw = str(val) if pd.notna(val) else ""
             # Gunakan 'Resume_html' sebagai cadangan jika kolom utama kosong
-            if not text_raw and "Resume_html" in row and pd.notna(row["Resume_html"]):
-                text_raw = strip_html(row["Resume_html"])
-
-        # Fallback: jika teks masih kosong, gabungkan semua kolom teks lainnya
-        if not text_raw:
-            parts = []
-            for c in df.columns:
-                if c == "Resume_html": continue
-                v = row.get(c)
-                if pd.isna(v) or v is None: continue
-                s = str(v).strip()
-                if s: parts.append(f"{c}: {s}")
-            text_raw = "\n".join(parts)
-
-        if not text_raw:
-            # Lewati baris ini jika tidak ada teks yang dapat diekstrak
-            continue
+            need = df.loc[df[preferred].isna() & df["Resume_html"].notna(), "Resume_html"]
+        cleaned = dict(zip(need.index, cleaner.clean(need.tolist()))) if len(need) else {}
+        yield df, cleaned
+
+PAYLOAD_MAX_CHARS = 1000      # Panjang maksimum string di payload sebelum dipotong
 
-        # Siapkan metadata dasar (payload) untuk baris ini, termasuk semua kolom non-embedded
-        row_payload_base = {}
-        for c in df.columns:
-            if c == preferred: continue
-            val = row.get(c)
-            if pd.isna(val): continue
-            
-            # Memotong string panjang dalam payload untuk menghindari melebihi batas ukuran
-            if isinstance(val, str) and len(val) > 1000:
-                row_payload_base[c] = val[:1000] + " ...[truncated]"
-            else:
-                row_payload_base[c] = val
-
-        # Chunk teks mentah dan buat entri dokumen/payload untuk setiap chunk
-        chunks = chunk_text(text_raw)
-        for ci, ch in enumerate(chunks):
-            docs.append(ch)
-            # Payload setiap chunk mencakup data baris dasar ditambah indeks chunk
-            payload = {"row_index": int(idx), "chunk_index": ci, **row_payload_base}
-            if "ID" in df.columns and pd.notna(row.get("ID")):
-                payload["ID"] = row.get("ID")
-            payloads.append(payload)
-
-    total_docs = len(docs)
-    print(f"Prepared {total_docs} chunks for embedding and upload.")
-
-    if total_docs == 0:
-        print("No text chunks prepared. Exiting.")
+def prepare_frame(df: pd.DataFrame, preferred: str, cleaned: Dict[int, str]) -> Iterator[Tuple[int, object, str, dict]]:
+    """
+    Menyiapkan teks dan payload dasar untuk satu potongan CSV secara kolom-per-kolom (vectorized),
+    tanpa iterrows dan tanpa pd.isna per sel.
+    `cleaned` berisi teks hasil pembersihan Resume_html (dari `iter_clean_frames`).
+    Hasilnya: generator (index baris, ID resume atau None, teks, payload dasar)
+    """
+    # 1. Teks utama: kolom prioritas, lalu fallback ke Resume_html yang sudah dibersihkan
+    cleaned_text = pd.Series(cleaned, dtype=object).reindex(df.index).fillna("")
+    if preferred == "Resume_html":
+        text = cleaned_text
+    else:
+        text = df[preferred].astype(str).where(df[preferred].notna(), "")
+        text = text.where(text != "", cleaned_text)
+
+    # 2. Fallback: jika teks masih kosong, gabungkan semua kolom teks lainnya ("kolom: nilai")
+    empty = text == ""
+    if empty.any():
+        other_cols = [c for c in df.columns if c != "Resume_html"]
+        parts = []
+        for c in other_cols:
+            col = df.loc[empty, c]
+            val = col.astype(str).str.strip()
+            parts.append((c + ": " + val).where(col.notna() & (val != "")))
+        joined = pd.concat(parts, axis=1).apply(lambda r: "\n".join(r.dropna()), axis=1) if parts else ""
+        text = text.where(~empty, joined)
+
+    # Lewati baris yang tidak memiliki teks sama sekali
+    keep = text != ""
+    if not keep.any():
         return
+    text = text[keep]
+
+    # 3. Payload dasar: semua kolom non-embedded, string panjang dipotong secara vectorized
+    pruned = df.loc[keep, [c for c in df.columns if c != preferred]].astype(object)
+    for c in pruned.columns:
+        col = pruned[c]
+        strings = col[col.map(type).eq(str)]
+        if strings.empty:
+            continue
+        long_vals = strings[strings.str.len() > PAYLOAD_MAX_CHARS]
+        if not long_vals.empty:
+            pruned.loc[long_vals.index, c] = long_vals.str.slice(0, PAYLOAD_MAX_CHARS) + " ...[truncated]"
+    pruned = pruned.where(pruned.notna(), None)
+    records = pruned.to_dict("records")
+
+    # ID resume untuk ID poin deterministik (None jika kolom ID tidak ada / kosong)
+    if "ID" in df.columns:
+        ids = df.loc[keep, "ID"].astype(object)
+        ids = ids.where(ids.notna(), None).tolist()
+    else:
+        ids = [None] * len(records)
 
-    # 3. Embed dan Upsert ke Qdrant
-    all_ids = []
-    i = 0
-    # Menggunakan tqdm untuk menampilkan progres untuk proses yang berjalan lama
-    pbar = tqdm(total=total_docs, desc="Embedding+Upserting")
-    
-    while i < total_docs:
-        # Menentukan window batch untuk embedding dan upserting
-        j = min(i + EMBED_BATCH_SIZE, total_docs)
-        batch_texts = docs[i:j]
-        batch_payloads = payloads[i:j]
-        
-        # Menghasilkan embedding untuk batch chunk teks saat ini
-        batch_embs = get_embeddings(batch_texts)
-
-        # Pertama kali dijalankan, tentukan dimensi embedding dan buat koleksi Qdrant
-        if i == 0:
-            emb_dim = len(batch_embs[0])
-            create_collection_if_missing(client, COLLECTION_NAME, emb_dim)
-
-        # Mengkonversi embedding dan payload menjadi Qdrant PointStructs
-        points = []
-        for k, emb in enumerate(batch_embs):
-            uid = str(uuid.uuid4()) # Menghasilkan ID unik untuk setiap poin vektor
-            # Teks chunk lengkap disimpan dalam payload untuk pengambilan
-            payload = {"text": batch_texts[k], **batch_payloads[k]}
-            points.append(PointStruct(id=uid, vector=emb, payload=payload))
-            all_ids.append(uid)
+    for idx, resume_id, text_raw, rec in zip(text.index, ids, text.tolist(), records):
+        yield int(idx), resume_id, text_raw, {k: v for k, v in rec.items() if v is not None}
+
+def iter_chunk_records(
+    frames: Iterable[Tuple[pd.DataFrame, Dict[int, str]]], preferred: str, delta: Optional[DeltaTracker] = None,
+    store: Optional[ResumeStore] = None, lexical: Optional[LexicalIndex] = None,
+) -> Iterator[Tuple[str, str, dict]]:
+    """
+    Mengubah setiap baris (resume) menjadi chunk teks beserta payload ringkas.
+    `frames` berasal dari `iter_clean_frames` (HTML sudah dibersihkan).
+    Metadata lengkap resume ditulis sekali ke `store` (side store), tidak diulang di setiap chunk,
+    bersama indeks kalimat setiap chunk (untuk snippet) dengan key ID poin.
+    Pada mode delta, resume yang tidak berubah dilewati sebelum di-chunk.
+    Indeks leksikal `lexical` diperbarui hanya untuk resume yang hash-nya berbeda dengan isi indeks
+    (termasuk resume yang dilewati delta tetapi belum ada di indeks), dengan chunk yang sama.
+    Hasilnya: generator (point_id, teks chunk, payload)
+    """
+    for df, cleaned in frames:
+        store_rows, sentence_rows = [], []
+        for idx, resume_id, text_raw, row_payload_base in prepare_frame(df, preferred, cleaned):
+            key = resume_key(resume_id, idx)
+            r_hash = resume_hash(text_raw, row_payload_base)
+            needs_points = delta is None or delta.needs_ingest(key, r_hash)
+            needs_lexical = lexical is not None and lexical.resume_hash(key) != r_hash
+            if not (needs_points or needs_lexical):
+                continue
+
+            category = row_payload_base.get("Category")
+            chunks = [(ci, ch, content_hash(ch)) for ci, ch in enumerate(chunk_text(text_raw))]
+            if needs_lexical:
+                lexical.put_resume(key, r_hash, category, [(make_point_id(key, ci, h), ch) for ci, ch, h in chunks])
+            if not needs_points:
+                continue
+
+            meta = {c: v for c, v in row_payload_base.items() if c not in ("ID", "Category")}
+            store_rows.append((key, category, text_raw, {"row_index": idx, **meta}))
+
+            # Buat entri dokumen/payload untuk setiap chunk teks mentah
+            for ci, ch, chunk_hash in chunks:
+                # Payload ringkas: teks chunk, ID, kategori, indeks chunk, hash chunk, dan hash resume
+                payload = {"ID": key, "chunk_index": ci, "chunk_hash": chunk_hash, "resume_hash": r_hash}
+                if category is not None:
+                    payload["Category"] = category
+                point_id = make_point_id(key, ci, chunk_hash)
+                if delta is not None:
+                    delta.add_point(key, point_id)
+                if store is not None:
+                    sentence_rows.append((point_id, key, encode_sentences(ch)))
+                yield point_id, ch, payload
+
+        if store is not None:
+            store.put_many(store_rows)
+            store.put_sentences([row[0] for row in store_rows], sentence_rows)
+
+def iter_batches(records: Iterable, size: int) -> Iterator[list]:
+    """
+    Mengelompokkan aliran record menjadi batch berukuran tetap (batch terakhir bisa lebih kecil).
+    """
+    batch = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_bounded(executor: ThreadPoolExecutor, fn: Callable, items: Iterable, max_in_flight: int) -> Iterator[tuple]:
+    """
+    Menjalankan `fn(item)` di thread pool dengan maksimal `max_in_flight` pekerjaan yang berjalan.
+    Generator input baru dibaca ketika ada slot kosong (antrian terbatas / backpressure).
+    Hasilnya: generator (item, hasil fn) dengan urutan yang sama seperti input.
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, item)))
+        if len(pending) >= max_in_flight:
+            done_item, fut = pending.popleft()
+            yield done_item, fut.result()
+    while pending:
+        done_item, fut = pending.popleft()
+        yield done_item, fut.result()
 
-        # Mengunggah poin ke Qdrant dalam sub-batch yang lebih kecil
-        for b in range(0, len(points), UPSERT_BATCH_SIZE):
-            sub = points[b : b + UPSERT_BATCH_SIZE]
-            client.upsert(collection_name=COLLECTION_NAME, points=sub, wait=True)
+# ----------------------------------------------------------------------
+# Fungsi Utama untuk Ingest Vector
+# ----------------------------------------------------------------------
 
-        i = j
-        pbar.update(len(batch_texts)) # Update Progress Bar
+def main():
+    init_clients()
+
+    # 1. Menentukan kolom sumber untuk teks yang akan di-embed (CSV dibaca secara streaming)
+    preferred, columns = select_text_column(CSV_PATH)
+    print(f"Streaming {CSV_PATH} in chunks of {CSV_CHUNK_ROWS} rows. Columns: {columns}")
+
+    # Side store untuk metadata lengkap per resume (dibaca lazily oleh aplikasi)
+    store = ResumeStore(RESUME_STORE_PATH)
+    # Indeks leksikal diperbarui per resume selama stream (resume yang hash-nya sama tidak di-chunk ulang)
+    lexical = LexicalIndex.load(LEXICAL_INDEX_PATH) or LexicalIndex()
+
+    # Tahap pembersihan HTML (process pool dibuat hanya jika ada cukup banyak baris HTML)
+    cleaner = HtmlCleaner(workers=HTML_WORKERS if "Resume_html" in columns else 1)
+
+    # Memulai koneksi clien Qdrant (atau backend lokal sesuai VECTOR_BACKEND)
+    client = make_qdrant_client(VECTOR_BACKEND, url=QDRANT_URL, api_key=QDRANT_API_KEY, path=QDRANT_PATH or NUMPY_STORE_PATH)
+
+    # Muat manifest checkpoint. Jika collection belum ada (mis. sudah dihapus), checkpoint lama
+    # tidak berlaku lagi sehingga ingest dimulai dari awal.
+    settings = {
+        "collection": COLLECTION_NAME, "csv": os.path.abspath(CSV_PATH),
+        "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP,
+        "model": EMBEDDING_MODEL, "embed_batch_size": EMBED_BATCH_SIZE, "mode": INGEST_MODE,
+        "payload_layout": PAYLOAD_LAYOUT_VERSION, "dimensions": EMBED_DIMENSIONS,
+    }
+    reset = INGEST_RESET or not client.collection_exists(COLLECTION_NAME)
+    manifest = CheckpointManifest(CHECKPOINT_PATH, settings, reset=reset)
+    if manifest.done:
+        print(f"Resuming from checkpoint: {len(manifest.done)} batches already committed.")
+
+    # Bandingkan hash per resume di collection dengan CSV baru. Mode delta melewati resume yang sama;
+    # mode full ke collection yang sudah ada tetap menulis semua resume, tetapi poin lama resume yang
+    # berubah (ID poin berbeda karena hash chunk berbeda) dihapus setelahnya.
+    if INGEST_MODE not in ("full", "delta"):
+        raise SystemExit(f"INGEST_MODE tidak dikenal: {INGEST_MODE} (gunakan 'full' atau 'delta').")
+    delta = None
+    if client.collection_exists(COLLECTION_NAME):
+        existing = load_existing_resumes(client, COLLECTION_NAME)
+        print(f"{INGEST_MODE.capitalize()} mode: {len(existing)} resumes already in {COLLECTION_NAME}.")
+        delta = DeltaTracker(existing, full=INGEST_MODE == "full")
+    elif INGEST_MODE == "delta":
+        print(f"Delta mode: collection {COLLECTION_NAME} does not exist yet, ingesting everything.")
+        delta = DeltaTracker({})
+
+    # 2 & 3. Chunk setiap baris, lalu embed dan upsert ke Qdrant dalam pipeline bertahap:
+    #   - tahap embedding: maksimal EMBED_CONCURRENCY request berjalan bersamaan
+    #   - tahap upsert: upsert non-blocking (wait=False), maksimal UPSERT_CONCURRENCY batch menunggu ack
+    committed = 0
+    skipped = 0
+    collection_ready = client.collection_exists(COLLECTION_NAME)
+    if collection_ready:
+        ensure_payload_indexes(client, COLLECTION_NAME)
+    # Centroid per resume dihitung di dalam stream. Collection lama tanpa collection centroid
+    # diisi sekali dari poin yang sudah ada (backfill) setelah pipeline selesai.
+    centroid_backfill = CENTROIDS_ENABLED and collection_ready and not client.collection_exists(CENTROID_COLLECTION)
+    centroids = CentroidAccumulator() if CENTROIDS_ENABLED and not centroid_backfill else None
+    if centroids is not None and collection_ready:
+        ensure_payload_indexes(client, CENTROID_COLLECTION)
+    centroid_upserts = deque()  # Upsert centroid yang belum di-ack (maksimal UPSERT_CONCURRENCY)
+    last_centroids = None
+    # Menggunakan tqdm untuk menampilkan progres (total tidak diketahui karena CSV di-stream)
+    pbar = tqdm(desc="Embedding+Upserting", unit="chunk")
+
+    def pending_batches():
+        # Lewati batch yang sudah ter-commit pada run sebelumnya (tanpa memanggil API embedding)
+        nonlocal skipped
+        frames = iter_clean_frames(iter_csv_frames(CSV_PATH), preferred, cleaner)
+        records = iter_chunk_records(frames, preferred, delta=delta, store=store, lexical=lexical)
+        for batch in iter_batches(records, EMBED_BATCH_SIZE):
+            key = batch_key([rec[0] for rec in batch])
+            if manifest.is_done(key):
+                skipped += len(batch)
+                pbar.update(len(batch))
+                # Batch tetap diteruskan (tanpa embedding) agar centroid resume di dalamnya lengkap
+                if centroids is not None:
+                    yield key, batch, True
+                continue
+            yield key, batch, False
+
+    def embed_batch(item):
+        # Menghasilkan embedding untuk batch chunk teks (berjalan di thread pool embedding)
+        _, batch, done = item
+        return None if done else get_embeddings([rec[1] for rec in batch])
+
+    def upsert_points(points, name=COLLECTION_NAME):
+        # Upsert non-blocking: Qdrant mengembalikan ack setelah operasi tercatat di WAL
+        client.upsert(collection_name=name, points=points, wait=False)
+
+    def flush_centroids(final=False):
+        # Centroid resume yang sudah lengkap di-upsert lewat pool upsert yang sama
+        nonlocal last_centroids
+        finished = centroids.pop_finished(final=final)
+        for b in range(0, len(finished), UPSERT_BATCH_SIZE):
+            centroid_upserts.append(upsert_pool.submit(upsert_points, finished[b : b + UPSERT_BATCH_SIZE], CENTROID_COLLECTION))
+            if len(centroid_upserts) > UPSERT_CONCURRENCY:
+                centroid_upserts.popleft().result()
+        if finished:
+            last_centroids = finished[-UPSERT_BATCH_SIZE:]
+
+    def commit_oldest():
+        # Tunggu ack semua sub-batch dari batch tertua, lalu catat batch tersebut di checkpoint
+        nonlocal committed
+        key, n_points, futures = inflight_upserts.popleft()
+        for fut in futures:
+            fut.result()
+        manifest.mark_done(key, n_points)
+        committed += n_points
+        pbar.update(n_points) # Update Progress Bar
+
+    def drain_upserts():
+        # Tunggu semua upsert yang masih berjalan (chunk dan centroid)
+        while inflight_upserts:
+            commit_oldest()
+        while centroid_upserts:
+            centroid_upserts.popleft().result()
+
+    inflight_upserts = deque()
+    last_points = None
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as embed_pool, \
+         ThreadPoolExecutor(max_workers=UPSERT_CONCURRENCY) as upsert_pool:
+        for (key, batch, done), batch_embs in iter_bounded(embed_pool, embed_batch, pending_batches(), EMBED_CONCURRENCY):
+            if done:
+                # Batch yang sudah ter-commit: vektor dibaca dari collection. Semua upsert yang masih berjalan
+                # (chunk dan centroid) diselesaikan dulu (client lokal tidak boleh dipakai bersamaan dari dua thread).
+                drain_upserts()
+                centroids.add_batch(batch, fetch_vectors(client, COLLECTION_NAME, [rec[0] for rec in batch]))
+                flush_centroids()
+                continue
+
+            # Pertama kali dijalankan, tentukan dimensi embedding dan buat koleksi Qdrant
+            if not collection_ready:
+                emb_dim = len(batch_embs[0])
+                create_collection_if_missing(client, COLLECTION_NAME, emb_dim)
+                if centroids is not None:
+                    create_collection_if_missing(client, CENTROID_COLLECTION, emb_dim)
+                collection_ready = True
+
+            # Mengkonversi embedding dan payload menjadi Qdrant PointStructs
+            points = []
+            for (point_id, text, payload), emb in zip(batch, batch_embs):
+                # Teks chunk lengkap disimpan dalam payload untuk pengambilan
+                points.append(PointStruct(id=point_id, vector=emb, payload={"text": text, **payload}))
+
+            # Mengunggah poin ke Qdrant dalam sub-batch yang lebih kecil secara paralel
+            futures = [
+                upsert_pool.submit(upsert_points, points[b : b + UPSERT_BATCH_SIZE])
+                for b in range(0, len(points), UPSERT_BATCH_SIZE)
+            ]
+            inflight_upserts.append((key, len(points), futures))
+            last_points = points[-UPSERT_BATCH_SIZE:]
+            if len(inflight_upserts) > UPSERT_CONCURRENCY:
+                commit_oldest()
+
+            if centroids is not None:
+                centroids.add_batch(batch, {point_id: emb for (point_id, _, _), emb in zip(batch, batch_embs)})
+                flush_centroids()
+
+        if centroids is not None:
+            flush_centroids(final=True)
+        drain_upserts()
+
+    # Barrier konsistensi: satu upsert dengan wait=True baru selesai setelah semua operasi sebelumnya
+    # diterapkan. ID poin deterministik, sehingga mengirim ulang sub-batch terakhir tidak mengubah data.
+    if last_points:
+        client.upsert(collection_name=COLLECTION_NAME, points=last_points, wait=True)
+    if last_centroids:
+        client.upsert(collection_name=CENTROID_COLLECTION, points=last_centroids, wait=True)
+
+    # Hapus poin lama resume yang berubah (dan pada mode delta, poin resume yang hilang), setelah poin baru tersimpan
+    if delta is not None:
+        stale = delta.stale_point_ids()
+        for b in range(0, len(stale), DELETE_BATCH_SIZE):
+            client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=PointIdsList(points=stale[b : b + DELETE_BATCH_SIZE]),
+                wait=True,
+            )
+        removed = delta.removed_keys()
+        if centroids is not None and removed:
+            client.delete(
+                collection_name=CENTROID_COLLECTION,
+                points_selector=PointIdsList(points=[centroid_point_id(k) for k in removed]),
+                wait=True,
+            )
+        store.delete_many(removed)
+        for key in removed:
+            lexical.remove_resume(key)
+        print(f"{INGEST_MODE.capitalize()} summary: {delta.summary()}, deleted points: {len(stale)}")
 
     pbar.close()
-    print("Ingestion done. Total points:", len(all_ids))
+    if centroid_backfill:
+        create_collection_if_missing(client, CENTROID_COLLECTION, client.get_collection(COLLECTION_NAME).config.params.vectors.size)
+        print(f"Centroid collection {CENTROID_COLLECTION}: {backfill_centroids(client, COLLECTION_NAME, CENTROID_COLLECTION)} resumes (backfilled from existing points)")
+    # Simpan indeks leksikal setelah collection dan side store konsisten (dipadatkan jika banyak chunk mati)
+    lexical.compact()
+    lexical.save(LEXICAL_INDEX_PATH)
+    print(f"Lexical index: {len(lexical)} chunks, {len(lexical.postings)} terms -> {LEXICAL_INDEX_PATH}")
+    store.close()
+    cleaner.close()
+    cleaner.report()
+    if committed + skipped == 0:
+        print("No new text chunks to ingest. Exiting.")
+        client.close()
+        return
+    print(f"Ingestion done. Upserted points: {committed}, skipped (already committed): {skipped}")
+
+    # Perkiraan memori untuk jumlah poin saat ini di collection
+    info = client.get_collection(COLLECTION_NAME)
+    n_points = client.count(COLLECTION_NAME, exact=True).count
+    print("Memory estimate:", estimate_vector_memory(n_points, info.config.params.vectors.size))
 
     # 4. Tes Query
     # Melakukan tes pencarian sederhana untuk konfirmasi ingestinya berhasil.
     test_query = "senior backend developer with python experience"
     test_emb = get_embeddings([test_query])[0]
-    hits = client.search(collection_name=COLLECTION_NAME, query_vector=test_emb, limit=5)
+    hits = client.query_points(collection_name=COLLECTION_NAME, query=test_emb, limit=5, search_params=search_params()).points
     print("Top hits:")
     # Mencetak ID, skor kemiripan, dan potongan payload yang tersimpan untuk verifikasi
     for h in hits:
         print("id:", h.id, "score:", getattr(h, "score", None), "payload snippet:", str(h.payload)[:200])
+    client.close()
 
 
 if __name__ == "__main__":
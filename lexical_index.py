@@ -0,0 +1,230 @@
+# Indeks Leksikal (BM25) untuk Chunk Resume
+
+"""
+Inverted index BM25 lokal atas teks chunk yang sama dengan yang disimpan di Qdrant.
+- Diperbarui secara inkremental oleh script ingest per resume (hanya resume baru/berubah/dihapus),
+  lalu disimpan sebagai satu file pickle.
+- Dipakai aplikasi untuk query kata kunci (mis. "SAP FICO", "AutoCAD", "CPA") yang kurang
+  cocok dengan dense search, dan digabung dengan hasil dense lewat reciprocal rank fusion.
+- Teks chunk tidak disimpan di indeks; teks untuk snippet diambil dari Qdrant untuk hasil akhir saja.
+"""
+
+import os
+import re
+import math
+import pickle
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Lokasi file indeks (bisa diganti lewat env LEXICAL_INDEX_PATH).
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "lexical_index.pkl")
+# Parameter BM25 standar.
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Versi layout file indeks; file dengan versi lain diabaikan (ingest membangunnya ulang).
+LEXICAL_LAYOUT_VERSION = 2
+# Chunk yang dihapus/diganti hanya ditandai mati; indeks dipadatkan jika porsinya melebihi nilai ini.
+COMPACT_DEAD_RATIO = 0.25
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokenisasi sederhana (huruf kecil, karakter kata), sama untuk dokumen dan query."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class LexicalIndex:
+    """
+    Inverted index BM25 per chunk yang bisa diperbarui per resume. Setiap chunk menyimpan ID poin Qdrant,
+    kode ID resume, dan kode kategori (array numpy untuk filter); postings berupa array yang bisa ditambah.
+    Chunk resume yang berubah/dihapus ditandai mati (`alive`) dan dibuang saat `compact`.
+    """
+
+    def __init__(self):
+        self.layout = LEXICAL_LAYOUT_VERSION
+        self.point_ids: List[str] = []
+        self.resume_labels: List[str] = []                 # kode resume -> ID resume
+        self.resume_lookup: Dict[str, int] = {}            # ID resume -> kode resume
+        self.category_labels: List[Optional[str]] = []    # kode kategori -> label kategori
+        self.category_lookup: Dict[Optional[str], int] = {}
+        self.resume_codes = array("i")                     # per chunk
+        self.category_codes = array("i")                   # per chunk
+        self.doc_len = array("f")                          # per chunk (jumlah token)
+        self.alive = bytearray()                           # per chunk (1 = masih ada di collection)
+        self.resumes: Dict[str, Tuple[str, List[int]]] = {}  # ID resume -> (hash resume, index chunk)
+        self.postings: Dict[str, Tuple[array, array]] = {}   # token -> (index chunk, term frequency)
+        self.n_alive = 0
+        self.total_len = 0.0
+
+    @classmethod
+    def build(cls, chunks: Iterable[Tuple[str, str, Optional[str], str]]) -> "LexicalIndex":
+        """Membangun indeks dari (point_id, ID resume, Category, teks chunk), tanpa hash resume."""
+        index = cls()
+        for point_id, resume_id, category, text in chunks:
+            doc = index._add_chunk(point_id, str(resume_id), category, text)
+            index.resumes.setdefault(str(resume_id), ("", []))[1].append(doc)
+        return index
+
+    def __len__(self) -> int:
+        return self.n_alive
+
+    @property
+    def avg_len(self) -> float:
+        return self.total_len / self.n_alive if self.n_alive else 0.0
+
+    def _code(self, labels: list, lookup: dict, value) -> int:
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(labels)
+            labels.append(value)
+        return code
+
+    def _add_chunk(self, point_id: str, resume_id: str, category: Optional[str], text: str) -> int:
+        doc = len(self.point_ids)
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        self.point_ids.append(point_id)
+        self.resume_codes.append(self._code(self.resume_labels, self.resume_lookup, resume_id))
+        self.category_codes.append(self._code(self.category_labels, self.category_lookup, category))
+        self.doc_len.append(length)
+        self.alive.append(1)
+        self.n_alive += 1
+        self.total_len += length
+        for token, tf in counts.items():
+            docs, tfs = self.postings.get(token) or self.postings.setdefault(token, (array("i"), array("f")))
+            docs.append(doc)
+            tfs.append(tf)
+        return doc
+
+    def resume_hash(self, resume_id: str) -> Optional[str]:
+        """Hash resume yang terakhir diindeks (None jika resume belum ada di indeks)."""
+        entry = self.resumes.get(resume_id)
+        return entry[0] if entry is not None else None
+
+    def put_resume(self, resume_id: str, r_hash: str, category: Optional[str], chunks: Iterable[Tuple[str, str]]):
+        """Menambahkan atau mengganti semua chunk satu resume: `chunks` berisi (point_id, teks chunk)."""
+        self.remove_resume(resume_id)
+        self.resumes[resume_id] = (r_hash, [self._add_chunk(pid, resume_id, category, text) for pid, text in chunks])
+
+    def remove_resume(self, resume_id: str):
+        """Menandai semua chunk satu resume sebagai mati (postings dibersihkan saat `compact`)."""
+        entry = self.resumes.pop(resume_id, None)
+        if entry is None:
+            return
+        for doc in entry[1]:
+            if self.alive[doc]:
+                self.alive[doc] = 0
+                self.n_alive -= 1
+                self.total_len -= self.doc_len[doc]
+
+    def compact(self, min_dead_ratio: float = COMPACT_DEAD_RATIO) -> bool:
+        """
+        Membuang chunk mati dari semua array dan postings jika porsinya melebihi `min_dead_ratio`.
+        Hasilnya: True jika indeks dipadatkan.
+        """
+        total = len(self.point_ids)
+        if total == 0 or (total - self.n_alive) / total <= min_dead_ratio:
+            return False
+        alive = np.frombuffer(self.alive, dtype=np.bool_)
+        keep = np.flatnonzero(alive)
+        remap = np.full(total, -1, dtype=np.int32)
+        remap[keep] = np.arange(len(keep), dtype=np.int32)
+        self.point_ids = [self.point_ids[d] for d in keep.tolist()]
+        for name in ("resume_codes", "category_codes", "doc_len"):
+            old = getattr(self, name)
+            setattr(self, name, array(old.typecode, np.frombuffer(old, dtype=old.typecode)[keep].tobytes()))
+        self.alive = bytearray(b"\x01" * len(keep))
+        self.resumes = {rid: (h, remap[docs].tolist()) for rid, (h, docs) in self.resumes.items()}
+        postings = {}
+        for token, (docs, tfs) in self.postings.items():
+            docs_np = np.frombuffer(docs, dtype=np.int32)
+            live = alive[docs_np]
+            if live.any():
+                postings[token] = (array("i", remap[docs_np[live]].tobytes()), array("f", np.frombuffer(tfs, dtype=np.float32)[live].tobytes()))
+        self.postings = postings
+        return True
+
+    def has_tokens(self, tokens: Iterable[str]) -> bool:
+        """True jika semua token muncul minimal sekali di chunk yang masih ada."""
+        alive = np.frombuffer(self.alive, dtype=np.bool_)
+        return all(t in self.postings and alive[np.frombuffer(self.postings[t][0], dtype=np.int32)].any() for t in tokens)
+
+    def score(self, query: str) -> np.ndarray:
+        """Skor BM25 untuk setiap chunk (0 untuk chunk mati atau tanpa token query)."""
+        scores = np.zeros(len(self.point_ids), dtype=np.float32)
+        if not self.n_alive:
+            return scores
+        alive = np.frombuffer(self.alive, dtype=np.bool_)
+        doc_len = np.frombuffer(self.doc_len, dtype=np.float32)
+        for token in set(tokenize(query)):
+            if token not in self.postings:
+                continue
+            docs, tfs = (np.frombuffer(a, dtype=a.typecode) for a in self.postings[token])
+            live = alive[docs]
+            docs, tfs = docs[live], tfs[live]
+            if len(docs) == 0:
+                continue
+            idf = math.log(1 + (self.n_alive - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[docs] / self.avg_len)
+            scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+        return scores
+
+    def filter_mask(self, category: Optional[str] = None, resume_ids: Optional[Iterable[str]] = None) -> Optional[np.ndarray]:
+        """Mask boolean chunk yang lolos filter kategori dan/atau ID resume (None jika tanpa filter)."""
+        if category is None and resume_ids is None:
+            return None
+        mask = np.ones(len(self.point_ids), dtype=bool)
+        if category is not None:
+            mask &= np.frombuffer(self.category_codes, dtype=np.int32) == self.category_lookup.get(category, -1)
+        if resume_ids is not None:
+            codes = [self.resume_lookup[str(r)] for r in resume_ids if str(r) in self.resume_lookup]
+            mask &= np.isin(np.frombuffer(self.resume_codes, dtype=np.int32), codes)
+        return mask
+
+    def resume_of(self, doc: int) -> str:
+        return self.resume_labels[self.resume_codes[doc]]
+
+    def category_of(self, doc: int) -> Optional[str]:
+        return self.category_labels[self.category_codes[doc]]
+
+    def search_groups(self, query: str, k: int = 5, group_size: int = 2, mask: Optional[np.ndarray] = None) -> List[Tuple[str, List[Tuple[int, float]]]]:
+        """
+        Mencari k resume berbeda dengan skor BM25 tertinggi (hanya chunk dengan `mask` True, jika diberikan).
+        Hasilnya: daftar (ID resume, [(index chunk, skor), ...]) dengan maksimal `group_size` chunk per resume,
+        diurutkan dari skor chunk terbaik.
+        """
+        scores = self.score(query)
+        if mask is not None:
+            scores[~mask] = 0
+        hits = np.flatnonzero(scores > 0)
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        groups: Dict[str, List[Tuple[int, float]]] = {}
+        for doc in hits.tolist():
+            rid = self.resume_of(doc)
+            if rid not in groups:
+                if len(groups) >= k:
+                    continue
+                groups[rid] = []
+            if len(groups[rid]) < group_size:
+                groups[rid].append((doc, float(scores[doc])))
+        return list(groups.items())
+
+    def save(self, path: str = LEXICAL_INDEX_PATH):
+        """Menyimpan indeks ke file (ditulis ke file sementara lalu di-rename, agar pembaca tidak melihat file setengah jadi)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path: str = LEXICAL_INDEX_PATH) -> Optional["LexicalIndex"]:
+        """Memuat indeks dari file, atau None jika file belum dibuat oleh ingest atau layout-nya sudah lama."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        return index if getattr(index, "layout", None) == LEXICAL_LAYOUT_VERSION else None
@@ -0,0 +1,197 @@
+# Pencocokan Massal Job Description ke Kandidat (tanpa LLM)
+
+"""
+Mencocokkan banyak job description (CSV) dengan resume di vector database sekaligus:
+- Job description di-embed per batch (MATCH_BATCH_SIZE per request, dengan cache embedding).
+- Setiap batch dicari dengan rencana dense yang sama seperti chatbot, dalam satu `query_batch_points` untuk semua
+  role di batch: atas satu vektor per resume jika collection centroid ada, atau atas chunk yang dikelompokkan per
+  ID resume di sisi client. Top-k selalu berisi k resume berbeda.
+- Hasilnya matriks skor role x kandidat (kandidat di luar top-k bernilai kosong), ditulis ke CSV atau Parquet.
+Tidak ada panggilan LLM, sehingga puluhan role selesai dalam hitungan detik.
+
+Pemakaian:
+    python match_jobs_csv.py jobs.csv [output.csv|output.parquet]
+Fungsi `match_jobs` juga dipakai halaman Bulk Matching di aplikasi.
+"""
+
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from openai import OpenAI
+
+from retrieval import batch_search_candidates, candidate_filter, collection_search_settings, centroid_collection_name
+from embedding_cache import EmbeddingCache, embed_with_cache
+from backends import make_qdrant_client, required_settings, HashingEmbedder, LOCAL_EMBEDDING_MODEL, LOCAL_EMBED_DIM
+
+# ----------------------------------------------------------------------
+# Config
+# ----------------------------------------------------------------------
+COLLECTION_NAME = os.getenv("QDRANT_COLLECTION", "resumes_v1")
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+QDRANT_PATH = os.getenv("QDRANT_PATH")
+NUMPY_STORE_PATH = os.getenv("NUMPY_STORE_PATH")
+EMBEDDING_MODEL = LOCAL_EMBEDDING_MODEL if EMBEDDING_BACKEND == "local" else "text-embedding-3-small"
+EMBEDDING_MODEL_DIM = LOCAL_EMBED_DIM if EMBEDDING_BACKEND == "local" else 1536
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "20"))            # Jumlah kandidat per role
+MATCH_BATCH_SIZE = int(os.getenv("MATCH_BATCH_SIZE", "32"))  # Jumlah role per request embedding + batch query
+MATCH_GROUP_SIZE = 1          # Tanpa centroid, skor kandidat = skor chunk terbaik, cukup satu chunk per resume
+TWO_STAGE_RETRIEVAL = os.getenv("TWO_STAGE_RETRIEVAL", "1").lower() in ("1", "true")  # Pakai collection centroid jika ada
+MAX_JOB_CHARS = 8000          # Job description dipotong agar tetap di bawah batas token model embedding
+# Nama kolom yang dicari (tidak peka huruf besar/kecil) untuk judul role dan isi job description.
+TITLE_COLUMNS = ["title", "role", "job_title", "position"]
+TEXT_COLUMNS = ["description", "job_description", "jd", "text"]
+# ----------------------------------------------------------------------
+
+
+def _find_column(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+    lowered = {c.lower(): c for c in df.columns}
+    return next((lowered[c] for c in candidates if c in lowered), None)
+
+
+def prepare_jobs(df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    """
+    Menyiapkan (nama role, teks query) dari DataFrame job description.
+    Teks query = judul + deskripsi; tanpa kolom judul, nama role diambil dari nomor baris.
+    """
+    title_col = _find_column(df, TITLE_COLUMNS)
+    text_col = _find_column(df, TEXT_COLUMNS)
+    if title_col is None and text_col is None:
+        raise ValueError(f"Job CSV needs a title column ({', '.join(TITLE_COLUMNS)}) and/or a description column ({', '.join(TEXT_COLUMNS)}). Columns: {list(df.columns)}")
+    titles = df[title_col].fillna("").astype(str).str.strip() if title_col else pd.Series([""] * len(df), index=df.index)
+    texts = df[text_col].fillna("").astype(str).str.strip() if text_col else pd.Series([""] * len(df), index=df.index)
+    roles, seen = [], {}
+    for i, t in enumerate(titles):
+        role = t or f"role_{i + 1}"
+        # Judul yang sama dibedakan dengan nomor urut, agar setiap role tetap satu baris di matriks.
+        seen[role] = seen.get(role, 0) + 1
+        roles.append(role if seen[role] == 1 else f"{role} ({seen[role]})")
+    queries = [("\n".join(p for p in (t, d) if p))[:MAX_JOB_CHARS] for t, d in zip(titles, texts)]
+    return roles, queries
+
+
+def match_jobs(
+    roles: List[str],
+    queries: List[str],
+    client,
+    collection: str,
+    embed_texts: Callable[[List[str]], List[List[float]]],
+    k: int = MATCH_TOP_K,
+    batch_size: int = MATCH_BATCH_SIZE,
+    search_params=None,
+    category: Optional[str] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    centroid_collection: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Mencari top-k kandidat berbeda untuk setiap role: satu request embedding per `batch_size` role, lalu
+    pencarian dense seperti chatbot dengan satu batch query per batch role (bukan satu query per role). Dengan
+    `centroid_collection`, query atas centroid resume (skor = kemiripan dengan centroid resume); tanpa itu,
+    query atas chunk (skor = chunk terbaik per resume).
+    Hasilnya: (DataFrame panjang [role, rank, ID, Category, score], statistik waktu dan throughput).
+    """
+    rows = []
+    embed_seconds = search_seconds = 0.0
+    start = time.perf_counter()
+    query_filter = candidate_filter(category, None)
+    for b in range(0, len(queries), batch_size):
+        batch_roles, batch_queries = roles[b : b + batch_size], queries[b : b + batch_size]
+        t0 = time.perf_counter()
+        vectors = embed_texts(batch_queries)
+        t1 = time.perf_counter()
+        results = batch_search_candidates(
+            client, collection, vectors, batch_queries, k=k, group_size=MATCH_GROUP_SIZE,
+            search_params=search_params, query_filter=query_filter, snippets=False, centroid_collection=centroid_collection,
+        )
+        t2 = time.perf_counter()
+        embed_seconds += t1 - t0
+        search_seconds += t2 - t1
+        for role, candidates in zip(batch_roles, results):
+            for rank, c in enumerate(candidates, start=1):
+                rows.append({"role": role, "rank": rank, "ID": str(c["ID"]), "Category": c["Category"], "score": c["score"]})
+        if on_progress:
+            on_progress(min(b + batch_size, len(queries)), len(queries))
+    elapsed = time.perf_counter() - start
+    stats = {
+        "roles": len(queries), "matches": len(rows), "seconds": elapsed,
+        "embed_seconds": embed_seconds, "search_seconds": search_seconds,
+        "roles_per_second": len(queries) / elapsed if elapsed > 0 else float("inf"),
+    }
+    return pd.DataFrame(rows, columns=["role", "rank", "ID", "Category", "score"]), stats
+
+
+def score_matrix(matches: pd.DataFrame, roles: Optional[List[str]] = None) -> pd.DataFrame:
+    """Matriks skor role x ID kandidat (kosong jika kandidat tidak masuk top-k role tersebut)."""
+    matrix = matches.pivot_table(index="role", columns="ID", values="score", aggfunc="max", sort=False)
+    if roles is not None:
+        matrix = matrix.reindex(list(dict.fromkeys(roles)))
+    matrix.columns.name = None
+    return matrix
+
+
+def write_matrix(matrix: pd.DataFrame, path: str):
+    """Menulis matriks ke Parquet (ekstensi .parquet, via pyarrow yang ikut terpasang bersama Streamlit) atau CSV."""
+    if path.lower().endswith(".parquet"):
+        matrix.to_parquet(path)
+    else:
+        matrix.to_csv(path)
+
+
+def detect_centroid_collection(client, collection: str) -> Optional[str]:
+    """Nama collection centroid jika ada (ditulis oleh ingest) dan TWO_STAGE_RETRIEVAL aktif, selain itu None."""
+    name = centroid_collection_name(collection)
+    return name if TWO_STAGE_RETRIEVAL and client.collection_exists(name) else None
+
+
+def main():
+    if len(sys.argv) < 2:
+        raise SystemExit("usage: python match_jobs_csv.py jobs.csv [output.csv|output.parquet]")
+    jobs_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else "job_matches.csv"
+
+    missing = [name for name in required_settings(VECTOR_BACKEND, EMBEDDING_BACKEND) if not os.getenv(name)]
+    if missing:
+        raise SystemExit(f"set {', '.join(missing)} env vars before running (VECTOR_BACKEND={VECTOR_BACKEND}, EMBEDDING_BACKEND={EMBEDDING_BACKEND}).")
+
+    roles, queries = prepare_jobs(pd.read_csv(jobs_path))
+    client = make_qdrant_client(
+        VECTOR_BACKEND, url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_API_KEY"),
+        path=QDRANT_PATH or NUMPY_STORE_PATH, timeout=60,
+    )
+    # Query harus di-embed dengan dimensi yang sama seperti saat ingest (dibaca dari collection).
+    query_dims, search_params = collection_search_settings(client, COLLECTION_NAME, EMBEDDING_MODEL_DIM)
+    if EMBEDDING_BACKEND == "local":
+        embed_api = HashingEmbedder(dim=LOCAL_EMBED_DIM).embed_documents
+    else:
+        openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        kwargs = {"dimensions": query_dims} if query_dims else {}
+
+        def embed_api(texts: List[str]) -> List[List[float]]:
+            resp = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=texts, **kwargs)
+            return [item.embedding for item in resp.data]
+
+    cache = EmbeddingCache()
+
+    def embed_texts(texts: List[str]) -> List[List[float]]:
+        return embed_with_cache(texts, embed_api, model=EMBEDDING_MODEL, dimensions=query_dims, cache=cache)
+
+    matches, stats = match_jobs(
+        roles, queries, client, COLLECTION_NAME, embed_texts, k=MATCH_TOP_K, batch_size=MATCH_BATCH_SIZE,
+        search_params=search_params, on_progress=lambda done, total: print(f"  {done}/{total} roles"),
+        centroid_collection=detect_centroid_collection(client, COLLECTION_NAME),
+    )
+    client.close()
+    cache.close()
+    write_matrix(score_matrix(matches, roles), output_path)
+    print(f"Matched {stats['roles']} roles x top-{MATCH_TOP_K} candidates -> {output_path}")
+    print(
+        f"Time: {stats['seconds']:.2f}s (embedding {stats['embed_seconds']:.2f}s, search {stats['search_seconds']:.2f}s), "
+        f"throughput: {stats['roles_per_second']:.1f} roles/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
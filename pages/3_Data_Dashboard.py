@@ -9,6 +9,8 @@ import numpy as np
 import plotly.express as px # Plotly untuk visualisasi interaktif (bar chart, histogram).
 import altair as alt    # Altair untuk visualisasi boxplot.
 
+from dashboard_data import load_resume_data
+
 # ---------- Page config ----------
 st.set_page_config(page_title="SmartHire | Resume Dashboard", page_icon="📊", layout="wide", initial_sidebar_state="collapsed")
 
@@ -29,21 +31,8 @@ st.markdown("---") # Menambahkan pemisah horizontal
 DATA_PATH = "Resume.csv"
 @st.cache_data
 def load_data(path):
-    # Membaca data dari file CSV yang ditentukan ke dalam Pandas DataFrame.
-    df = pd.read_csv(path)
-    # Memastikan kolom ada
-    expected = {"ID", "Resume_str", "Resume_html", "Category"}
-    missing = expected - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing columns in CSV: {missing}")
-
-    # Membersihkan kolom 'Category' dengan memastikan string dan menghapus spasi.
-    df["Category"] = df["Category"].astype(str).str.strip()
-    # Menghitung dua fitur baru: 'word_count' (jumlah kata) dan 'char_count' (jumlah karakter) dari teks resume ('Resume_str').
-    df["resume_text"] = df["Resume_str"].fillna("").astype(str)
-    df["word_count"] = df["resume_text"].str.split().apply(len)
-    df["char_count"] = df["resume_text"].str.len()
-    return df
+    # Membaca CSV dan menghitung fitur dashboard (lihat dashboard_data.py).
+    return load_resume_data(path)
 
 try:
     # Load data.
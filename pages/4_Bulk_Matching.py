@@ -0,0 +1,106 @@
+# pages/4_Bulk_Matching.py
+
+# Import Library yang diperlukan
+import os
+import io
+import streamlit as st
+import pandas as pd
+
+from langchain_openai import OpenAIEmbeddings
+
+from backends import shared_qdrant_client, required_settings, HashingEmbedder, LOCAL_EMBEDDING_MODEL, LOCAL_EMBED_DIM
+from retrieval import collection_search_settings
+from embedding_cache import EmbeddingCache, embed_with_cache
+from match_jobs_csv import prepare_jobs, match_jobs, score_matrix, detect_centroid_collection, MATCH_BATCH_SIZE, TITLE_COLUMNS, TEXT_COLUMNS
+
+st.set_page_config(page_title="SmartHire | Bulk Matching", page_icon="📋", layout="wide")
+
+# --- Konfigurasi (sama seperti halaman utama) ---
+QDRANT_URL = st.secrets.get("QDRANT_URL")
+QDRANT_API_KEY = st.secrets.get("QDRANT_API_KEY")
+OPENAI_API_KEY = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
+COLLECTION_NAME = st.secrets.get("QDRANT_COLLECTION", "resumes_v1")
+VECTOR_BACKEND = st.secrets.get("VECTOR_BACKEND") or os.getenv("VECTOR_BACKEND", "qdrant")
+EMBEDDING_BACKEND = st.secrets.get("EMBEDDING_BACKEND") or os.getenv("EMBEDDING_BACKEND", "openai")
+LOCAL_STORE_PATH = st.secrets.get("QDRANT_PATH") or st.secrets.get("NUMPY_STORE_PATH") or os.getenv("QDRANT_PATH") or os.getenv("NUMPY_STORE_PATH")
+EMBEDDING_MODEL = LOCAL_EMBEDDING_MODEL if EMBEDDING_BACKEND == "local" else "text-embedding-3-small"
+EMBEDDING_MODEL_DIM = LOCAL_EMBED_DIM if EMBEDDING_BACKEND == "local" else 1536
+
+st.title("📋 Bulk Job Matching")
+st.caption(
+    "Upload a CSV of job descriptions to get the top candidates for every role at once. "
+    "Roles are embedded in batches and searched with batched vector queries — no LLM calls."
+)
+
+secrets = {"QDRANT_URL": QDRANT_URL, "QDRANT_API_KEY": QDRANT_API_KEY, "OPENAI_API_KEY": OPENAI_API_KEY}
+if missing := [name for name in required_settings(VECTOR_BACKEND, EMBEDDING_BACKEND) if not secrets[name]]:
+    st.error(f"Missing required secrets. Set {', '.join(missing)} in Streamlit secrets (VECTOR_BACKEND={VECTOR_BACKEND}).")
+    st.stop()
+
+
+# Embedding role: cache SQLite yang sama dengan aplikasi, hanya role baru yang dikirim ke API.
+@st.cache_resource
+def get_role_embedder():
+    client = shared_qdrant_client(VECTOR_BACKEND, url=QDRANT_URL, api_key=QDRANT_API_KEY, path=LOCAL_STORE_PATH, timeout=30)
+    query_dims, search_params = collection_search_settings(client, COLLECTION_NAME, EMBEDDING_MODEL_DIM)
+    if EMBEDDING_BACKEND == "local":
+        embeddings = HashingEmbedder(dim=EMBEDDING_MODEL_DIM)
+    else:
+        embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY, dimensions=query_dims)
+    cache = EmbeddingCache()
+
+    def embed_texts(texts):
+        return embed_with_cache(texts, embeddings.embed_documents, model=EMBEDDING_MODEL, dimensions=query_dims, cache=cache)
+
+    return client, embed_texts, search_params, detect_centroid_collection(client, COLLECTION_NAME)
+
+
+uploaded = st.file_uploader(
+    f"Job descriptions CSV (columns: one of {', '.join(TITLE_COLUMNS)} and/or one of {', '.join(TEXT_COLUMNS)})",
+    type=["csv"],
+)
+col_k, col_batch = st.columns(2)
+with col_k:
+    top_k = st.number_input("Candidates per role (top-k)", min_value=1, max_value=100, value=20)
+with col_batch:
+    batch_size = st.number_input("Roles per batch", min_value=1, max_value=256, value=MATCH_BATCH_SIZE)
+
+if uploaded is not None and st.button("Run matching", type="primary"):
+    try:
+        roles, queries = prepare_jobs(pd.read_csv(uploaded))
+    except Exception as e:
+        st.error(f"Could not read job CSV: {e}")
+        st.stop()
+    client, embed_texts, search_params, centroid_collection = get_role_embedder()
+    progress = st.progress(0.0, text="Matching roles...")
+    try:
+        matches, stats = match_jobs(
+            roles, queries, client, COLLECTION_NAME, embed_texts, k=int(top_k), batch_size=int(batch_size),
+            search_params=search_params, centroid_collection=centroid_collection,
+            on_progress=lambda done, total: progress.progress(done / total, text=f"{done}/{total} roles"),
+        )
+    except Exception as e:
+        st.error(f"Matching failed: {e}")
+        st.stop()
+    st.session_state["bulk_matches"] = (matches, roles, stats)
+
+if "bulk_matches" in st.session_state:
+    matches, roles, stats = st.session_state["bulk_matches"]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Roles", stats["roles"])
+    c2.metric("Time", f"{stats['seconds']:.2f}s")
+    c3.metric("Throughput", f"{stats['roles_per_second']:.1f} roles/s")
+
+    # Tampilan per role: daftar kandidat teratas.
+    role = st.selectbox("Role", list(dict.fromkeys(roles)))
+    st.dataframe(matches[matches["role"] == role].drop(columns="role"), hide_index=True, use_container_width=True)
+
+    # Unduh matriks skor role x kandidat (CSV atau Parquet).
+    matrix = score_matrix(matches, roles)
+    d1, d2 = st.columns(2)
+    with d1:
+        st.download_button("Download score matrix (.csv)", data=matrix.to_csv().encode("utf-8"), file_name="job_matches.csv", mime="text/csv")
+    with d2:
+        buffer = io.BytesIO()
+        matrix.to_parquet(buffer)
+        st.download_button("Download score matrix (.parquet)", data=buffer.getvalue(), file_name="job_matches.parquet")
@@ -0,0 +1,118 @@
+# Side Store Metadata Resume
+
+"""
+Penyimpanan lokal (SQLite) untuk metadata lengkap per resume, dengan key ID resume.
+Poin di Qdrant hanya membawa field ringkas (text, ID, Category, chunk_index, hash);
+metadata lain disimpan sekali di sini dan dibaca saat UI membutuhkannya.
+Tabel `chunk_sentences` menyimpan indeks kalimat per chunk (lihat `sentence_index`) dengan key ID poin,
+dipakai untuk menghitung snippet tanpa memecah dan men-tokenize ulang teks chunk saat query.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Lokasi file side store (bisa diganti lewat env RESUME_STORE_PATH).
+RESUME_STORE_PATH = os.getenv("RESUME_STORE_PATH", "resume_store.sqlite")
+_SQL_CHUNK = 500
+
+
+class ResumeStore:
+    """
+    Tabel `resumes` dengan kolom: ID (primary key), Category, resume_text (teks yang di-embed),
+    dan meta (JSON berisi kolom CSV lainnya).
+    """
+
+    def __init__(self, path: str = RESUME_STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " ID TEXT PRIMARY KEY, Category TEXT, resume_text TEXT NOT NULL, meta TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_resumes_category ON resumes (Category)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_sentences (point_id TEXT PRIMARY KEY, ID TEXT NOT NULL, data BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_sentences_id ON chunk_sentences (ID)")
+        self._conn.commit()
+
+    def put_many(self, rows: Iterable[Tuple[str, Optional[str], str, Dict[str, Any]]]):
+        """Menyimpan (ID, Category, resume_text, meta) — baris dengan ID yang sama ditimpa."""
+        data = [(rid, cat, text, json.dumps(meta, ensure_ascii=False, default=str)) for rid, cat, text, meta in rows]
+        if not data:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO resumes VALUES (?, ?, ?, ?)", data)
+            self._conn.commit()
+
+    def delete_many(self, ids: Sequence[str]):
+        """Menghapus resume (beserta indeks kalimat chunk-nya) berdasarkan ID."""
+        with self._lock:
+            for i in range(0, len(ids), _SQL_CHUNK):
+                part = list(ids[i : i + _SQL_CHUNK])
+                marks = ",".join("?" * len(part))
+                self._conn.execute(f"DELETE FROM resumes WHERE ID IN ({marks})", part)
+                self._conn.execute(f"DELETE FROM chunk_sentences WHERE ID IN ({marks})", part)
+            self._conn.commit()
+
+    def put_sentences(self, ids: Sequence[str], rows: Iterable[Tuple[str, str, bytes]]):
+        """
+        Mengganti indeks kalimat chunk untuk resume `ids` dengan baris (point_id, ID, data);
+        entri chunk lama resume tersebut (versi teks sebelumnya) dihapus lebih dulu.
+        """
+        data = [(str(pid), str(rid), sqlite3.Binary(blob)) for pid, rid, blob in rows]
+        ids = [str(i) for i in ids]
+        with self._lock:
+            for i in range(0, len(ids), _SQL_CHUNK):
+                part = ids[i : i + _SQL_CHUNK]
+                self._conn.execute(f"DELETE FROM chunk_sentences WHERE ID IN ({','.join('?' * len(part))})", part)
+            self._conn.executemany("INSERT OR REPLACE INTO chunk_sentences VALUES (?, ?, ?)", data)
+            self._conn.commit()
+
+    def get_sentences(self, point_ids: Sequence[str]) -> Dict[str, bytes]:
+        """Membaca indeks kalimat untuk beberapa ID poin. Hasilnya: {point_id: data}; ID tanpa entri dilewati."""
+        point_ids = list(dict.fromkeys(str(p) for p in point_ids))
+        out: Dict[str, bytes] = {}
+        with self._lock:
+            for i in range(0, len(point_ids), _SQL_CHUNK):
+                part = point_ids[i : i + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT point_id, data FROM chunk_sentences WHERE point_id IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                out.update((pid, bytes(data)) for pid, data in rows)
+        return out
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Membaca metadata lengkap untuk beberapa ID. Hasilnya: {ID: {ID, Category, resume_text, ...meta}}"""
+        ids = [str(i) for i in ids]
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for i in range(0, len(ids), _SQL_CHUNK):
+                part = ids[i : i + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT ID, Category, resume_text, meta FROM resumes WHERE ID IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for rid, cat, text, meta in rows:
+                    out[rid] = {**json.loads(meta), "ID": rid, "Category": cat, "resume_text": text}
+        return out
+
+    def get(self, resume_id: str) -> Optional[Dict[str, Any]]:
+        """Membaca metadata lengkap satu resume, atau None jika tidak ada."""
+        return self.get_many([resume_id]).get(str(resume_id))
+
+    def categories(self) -> List[str]:
+        """Daftar kategori unik (terurut) yang ada di store."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT Category FROM resumes WHERE Category IS NOT NULL ORDER BY Category").fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
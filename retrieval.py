@@ -0,0 +1,554 @@
+# Retrieval Layer SmartHire
+
+"""
+Lapisan retrieval yang dipakai aplikasi SmartHire:
+- Satu `query_batch_points` untuk semua query (chunk dikelompokkan per ID resume di sisi client) mengembalikan
+  skor dan field payload yang dibutuhkan sekaligus. Setiap pencarian ditulis sekali sebagai rencana langkah query, lalu dijalankan dengan client sinkron
+  (QdrantClient) atau async (AsyncQdrantClient) dengan hasil yang sama.
+- Hybrid retrieval: hasil dense dan BM25 (indeks leksikal lokal) digabung dengan reciprocal rank fusion;
+  query kata kunci persis dijawab dari indeks leksikal saja, tanpa panggilan embedding.
+- Two-stage retrieval: pencarian kasar atas satu vektor centroid per resume (collection `<nama>_centroids`),
+  lalu pencarian chunk hanya di dalam resume terpilih untuk bukti snippet.
+- Batch retrieval: banyak query di-embed dalam satu request dan dicari dengan rencana yang sama seperti
+  satu query (jumlah round trip Qdrant tidak bertambah dengan jumlah query), untuk pencocokan massal.
+- Ekstraksi snippet (kalimat paling relevan) dari chunk yang ditemukan.
+"""
+
+import re
+import json
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional, Sequence, Tuple
+
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import SearchParams, QuantizationSearchParams, Filter, FieldCondition, MatchValue, MatchAny, QueryRequest
+
+from lexical_index import LexicalIndex, tokenize
+from sentence_index import SENTENCE_END_RE, index_snippets
+
+# Field payload yang dibutuhkan hasil pencarian; field lain tidak ikut dikirim lewat jaringan.
+RESULT_PAYLOAD_FIELDS = ["text", "ID", "Category"]
+# Field payload untuk hasil tanpa snippet (mis. pencocokan massal yang hanya butuh skor).
+SCORE_PAYLOAD_FIELDS = ["ID", "Category"]
+# Jumlah chunk terbaik per kandidat yang dipakai sebagai bukti (snippets).
+DEFAULT_GROUP_SIZE = 2
+# Oversampling kandidat sebelum rescoring pada collection yang memakai quantization.
+QUANTIZATION_OVERSAMPLING = 2.0
+# Konstanta reciprocal rank fusion: skor = sum(1 / (RRF_K + rank)).
+RRF_K = 60
+# Jumlah kandidat yang diambil dari setiap daftar (dense dan leksikal) sebelum fusi = k * faktor ini.
+HYBRID_FETCH_FACTOR = 2
+# Query batch tidak mendukung group_by: setiap query mengambil k * group_size * faktor ini chunk, lalu
+# dikelompokkan per ID resume di sisi client. Query yang belum mendapat k resume diulang dengan limit
+# BATCH_REFILL_FACTOR kali lebih besar (tetap dalam satu batch untuk semua query yang kurang).
+BATCH_OVERFETCH = 4
+BATCH_REFILL_FACTOR = 4
+# Akhiran nama collection centroid (satu vektor rata-rata chunk per resume), ditulis oleh ingest.
+CENTROID_SUFFIX = "_centroids"
+
+
+# Fungsi pembantu untuk membagi blok teks menjadi kalimat individual.
+def _split_sentences(text: str) -> List[str]:
+    # Memisahkan teks berdasarkan tanda baca akhir kalimat.
+    sentences = SENTENCE_END_RE.split(text.replace("\r", " ").strip())
+    return [s.strip() for s in sentences if s.strip()] or [text.strip()]
+
+
+# Fungsi untuk mengekstrak kalimat (snippet) yang paling relevan dari dokumen berdasarkan query.
+def extract_snippets(text: str, query: str, n: int = 3) -> List[str]:
+    # Tokenisasi query untuk mengidentifikasi kata kunci penting.
+    query_tokens = set(re.findall(r'\w+', query.lower()))
+    sentences = _split_sentences(text)
+    # Beri skor setiap kalimat berdasarkan jumlah kata kunci query yang ada.
+    scored = [(len(set(re.findall(r'\w+', s.lower())) & query_tokens), len(s), s) for s in sentences]
+    # Urutkan berdasarkan skor relevansi (menurun) dan kemudian panjang (menurun untuk tie-breaking).
+    scored.sort(key=lambda x: (x[0], -x[1]), reverse=True)
+    # Kembalikan N kalimat teratas yang mengandung setidaknya satu kata kunci query.
+    top = [s for score, ln, s in scored if score > 0][:n]
+    return top or sentences[:n]
+
+
+# Mengurai konten JSON dari ToolMessage (hasil tool retrieval), dan handling error.
+def parse_tool_message_json(tm: str) -> Optional[List[Dict[str, Any]]]:
+    try:
+        # Muat string JSON ke dalam objek Python.
+        parsed = json.loads(tm)
+        # Normalisasi output agar selalu berupa list.
+        return [parsed] if isinstance(parsed, dict) else parsed if isinstance(parsed, list) else None
+    except Exception:
+        return None
+
+
+def collection_search_settings(client: QdrantClient, collection: str, model_dim: int) -> Tuple[Optional[int], Optional[SearchParams]]:
+    """
+    Membaca layout vektor collection.
+    Hasilnya: (dimensi query untuk API embedding, atau None jika sama dengan default model;
+    search params dengan rescoring jika collection memakai quantization)
+    """
+    config = client.get_collection(collection).config
+    dims = config.params.vectors.size
+    search_params = None
+    if config.quantization_config is not None:
+        search_params = SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=QUANTIZATION_OVERSAMPLING))
+    return (None if dims == model_dim else dims), search_params
+
+
+def normalize_category(value: str) -> str:
+    """Bentuk kanonik nama kategori untuk perbandingan ("information technology" == "INFORMATION-TECHNOLOGY")."""
+    return re.sub(r"[\s_\-]+", "-", value.strip()).upper()
+
+
+def resolve_category(value: Optional[str], known: List[str]) -> Optional[str]:
+    """
+    Mencocokkan nama kategori dari user/LLM dengan label kategori di dataset.
+    Hasilnya: label persis seperti di payload, atau None jika tidak dikenali. Tanpa daftar `known`,
+    bentuk kanoniknya dipakai langsung (label dataset berupa huruf kapital dengan tanda hubung).
+    """
+    if not value:
+        return None
+    wanted = normalize_category(value)
+    if not known:
+        return wanted
+    for label in known:
+        if normalize_category(label) == wanted:
+            return label
+    return None
+
+
+def candidate_filter(category: Optional[str] = None, candidate_ids: Optional[List[str]] = None) -> Optional[Filter]:
+    """Filter Qdrant untuk kategori dan/atau daftar ID resume (memakai index keyword payload dari ingest)."""
+    conditions = []
+    if category:
+        conditions.append(FieldCondition(key="Category", match=MatchValue(value=category)))
+    if candidate_ids:
+        conditions.append(FieldCondition(key="ID", match=MatchAny(any=[str(i) for i in candidate_ids])))
+    return Filter(must=conditions) if conditions else None
+
+
+def group_points(points, k: int, group_size: int = DEFAULT_GROUP_SIZE) -> List[Tuple[Any, List[Any]]]:
+    """
+    Mengelompokkan poin hasil query (urut dari skor terbaik) per ID resume di payload, seperti `group_by`:
+    maksimal k resume, masing-masing maksimal `group_size` chunk.
+    """
+    groups: Dict[Any, List[Any]] = {}
+    for point in points:
+        rid = (point.payload or {}).get("ID")
+        if rid is None:
+            continue
+        if rid not in groups:
+            if len(groups) >= k:
+                continue
+            groups[rid] = []
+        if len(groups[rid]) < group_size:
+            groups[rid].append(point)
+    return list(groups.items())
+
+
+def format_hits(resume_id, hits, snippets: bool = True) -> Dict[str, Any]:
+    """
+    Mengubah chunk-chunk milik satu resume (urut dari skor terbaik) menjadi satu baris kandidat.
+    Skor diambil dari chunk terbaik. Teks dan ID poin chunk disimpan sementara di `_texts`/`_point_ids`;
+    snippet dihitung oleh `with_snippets` hanya untuk kandidat akhir (tanpa teks jika `snippets=False`).
+    """
+    best = hits[0]
+    best_payload = best.payload or {}
+    row = {
+        "qdrant_id": str(best.id), "ID": resume_id,
+        "Category": best_payload.get("Category") or best_payload.get("category"),
+        "snippets": [], "score": float(best.score),
+    }
+    if snippets:
+        row["_texts"] = [(h.payload or {}).get("text") or "" for h in hits]
+        row["_point_ids"] = [str(h.id) for h in hits]
+    return row
+
+
+def with_snippets(rows: List[Dict[str, Any]], query: str, snippet_index=None) -> List[Dict[str, Any]]:
+    """
+    Mengisi snippet baris kandidat akhir dari teks chunk-nya; field sementara `_texts`/`_point_ids` dibuang.
+    Dengan `snippet_index` (mis. `ResumeStore`), indeks kalimat semua chunk dibaca sekaligus dan snippet
+    dihitung dengan `index_snippets`; baris yang chunk-nya belum terindeks memakai `extract_snippets`.
+    """
+    point_ids = [pid for row in rows if row.get("_texts") for pid in row.get("_point_ids", ())]
+    entries = snippet_index.get_sentences(point_ids) if snippet_index is not None and point_ids else {}
+    out = []
+    for row in rows:
+        row = dict(row)
+        texts = row.pop("_texts", None)
+        pids = row.pop("_point_ids", None) or []
+        if texts and len(pids) == len(texts) and all(pid in entries for pid in pids):
+            row["snippets"] = index_snippets(texts, [entries[pid] for pid in pids], query, n=3)
+        elif texts:
+            # Baris kosong di antara chunk: batas chunk juga batas kalimat, sama seperti indeks kalimat.
+            row["snippets"] = extract_snippets("\n\n".join(texts), query, n=3)
+        out.append(row)
+    return out
+
+
+# ----------------------------------------------------------------------
+# Rencana pencarian: ditulis sekali, dijalankan sinkron atau async
+# ----------------------------------------------------------------------
+# Setiap pencarian adalah generator "rencana" yang me-yield daftar langkah (callable tanpa argumen,
+# mis. partial(client.query_batch_points, ...)) dan menerima daftar hasilnya. `run_plan` menjalankan
+# langkah dengan QdrantClient / embedding sinkron; `arun_plan` meng-await semua langkah dalam satu
+# yield bersamaan dengan AsyncQdrantClient / embedding async. Query dan format hasilnya selalu sama.
+
+Step = Callable[[], Any]
+Plan = Generator[List[Step], List[Any], Any]
+
+
+def run_plan(plan: Plan) -> Any:
+    """Menjalankan rencana pencarian dengan client sinkron (langkah dijalankan berurutan)."""
+    results = None
+    try:
+        while True:
+            results = [step() for step in plan.send(results)]
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_plan(plan: Plan) -> Any:
+    """Menjalankan rencana pencarian dengan client async (langkah dalam satu yield berjalan bersamaan)."""
+    results = None
+    try:
+        while True:
+            results = list(await asyncio.gather(*(step() for step in plan.send(results))))
+    except StopIteration as stop:
+        return stop.value
+
+
+def centroid_collection_name(collection: str) -> str:
+    """Nama collection centroid per resume untuk collection chunk `collection`."""
+    return f"{collection}{CENTROID_SUFFIX}"
+
+
+def _shortlist_filter(query_filter: Optional[Filter], resume_ids: List[Any]) -> Filter:
+    """Filter tahap kedua: filter asli (kategori/ID) ditambah ID resume hasil tahap pertama."""
+    conditions = list(query_filter.must or []) if query_filter is not None else []
+    conditions.append(FieldCondition(key="ID", match=MatchAny(any=[str(i) for i in resume_ids])))
+    return Filter(must=conditions)
+
+
+def _merge_stages(coarse, fine_groups: List[Tuple[Any, List[Any]]]) -> List[Dict[str, Any]]:
+    """
+    Urutan dan skor kandidat dari tahap centroid; teks bukti dari chunk terbaik tahap kedua.
+    Kandidat tanpa hit chunk (mis. poin chunk belum tersimpan) tetap ditampilkan tanpa snippet.
+    """
+    evidence = {str(rid): hits for rid, hits in fine_groups}
+    results = []
+    for point in coarse:
+        rid = (point.payload or {}).get("ID")
+        hits = evidence.get(str(rid))
+        row = format_hits(rid, hits) if hits else {
+            "qdrant_id": None, "ID": rid, "Category": (point.payload or {}).get("Category"), "snippets": [],
+        }
+        results.append({**row, "score": float(point.score)})
+    return results
+
+
+def _grouped_batch_plan(
+    client, collection: str, searches: Sequence[Tuple[List[float], int, Optional[Filter]]], group_size: int,
+    search_params: Optional[SearchParams], with_payload: List[str],
+) -> Plan:
+    """
+    Beberapa pencarian chunk yang dikelompokkan per ID resume, semuanya dalam satu `query_batch_points`
+    (query batch tidak mendukung group_by). `searches` berisi (vektor, k, filter) per pencarian; setiap pencarian
+    mengambil k * group_size * BATCH_OVERFETCH chunk lalu dikelompokkan di sisi client dengan `group_points`.
+    Pencarian yang mendapat kurang dari k resume padahal hasilnya penuh (resume dengan banyak chunk mirip)
+    diulang dalam satu batch berikutnya dengan limit BATCH_REFILL_FACTOR kali lebih besar, sehingga k tetap
+    berarti k resume berbeda dan urutannya sama seperti `query_points_groups` (skor chunk terbaik per resume).
+    Hasilnya: per pencarian, daftar (ID resume, chunk terbaik) maksimal k grup.
+    """
+    groups: List[List[Tuple[Any, List[Any]]]] = [[] for _ in searches]
+    limits = [k * group_size * BATCH_OVERFETCH for _, k, _ in searches]
+    pending = [i for i, (_, k, _) in enumerate(searches) if k > 0]
+    while pending:
+        requests = [
+            QueryRequest(query=list(searches[i][0]), limit=limits[i], filter=searches[i][2], params=search_params, with_payload=with_payload)
+            for i in pending
+        ]
+        (responses,) = yield [partial(client.query_batch_points, collection_name=collection, requests=requests)]
+        refill = []
+        for i, response in zip(pending, responses):
+            k = searches[i][1]
+            groups[i] = group_points(response.points, k, group_size)
+            if len(groups[i]) < k and len(response.points) >= limits[i]:
+                limits[i] *= BATCH_REFILL_FACTOR
+                refill.append(i)
+        pending = refill
+    return groups
+
+
+def _dense_plan(
+    client, collection: str, query_vectors: Sequence[List[float]], k: int, group_size: int,
+    search_params: Optional[SearchParams], query_filter: Optional[Filter], centroid_collection: Optional[str],
+    snippets: bool = True,
+) -> Plan:
+    """
+    Dense search untuk satu atau banyak vektor query; hasilnya satu daftar k kandidat berbeda per query.
+    Jumlah round trip Qdrant tidak bergantung pada jumlah query:
+    - Tanpa `centroid_collection`: semua query dalam satu `query_batch_points` atas chunk (filter kategori/ID
+      di dalam Qdrant), dikelompokkan per ID resume di sisi client (`_grouped_batch_plan`).
+    - Dengan `centroid_collection` (dua tahap): k resume teratas setiap query dari collection centroid dalam
+      satu `query_batch_points` (satu poin per resume), lalu satu batch query chunk yang dibatasi ke resume
+      tersebut hanya untuk bukti snippet (dilewati jika `snippets=False`). Peringkat dan skor dari centroid.
+    """
+    if centroid_collection:
+        requests = [
+            QueryRequest(query=list(v), limit=k, filter=query_filter, params=search_params, with_payload=SCORE_PAYLOAD_FIELDS)
+            for v in query_vectors
+        ]
+        (responses,) = yield [partial(client.query_batch_points, collection_name=centroid_collection, requests=requests)]
+        coarse_lists = [r.points for r in responses]
+        shortlisted = [i for i, coarse in enumerate(coarse_lists) if coarse] if snippets else []
+        fine = yield from _grouped_batch_plan(client, collection, [
+            (query_vectors[i], len(coarse_lists[i]), _shortlist_filter(query_filter, [(p.payload or {}).get("ID") for p in coarse_lists[i]]))
+            for i in shortlisted
+        ], group_size, search_params, RESULT_PAYLOAD_FIELDS)
+        evidence = dict(zip(shortlisted, fine))
+        return [_merge_stages(coarse, evidence.get(i, [])) for i, coarse in enumerate(coarse_lists)]
+    grouped = yield from _grouped_batch_plan(
+        client, collection, [(v, k, query_filter) for v in query_vectors], group_size, search_params,
+        RESULT_PAYLOAD_FIELDS if snippets else SCORE_PAYLOAD_FIELDS,
+    )
+    return [[format_hits(rid, hits, snippets=snippets) for rid, hits in groups] for groups in grouped]
+
+
+def format_lexical_group(index: LexicalIndex, resume_id: str, hits: List[Tuple[int, float]]) -> Dict[str, Any]:
+    """
+    Mengubah satu grup hasil BM25 menjadi baris kandidat dengan format yang sama seperti `format_hits`.
+    Indeks tidak menyimpan teks chunk; ID poinnya disimpan sementara di `_point_ids` untuk `_fetch_texts`.
+    """
+    best, best_score = hits[0]
+    return {
+        "qdrant_id": index.point_ids[best], "ID": resume_id, "Category": index.category_of(best),
+        "snippets": [], "_point_ids": [index.point_ids[doc] for doc, _ in hits],
+        "score": best_score,
+    }
+
+
+def _fetch_texts(client, collection: str, row_lists: List[List[Dict[str, Any]]]) -> Plan:
+    """
+    Mengambil teks chunk baris BM25 di hasil akhir (semua query sekaligus) dengan satu `retrieve`,
+    lalu menyimpannya di `_texts` untuk `with_snippets`.
+    """
+    missing = [row for rows in row_lists for row in rows if "_point_ids" in row and "_texts" not in row]
+    point_ids = list(dict.fromkeys(pid for row in missing for pid in row["_point_ids"]))
+    if not point_ids:
+        return
+    (records,) = yield [partial(client.retrieve, collection_name=collection, ids=point_ids, with_payload=["text"], with_vectors=False)]
+    texts = {str(r.id): (r.payload or {}).get("text") or "" for r in records}
+    for row in missing:
+        row["_texts"] = [texts.get(str(pid), "") for pid in row["_point_ids"]]
+
+
+def lexical_search_candidates(
+    index: LexicalIndex, query: str, k: int = 5, group_size: int = DEFAULT_GROUP_SIZE,
+    category: Optional[str] = None, candidate_ids: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Mencari k kandidat berbeda hanya dari indeks leksikal (skor BM25), dengan filter kategori/ID opsional."""
+    mask = index.filter_mask(category=category, resume_ids=candidate_ids)
+    groups = index.search_groups(query, k=k, group_size=group_size, mask=mask)
+    return [format_lexical_group(index, rid, hits) for rid, hits in groups]
+
+
+def is_exact_token_query(query: str, index: LexicalIndex) -> bool:
+    """
+    True untuk query kata kunci persis: setiap kata berada di dalam tanda kutip atau berbentuk kode/akronim
+    (minimal dua huruf kapital atau mengandung angka, mis. "SAP FICO", "AutoCAD", "CPA", "ISO 9001"),
+    dan semua tokennya ada di indeks leksikal.
+    """
+    quoted = re.findall(r'"([^"]+)"', query)
+    rest = re.sub(r'"[^"]*"', " ", query).split()
+    if not quoted and not rest:
+        return False
+    if not all(re.search(r"[A-Z].*[A-Z]|\d", w) for w in rest):
+        return False
+    tokens = tokenize(" ".join(quoted + rest))
+    return bool(tokens) and index.has_tokens(tokens)
+
+
+def score_kind(row: Dict[str, Any]) -> str:
+    """Jenis "score" pada baris kandidat (untuk label UI): "BM25" jika hanya ditemukan indeks leksikal, selain itu "cosine"."""
+    return "BM25" if row.get("retrieval") == "lexical" else "cosine"
+
+
+def fuse_candidates(ranked_lists: Dict[str, List[Dict[str, Any]]], k: int, rrf_k: int = RRF_K) -> List[Dict[str, Any]]:
+    """
+    Reciprocal rank fusion beberapa daftar kandidat (key: nama sumber, mis. "dense"/"lexical").
+    Setiap kandidat memakai baris dari sumber pertama yang memuatnya, termasuk "score" asli sumber tersebut
+    (cosine untuk dense, BM25 untuk lexical). Skor RRF (urutan hasil) disimpan terpisah di "rrf_score",
+    dan "retrieval" mencatat sumber yang menemukan kandidat tersebut.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for source, candidates in ranked_lists.items():
+        for rank, c in enumerate(candidates, start=1):
+            entry = fused.setdefault(str(c["ID"]), {"row": c, "score": 0.0, "sources": []})
+            entry["score"] += 1.0 / (rrf_k + rank)
+            entry["sources"].append(source)
+    ranked = sorted(fused.values(), key=lambda e: e["score"], reverse=True)[:k]
+    return [{**e["row"], "rrf_score": e["score"], "retrieval": "+".join(e["sources"])} for e in ranked]
+
+
+def _lexical_only(
+    lexical: LexicalIndex, query: str, k: int, group_size: int,
+    category: Optional[str], candidate_ids: Optional[List[str]],
+) -> Optional[List[Dict[str, Any]]]:
+    """Hasil BM25 saja untuk query kata kunci persis yang menemukan minimal k kandidat, atau None."""
+    if is_exact_token_query(query, lexical):
+        lexical_only = lexical_search_candidates(lexical, query, k=k, group_size=group_size, category=category, candidate_ids=candidate_ids)
+        if len(lexical_only) >= k:
+            return [{**c, "retrieval": "lexical"} for c in lexical_only]
+    return None
+
+
+def _fuse_with_lexical(
+    dense: List[Dict[str, Any]], lexical: LexicalIndex, query: str, k: int, group_size: int,
+    category: Optional[str], candidate_ids: Optional[List[str]],
+) -> List[Dict[str, Any]]:
+    """Menggabungkan hasil dense dengan hasil BM25 (k * HYBRID_FETCH_FACTOR kandidat) memakai RRF."""
+    sparse = lexical_search_candidates(lexical, query, k=k * HYBRID_FETCH_FACTOR, group_size=group_size, category=category, candidate_ids=candidate_ids)
+    return fuse_candidates({"dense": dense, "lexical": sparse}, k)
+
+
+def _hybrid_plan(
+    client, collection: str, embed_queries: Callable, queries: Sequence[str], lexical: Optional[LexicalIndex], k: int, group_size: int,
+    search_params: Optional[SearchParams], category: Optional[str], candidate_ids: Optional[List[str]], centroid_collection: Optional[str],
+    snippet_index=None,
+) -> Plan:
+    """
+    Rencana pencarian hybrid untuk satu atau banyak query (dipakai tool tunggal dan batch, sehingga
+    hasil untuk query yang sama selalu identik): query kata kunci persis dijawab dari BM25 saja, sisanya
+    di-embed dalam satu panggilan `embed_queries`, dicari dengan `_dense_plan`, lalu digabung dengan BM25.
+    Teks chunk kandidat BM25 di hasil akhir diambil dengan satu `retrieve` untuk snippet.
+    """
+    results: List[Optional[List[Dict[str, Any]]]] = [
+        _lexical_only(lexical, q, k, group_size, category, candidate_ids) if lexical is not None else None
+        for q in queries
+    ]
+    pending = [i for i, rows in enumerate(results) if rows is None]
+    if pending:
+        (vectors,) = yield [partial(embed_queries, [queries[i] for i in pending])]
+        fetch = k if lexical is None else k * HYBRID_FETCH_FACTOR
+        dense_lists = yield from _dense_plan(
+            client, collection, vectors, fetch, group_size, search_params,
+            candidate_filter(category, candidate_ids), centroid_collection,
+        )
+        for i, dense in zip(pending, dense_lists):
+            if lexical is None:
+                results[i] = [{**row, "retrieval": "dense"} for row in dense]
+            else:
+                results[i] = _fuse_with_lexical(dense, lexical, queries[i], k, group_size, category, candidate_ids)
+    yield from _fetch_texts(client, collection, results)
+    return [with_snippets(rows, q, snippet_index) for rows, q in zip(results, queries)]
+
+
+def hybrid_search_candidates(
+    client: QdrantClient,
+    collection: str,
+    embed_queries: Callable[[List[str]], List[List[float]]],
+    query: str,
+    lexical: Optional[LexicalIndex] = None,
+    k: int = 5,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    search_params: Optional[SearchParams] = None,
+    category: Optional[str] = None,
+    candidate_ids: Optional[List[str]] = None,
+    centroid_collection: Optional[str] = None,
+    snippet_index=None,
+) -> List[Dict[str, Any]]:
+    """
+    Pencarian k kandidat berbeda dengan indeks leksikal (jika ada):
+    - Query kata kunci persis yang menemukan minimal k kandidat dijawab dari BM25 saja (tanpa embedding;
+      hanya teks chunk hasil akhir yang diambil dari Qdrant).
+    - Selain itu, hasil dense dan BM25 (masing-masing k * HYBRID_FETCH_FACTOR) digabung dengan RRF.
+    Tanpa indeks leksikal, hasilnya dense saja. Filter kategori/ID diterapkan di kedua sumber.
+    "score" setiap baris adalah skor sumbernya: cosine chunk terbaik jika "retrieval" memuat "dense",
+    atau skor BM25 jika "retrieval" == "lexical". Hasil gabungan diurutkan dengan "rrf_score".
+    Dengan `centroid_collection`, bagian dense memakai pencarian dua tahap (centroid resume lalu chunk).
+    `embed_queries` menerima daftar teks dan mengembalikan daftar vektor. Snippet dihitung untuk hasil akhir saja,
+    dari indeks kalimat di `snippet_index` (side store) jika ada.
+    """
+    return run_plan(_hybrid_plan(
+        client, collection, embed_queries, [query], lexical, k, group_size,
+        search_params, category, candidate_ids, centroid_collection, snippet_index,
+    ))[0]
+
+
+async def ahybrid_search_candidates(
+    client: AsyncQdrantClient,
+    collection: str,
+    aembed_queries: Callable[[List[str]], Awaitable[List[List[float]]]],
+    query: str,
+    lexical: Optional[LexicalIndex] = None,
+    k: int = 5,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    search_params: Optional[SearchParams] = None,
+    category: Optional[str] = None,
+    candidate_ids: Optional[List[str]] = None,
+    centroid_collection: Optional[str] = None,
+    snippet_index=None,
+) -> List[Dict[str, Any]]:
+    """
+    Versi async dari `hybrid_search_candidates` (rencana yang sama): embedding query dan query Qdrant
+    di-await, sehingga beberapa pencarian dalam satu event loop berjalan bersamaan. BM25 (lokal) tetap sinkron.
+    """
+    return (await arun_plan(_hybrid_plan(
+        client, collection, aembed_queries, [query], lexical, k, group_size,
+        search_params, category, candidate_ids, centroid_collection, snippet_index,
+    )))[0]
+
+
+async def abatch_hybrid_search_candidates(
+    client: AsyncQdrantClient,
+    collection: str,
+    aembed_queries: Callable[[List[str]], Awaitable[List[List[float]]]],
+    queries: Sequence[str],
+    lexical: Optional[LexicalIndex] = None,
+    k: int = 5,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    search_params: Optional[SearchParams] = None,
+    category: Optional[str] = None,
+    candidate_ids: Optional[List[str]] = None,
+    centroid_collection: Optional[str] = None,
+    snippet_index=None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Versi batch dari `ahybrid_search_candidates` (rencana yang sama, sehingga setiap query mendapat hasil
+    yang sama seperti dicari sendiri): semua query yang butuh dense search di-embed dalam satu panggilan
+    `aembed_queries`; tahap centroid memakai satu `query_batch_points`. Hasilnya satu daftar kandidat
+    per query, urutan sama seperti `queries`.
+    """
+    if not queries:
+        return []
+    return await arun_plan(_hybrid_plan(
+        client, collection, aembed_queries, queries, lexical, k, group_size,
+        search_params, category, candidate_ids, centroid_collection, snippet_index,
+    ))
+
+
+def batch_search_candidates(
+    client: QdrantClient,
+    collection: str,
+    query_vectors: Sequence[List[float]],
+    queries: Sequence[str],
+    k: int = 5,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    search_params: Optional[SearchParams] = None,
+    query_filter: Optional[Filter] = None,
+    snippets: bool = True,
+    centroid_collection: Optional[str] = None,
+    snippet_index=None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Dense search (client sinkron) untuk banyak vektor query yang sudah di-embed, dengan rencana dense yang
+    sama seperti pencarian tunggal: k selalu berarti k resume berbeda. Dengan `centroid_collection` semua
+    query dicari dalam satu `query_batch_points` atas centroid resume; dengan `snippets=False` teks chunk
+    tidak diambil sama sekali (hanya ID, kategori, dan skor). Hasilnya: satu daftar kandidat per query.
+    """
+    if not queries:
+        return []
+    results = run_plan(_dense_plan(
+        client, collection, query_vectors, k, group_size, search_params, query_filter, centroid_collection, snippets=snippets,
+    ))
+    return [with_snippets(rows, q, snippet_index) for rows, q in zip(results, queries)]
@@ -0,0 +1,103 @@
+# Indeks Kalimat untuk Ekstraksi Snippet
+
+"""
+Indeks kalimat per chunk yang dihitung sekali saat ingest dan disimpan di side store (tabel
+`chunk_sentences` di `resume_store.sqlite`, key: ID poin Qdrant), bukan di payload poin:
+- Batas kalimat (offset karakter) dengan aturan pemisahan yang sama seperti `retrieval.extract_snippets`.
+- Inverted index kecil per chunk: hash crc32 token unik (terurut) -> daftar kalimat yang memuatnya.
+Semua angka dipack sebagai array uint32 little-endian:
+[jumlah kalimat n, jumlah token t, start_0, end_0, ..., hash token (t), offset postings (t + 1), nomor kalimat...]
+Saat query, skor kalimat = jumlah token query yang ada di kalimat (irisan set token), dihitung dengan
+pencarian biner hash token query, sehingga biayanya bergantung pada panjang query, bukan panjang resume.
+"""
+
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from lexical_index import tokenize
+
+# Aturan pemisahan kalimat (dipakai juga oleh `retrieval._split_sentences`).
+SENTENCE_END_RE = re.compile(r'(?<=[\.\?\!\n])\s+')
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """Offset (start, end) setiap kalimat non-kosong di teks (setelah strip, seperti `_split_sentences`)."""
+    clean = text.replace("\r", " ")
+    lead = len(clean) - len(clean.lstrip())
+    body = clean.strip()
+    spans, prev = [], 0
+    pieces = [(m.start(), m.end()) for m in SENTENCE_END_RE.finditer(body)] + [(len(body), len(body))]
+    for sep_start, sep_end in pieces:
+        piece = body[prev:sep_start]
+        start = prev + len(piece) - len(piece.lstrip())
+        end = prev + len(piece.rstrip())
+        if end > start:
+            spans.append((lead + start, lead + end))
+        prev = sep_end
+    return spans
+
+
+def token_hashes(tokens) -> np.ndarray:
+    """Hash crc32 unik (terurut) dari kumpulan token."""
+    return np.array(sorted({zlib.crc32(t.encode("utf-8")) for t in tokens}), dtype=np.uint32)
+
+
+def encode_sentences(text: str) -> bytes:
+    """Membangun indeks kalimat untuk satu chunk teks (bytes untuk disimpan di side store)."""
+    clean = text.replace("\r", " ")
+    spans = sentence_spans(clean)
+    postings: Dict[str, List[int]] = {}
+    for i, (start, end) in enumerate(spans):
+        for token in set(tokenize(clean[start:end])):
+            postings.setdefault(token, []).append(i)
+    # Hash dihitung sekali per token unik di chunk; postings diurutkan berdasarkan hash untuk pencarian biner.
+    terms = sorted((zlib.crc32(token.encode("utf-8")), ids) for token, ids in postings.items())
+    offsets = [0]
+    for _, ids in terms:
+        offsets.append(offsets[-1] + len(ids))
+    packed = [len(spans), len(terms), *(x for span in spans for x in span), *(h for h, _ in terms), *offsets]
+    packed.extend(i for _, ids in terms for i in ids)
+    return np.array(packed, dtype="<u4").tobytes()
+
+
+def sentence_scores(entry: bytes, query_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Skor setiap kalimat di satu chunk = jumlah hash token query yang ada di kalimat.
+    Hasilnya: (span kalimat [n, 2], skor per kalimat [n])
+    """
+    packed = np.frombuffer(entry, dtype="<u4")
+    n, t = int(packed[0]), int(packed[1])
+    spans = packed[2 : 2 + 2 * n].reshape(n, 2)
+    terms = packed[2 + 2 * n : 2 + 2 * n + t]
+    offsets = packed[2 + 2 * n + t : 3 + 2 * n + 2 * t]
+    postings = packed[3 + 2 * n + 2 * t :]
+    pos = np.searchsorted(terms, query_hashes)
+    valid = pos < t
+    found = pos[valid][terms[pos[valid]] == query_hashes[valid]]
+    if not len(found):
+        return spans, np.zeros(n, dtype=np.int64)
+    hits = np.concatenate([postings[offsets[p] : offsets[p + 1]] for p in found])
+    return spans, np.bincount(hits, minlength=n)
+
+
+def index_snippets(texts: Sequence[str], entries: Sequence[bytes], query: str, n: int = 3) -> List[str]:
+    """
+    Snippet dari chunk-chunk satu kandidat memakai indeks kalimatnya, dengan urutan yang sama seperti
+    `extract_snippets`: skor menurun, lalu kalimat lebih pendek, lalu urutan kemunculan; hanya kalimat
+    yang memuat token query. Tanpa kalimat yang cocok, n kalimat pertama dikembalikan.
+    """
+    query_hashes = token_hashes(tokenize(query))
+    scored, first, order = [], [], 0
+    for text, entry in zip(texts, entries):
+        clean = text.replace("\r", " ")
+        spans, scores = sentence_scores(entry, query_hashes)
+        for i in np.flatnonzero(scores):
+            start, end = int(spans[i, 0]), int(spans[i, 1])
+            scored.append((-int(scores[i]), end - start, order + int(i), clean[start:end]))
+        first.extend(clean[int(s) : int(e)] for s, e in spans[: max(0, n - len(first))])
+        order += len(spans)
+    scored.sort(key=lambda c: c[:3])
+    return [c[3] for c in scored[:n]] or first
@@ -0,0 +1,110 @@
+# Test Pencocokan Massal: jumlah query ke vector store per batch role
+
+"""
+`match_jobs` harus mengirim satu query batch per batch role (bukan satu query per role), dengan top-k
+berisi k resume berbeda seperti `query_points_groups`. Memakai vector store NumPy dan embedding hashing
+(tanpa jaringan). Jalankan: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client.models import VectorParams, Distance, PointStruct  # noqa: E402
+
+from backends import NumpyVectorStore, HashingEmbedder  # noqa: E402
+from match_jobs_csv import match_jobs  # noqa: E402
+from retrieval import centroid_collection_name, candidate_filter  # noqa: E402
+
+COLLECTION = "resumes_test"
+SKILLS = [f"skill{i}" for i in range(300)]
+CATEGORIES = ["IT", "CHEF", "ACCOUNTANT", "SALES"]
+N_RESUMES = 60
+CHUNKS_PER_RESUME = 3  # <= BATCH_OVERFETCH, sehingga satu query batch selalu cukup untuk k resume berbeda
+N_ROLES = 40
+BATCH_SIZE = 16
+TOP_K = 5
+
+
+class CountingClient:
+    """Membungkus client vector store dan mencatat nama setiap method yang dipanggil."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self.calls.append(name)
+            return attr(*args, **kwargs)
+        return call
+
+
+@pytest.fixture()
+def store(tmp_path):
+    """Collection chunk (beberapa chunk per resume) dan collection centroid (rata-rata chunk per resume)."""
+    rng = np.random.default_rng(0)
+    embedder = HashingEmbedder()
+    client = NumpyVectorStore(str(tmp_path))
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=embedder.dim, distance=Distance.COSINE))
+    client.create_collection(centroid_collection_name(COLLECTION), vectors_config=VectorParams(size=embedder.dim, distance=Distance.COSINE))
+    points, centroids = [], []
+    for r in range(N_RESUMES):
+        rid, category = str(1000 + r), CATEGORIES[r % len(CATEGORIES)]
+        texts = [" ".join(rng.choice(SKILLS, size=40)) for _ in range(CHUNKS_PER_RESUME)]
+        vectors = embedder.embed_documents(texts)
+        for ci, (text, vector) in enumerate(zip(texts, vectors)):
+            payload = {"text": text, "ID": rid, "Category": category, "chunk_index": ci}
+            points.append(PointStruct(id=len(points), vector=vector, payload=payload))
+        mean = np.mean(vectors, axis=0)
+        centroids.append(PointStruct(id=r, vector=(mean / np.linalg.norm(mean)).tolist(), payload={"ID": rid, "Category": category}))
+    client.upsert(COLLECTION, points)
+    client.upsert(centroid_collection_name(COLLECTION), centroids)
+    yield client, embedder
+    client.close()
+
+
+def role_queries():
+    rng = np.random.default_rng(1)
+    roles = [f"role_{i}" for i in range(N_ROLES)]
+    return roles, [" ".join(rng.choice(SKILLS, size=8)) for _ in roles]
+
+
+@pytest.mark.parametrize("two_stage", [False, True])
+def test_one_vector_query_per_batch(store, two_stage):
+    client, embedder = store
+    counting = CountingClient(client)
+    roles, queries = role_queries()
+    matches, stats = match_jobs(
+        roles, queries, counting, COLLECTION, embedder.embed_documents, k=TOP_K, batch_size=BATCH_SIZE,
+        centroid_collection=centroid_collection_name(COLLECTION) if two_stage else None,
+    )
+    n_batches = -(-N_ROLES // BATCH_SIZE)
+    assert counting.calls == ["query_batch_points"] * n_batches
+    assert stats["roles"] == N_ROLES
+    per_role = matches.groupby("role")["ID"]
+    assert (per_role.count() == TOP_K).all()
+    assert (per_role.nunique() == TOP_K).all()
+
+
+def test_batch_matches_grouped_search(store):
+    client, embedder = store
+    roles, queries = role_queries()
+    matches, _ = match_jobs(roles, queries, client, COLLECTION, embedder.embed_documents, k=TOP_K, batch_size=BATCH_SIZE, category="CHEF")
+    for role, query in zip(roles, queries):
+        expected = client.query_points_groups(
+            COLLECTION, query=embedder.embed_one(query), group_by="ID", limit=TOP_K, group_size=1,
+            query_filter=candidate_filter("CHEF"), with_payload=["ID"],
+        ).groups
+        got = matches[matches["role"] == role].sort_values("rank")
+        assert got["ID"].tolist() == [str(g.id) for g in expected]
+        assert got["score"].tolist() == pytest.approx([g.hits[0].score for g in expected], abs=1e-6)
+        assert set(got["Category"]) == {"CHEF"}
@@ -0,0 +1,53 @@
+# Test Indeks Kalimat: snippet dari indeks sama dengan ekstraksi dari teks
+
+"""
+`index_snippets` (indeks kalimat yang dihitung saat ingest) harus menghasilkan snippet yang sama seperti
+`extract_snippets` atas teks chunk yang sama. Jalankan: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retrieval import extract_snippets, with_snippets  # noqa: E402
+from sentence_index import encode_sentences, index_snippets  # noqa: E402
+
+CHUNKS = [
+    "  Senior Python developer with SQL experience.\r\nLed a team of five engineers!  Built ETL pipelines",
+    "Managed the kitchen menu.   Is SQL tuning a strength? Yes: Python, SQL and cloud.\n\nReferences available",
+    "Accounting",
+]
+QUERIES = ["python sql", "kitchen menu", "tax audit", "SQL", "team engineers cloud"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("n_chunks", [1, 2, 3])
+def test_index_snippets_match_extract_snippets(query, n_chunks):
+    chunks = CHUNKS[:n_chunks]
+    expected = extract_snippets("\n\n".join(chunks), query, n=3)
+    assert index_snippets(chunks, [encode_sentences(c) for c in chunks], query, n=3) == expected
+
+
+class FakeSnippetIndex:
+    def __init__(self, entries):
+        self.entries = entries
+        self.calls = 0
+
+    def get_sentences(self, point_ids):
+        self.calls += 1
+        return {pid: self.entries[pid] for pid in point_ids if pid in self.entries}
+
+
+def test_with_snippets_reads_index_once_and_falls_back():
+    index = FakeSnippetIndex({"p0": encode_sentences(CHUNKS[0]), "p1": encode_sentences(CHUNKS[1])})
+    rows = [
+        {"ID": "1", "snippets": [], "_texts": CHUNKS[:2], "_point_ids": ["p0", "p1"]},
+        {"ID": "2", "snippets": [], "_texts": CHUNKS[1:], "_point_ids": ["p1", "p2"]},  # p2 belum terindeks
+    ]
+    out = with_snippets(rows, "python sql", snippet_index=index)
+    assert index.calls == 1
+    assert [r["snippets"] for r in out] == [extract_snippets("\n\n".join(r["_texts"]), "python sql") for r in rows]
+    assert all(not k.startswith("_") for r in out for k in r)
@@ -0,0 +1,170 @@
+# Tracing Latensi per Tahap untuk Permintaan Chat
+
+"""
+Tracing terstruktur per permintaan chat SmartHire:
+- Setiap permintaan punya satu `RequestTrace` berisi span per tahap (embedding query, query Qdrant,
+  tool retrieval, setiap giliran LLM) lengkap dengan atribut (token, jumlah tool call, ukuran payload).
+- Trace yang selesai ditulis sebagai satu baris JSON ke TRACE_PATH oleh thread latar belakang,
+  sehingga penulisan file tidak menambah latensi permintaan.
+- Ringkasan p50/p95 per tahap dihitung dari trace terbaru di memori (untuk panel sidebar).
+"""
+
+import os
+import json
+import atexit
+import time
+import uuid
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+# Lokasi file trace JSONL (bisa diganti lewat env TRACE_PATH).
+TRACE_PATH = os.getenv("TRACE_PATH", "traces.jsonl")
+# Jumlah trace terbaru yang disimpan di memori untuk ringkasan p50/p95.
+TRACE_RECENT = 500
+# Batas antrian penulisan; jika penuh (disk sangat lambat), trace dibuang daripada memblokir permintaan.
+TRACE_QUEUE_SIZE = 1000
+
+
+class RequestTrace:
+    """Kumpulan span untuk satu permintaan. Waktu span dicatat relatif terhadap awal permintaan (ms)."""
+
+    def __init__(self, name: str, **attrs):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attrs: Dict[str, Any] = dict(attrs)
+        self.spans: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+    def _ms(self, t: float) -> float:
+        return round((t - self._t0) * 1000, 2)
+
+    def add_span(self, name: str, start: float, end: float, **attrs):
+        """Mencatat span dari dua titik waktu `time.perf_counter()`."""
+        self.spans.append({"name": name, "start_ms": self._ms(start), "duration_ms": round((end - start) * 1000, 2), **attrs})
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """
+        Mengukur satu blok kode sebagai span. Dict yang di-yield bisa diisi atribut tambahan
+        (mis. jumlah hasil) di dalam blok. Aman dipakai di coroutine yang berjalan bersamaan.
+        """
+        extra: Dict[str, Any] = dict(attrs)
+        start = time.perf_counter()
+        try:
+            yield extra
+        except Exception as e:
+            extra["error"] = type(e).__name__
+            raise
+        finally:
+            self.add_span(name, start, time.perf_counter(), **extra)
+
+    def finish(self, **attrs) -> Dict[str, Any]:
+        """Menutup trace dan mengembalikan record JSON-serializable."""
+        return {
+            "trace_id": self.trace_id, "name": self.name, "ts": self._started_at,
+            "total_ms": self._ms(time.perf_counter()), **self.attrs, **attrs,
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+
+class TracedAsyncClient:
+    """
+    Membungkus client vector store async: setiap panggilan method di `methods` dicatat sebagai span
+    "qdrant.<method>" pada trace yang sedang aktif (`get_trace()`), tanpa mengubah kode retrieval.
+    """
+
+    def __init__(self, client, get_trace: Callable[[], Optional[RequestTrace]],
+                 methods=("query_points", "query_points_groups", "query_batch_points", "retrieve", "scroll")):
+        self._client = client
+        self._get_trace = get_trace
+        self._methods = set(methods)
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+        if name not in self._methods:
+            return method
+
+        async def call(*args, **kwargs):
+            trace = self._get_trace()
+            if trace is None:
+                return await method(*args, **kwargs)
+            with trace.span(f"qdrant.{name}", collection=kwargs.get("collection_name")):
+                return await method(*args, **kwargs)
+
+        return call
+
+
+class TraceWriter:
+    """
+    Penulis trace non-blocking: `write` hanya memasukkan record ke antrian; thread daemon menulis
+    baris JSONL ke file (append). Trace terbaru juga disimpan di memori, dimulai dari isi file yang ada.
+    Saat proses berhenti, `flush` (didaftarkan ke atexit) menunggu antrian tertulis ke file.
+    """
+
+    def __init__(self, path: str = TRACE_PATH, recent: int = TRACE_RECENT):
+        self.path = path
+        self.recent: deque = deque(maxlen=recent)
+        self.dropped = 0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._load_recent()
+        self._thread = threading.Thread(target=self._run, name="smarthire-trace-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _load_recent(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in deque(f, maxlen=self.recent.maxlen):
+                try:
+                    self.recent.append(json.loads(line))
+                except ValueError:
+                    continue
+
+    def write(self, record: Dict[str, Any]):
+        self.recent.append(record)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                record = self._queue.get()
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                # Flush saat antrian kosong, sehingga burst trace ditulis dengan satu flush.
+                if self._queue.empty():
+                    f.flush()
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0):
+        """Menunggu sampai semua trace di antrian tertulis dan di-flush ke file (dipanggil saat shutdown lewat atexit)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+def summarize_traces(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ringkasan latensi per tahap: total permintaan, lalu setiap nama span (semua span dengan nama yang sama
+    digabung, mis. semua giliran LLM). Hasilnya: daftar {stage, count, p50_ms, p95_ms}, urut dari p95 terbesar.
+    """
+    durations: Dict[str, List[float]] = {}
+    for rec in records:
+        durations.setdefault("request.total", []).append(rec.get("total_ms", 0.0))
+        for span in rec.get("spans", []):
+            durations.setdefault(span["name"], []).append(span["duration_ms"])
+    rows = [
+        {"stage": stage, "count": len(values),
+         "p50_ms": round(float(np.percentile(values, 50)), 1), "p95_ms": round(float(np.percentile(values, 95)), 1)}
+        for stage, values in durations.items()
+    ]
+    return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)